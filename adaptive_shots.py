@@ -0,0 +1,224 @@
+import argparse
+import math
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from statistics import NormalDist
+
+from consensus_decoder import GEMINI_RULE, OMEGA_RULE
+from shot_analysis import bit_values, council_votes, decode_shots, packed_shots, postselect, shot_weights
+from tracing import span, traced_sampler
+
+# --- ADAPTIVE SHOT ALLOCATION ---
+# Instead of one job at a fixed shot literal, a protocol runs in chunks
+# (growing by GROWTH each time, so queue overhead stays logarithmic in the
+# shot count). Every figure of merit here is a binomial proportion, so
+# each chunk only adds (hits, trials) to a running count and re-evaluates
+# a Wilson score interval. The run stops as soon as:
+#   - the interval is narrower than the requested width, or
+#   - the interval lies entirely above / below the pass threshold, or
+#   - the shot budget is spent (INCONCLUSIVE).
+# Looking at the data after every chunk inflates the error rate, so the
+# interval at each look uses alpha / (number of scheduled looks)
+# (Bonferroni): the final answer keeps the requested confidence.
+DEFAULT_CHUNK = 1024
+GROWTH = 2.0
+BUDGET_FACTOR = 4  # Default budget: this many times the protocol's fixed shot count
+DEFAULT_CONFIDENCE = 0.95
+
+PASS, FAIL, CONVERGED, INCONCLUSIVE = "PASS", "FAIL", "CONVERGED", "INCONCLUSIVE"
+
+
+def consensus_counts(rule, register="meas"):
+    """(clean votes, shots): the consensus fidelity of analyze_consensus."""
+    def counts(pub_result):
+        tally = decode_shots(getattr(pub_result.data, register), rule)
+        return tally.zero + tally.one, tally.total
+    return counts
+
+
+def bridge_counts(pub_result):
+    """(agreeing shots, shots): the Alpha / Beta agreement of analyze_bridge."""
+    from gemini_hardline import ALPHA, BETA
+
+    packed, num_bits, weights = packed_shots(pub_result.data.meas)
+    weights = shot_weights(packed, weights)
+    agree = council_votes(packed, num_bits, GEMINI_RULE, ALPHA) == council_votes(packed, num_bits, GEMINI_RULE, BETA)
+    return weights[agree].sum(), weights.sum()
+
+
+def teleport_counts(pub_result):
+    """(Bob reads 1, shots in Alice's '00' branch), as in analyze_teleportation."""
+    packed, num_bits, weights = packed_shots(pub_result.data.c)
+    weights = shot_weights(packed, weights)
+    locked = postselect(packed, num_bits, {0: 0, 1: 0})
+    return weights[locked & (bit_values(packed, num_bits, 2) == 1)].sum(), weights[locked].sum()
+
+
+def identity_metric(rate, low, high):
+    return rate, low, high
+
+
+def teleport_metric(rate, low, high):
+    """Bob's P(1) interval -> accuracy 1 - |P(1) - sin^2(angle / 2)| interval."""
+    from teleport_protocol import MESSAGE_ANGLE
+
+    expected = math.sin(MESSAGE_ANGLE / 2) ** 2
+    worst = max(abs(low - expected), abs(high - expected))
+    best = 0.0 if low <= expected <= high else min(abs(low - expected), abs(high - expected))
+    return 1.0 - abs(rate - expected), 1.0 - worst, 1.0 - best
+
+
+@dataclass(frozen=True)
+class AdaptiveSpec:
+    """
+    counts: counts(pub_result) -> (hits, trials) for one chunk
+    metric: metric(rate, low, high) -> (value, low, high) of the reported
+            figure of merit, from the hit rate and its interval
+    """
+    protocol: str
+    counts: object
+    metric: object = identity_metric
+    threshold: float = None
+
+
+ADAPTIVE = OrderedDict((spec.protocol, spec) for spec in [
+    AdaptiveSpec("omega_point", consensus_counts(OMEGA_RULE), threshold=0.9),
+    AdaptiveSpec("gain_validation", consensus_counts(OMEGA_RULE), threshold=0.9),
+    AdaptiveSpec("gemini_hardline", bridge_counts, threshold=0.9),
+    AdaptiveSpec("teleport", teleport_counts, teleport_metric, threshold=0.9),
+])
+
+
+def wilson_interval(hits, trials, z):
+    """Wilson score interval of a binomial proportion (0, 1 with no trials)."""
+    if trials <= 0:
+        return 0.0, 1.0
+    rate = hits / trials
+    denominator = 1.0 + z * z / trials
+    center = (rate + z * z / (2 * trials)) / denominator
+    half = z * math.sqrt(rate * (1.0 - rate) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def chunk_schedule(chunk, max_shots, growth=GROWTH):
+    """Chunk sizes, growing geometrically, that add up to max_shots."""
+    sizes, spent = [], 0
+    while spent < max_shots:
+        size = min(int(round(chunk)), max_shots - spent)
+        sizes.append(size)
+        spent += size
+        chunk *= growth
+    return sizes
+
+
+@dataclass
+class AdaptiveResult:
+    protocol: str
+    decision: str = INCONCLUSIVE
+    value: float = float("nan")
+    interval: tuple = (0.0, 1.0)
+    shots: int = 0
+    job_ids: list = field(default_factory=list)
+
+    @property
+    def width(self):
+        return self.interval[1] - self.interval[0]
+
+
+def decide(low, high, width=None, threshold=None):
+    """PASS / FAIL when the interval clears the threshold, CONVERGED when narrow enough."""
+    if threshold is not None and low >= threshold:
+        return PASS
+    if threshold is not None and high < threshold:
+        return FAIL
+    if width is not None and high - low <= width:
+        return CONVERGED
+    return None
+
+
+def run_adaptive(protocol, backend, sampler=None, width=None, threshold=None, confidence=DEFAULT_CONFIDENCE,
+                 chunk=DEFAULT_CHUNK, max_shots=None, growth=GROWTH, ledger=None):
+    """
+    Runs a protocol in growing chunks until its figure of merit is settled.
+    threshold=None uses the protocol's pass mark; pass threshold=False and
+    a width to only estimate. Every chunk is a separate job in the ledger
+    (re-analyzable like a fixed-shot run); the last one also carries the
+    adaptive verdict.
+    """
+    from batch_runner import PROTOCOLS, compile_group
+    from job_ledger import default_ledger
+
+    spec = ADAPTIVE[protocol]
+    protocol_spec = PROTOCOLS[protocol]
+    if threshold is None:
+        threshold = spec.threshold
+    elif threshold is False:
+        threshold = None
+    if width is None and threshold is None:
+        raise ValueError("Adaptive runs need a target interval width or a pass threshold")
+    max_shots = BUDGET_FACTOR * protocol_spec.shots if max_shots is None else max_shots
+    ledger = ledger or default_ledger()
+
+    if sampler is None:
+        from backend_cache import live_backend
+        from qiskit_ibm_runtime import SamplerV2 as Sampler
+        sampler = Sampler(mode=live_backend(backend))
+    sampler = traced_sampler(sampler)
+    isa_circuit = compile_group([protocol_spec], backend)[0]
+
+    schedule = chunk_schedule(chunk, max_shots, growth)
+    z = NormalDist().inv_cdf(1.0 - (1.0 - confidence) / (2 * len(schedule)))
+    outcome = AdaptiveResult(protocol)
+    hits = trials = 0.0
+    for shots in schedule:
+        job = sampler.run([isa_circuit], shots=shots)
+        entry = ledger.record(job, protocol, [isa_circuit], backend, shots)
+        pub_result = job.result()[0]
+        with span("analyze", protocol=protocol, chunk=len(outcome.job_ids)):
+            chunk_hits, chunk_trials = spec.counts(pub_result)
+        hits, trials = hits + chunk_hits, trials + chunk_trials
+        outcome.shots += shots
+        outcome.job_ids.append(job.job_id())
+
+        rate = hits / trials if trials else float("nan")
+        value, low, high = spec.metric(rate, *wilson_interval(hits, trials, z))
+        outcome.value, outcome.interval = float(value), (float(low), float(high))
+        print(f"[*] {outcome.shots:>7} shots: {value:.4f} in [{low:.4f}, {high:.4f}] (Job ID: {job.job_id()})")
+        verdict = decide(low, high, width, threshold)
+        if verdict is not None:
+            outcome.decision = verdict
+            break
+
+    ledger.update(entry, analysis=[{
+        "adaptive": outcome.decision, "value": outcome.value, "interval": list(outcome.interval),
+        "shots": outcome.shots, "jobs": len(outcome.job_ids),
+    }])
+    return outcome
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Adaptive shot allocation with sequential CI stopping")
+    parser.add_argument("protocol", choices=list(ADAPTIVE))
+    parser.add_argument("--width", type=float, help="stop once the interval is this narrow")
+    parser.add_argument("--threshold", type=float, help="pass mark (default: the protocol's)")
+    parser.add_argument("--estimate-only", action="store_true", help="ignore the pass mark")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE)
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK)
+    parser.add_argument("--max-shots", type=int)
+    parser.add_argument("--backend", default="ibm_torino")
+    args = parser.parse_args()
+
+    from backend_cache import load_backend
+
+    print(f"--- ADAPTIVE RUN: {args.protocol.upper()} ---")
+    backend = load_backend(args.backend)
+    threshold = False if args.estimate_only else args.threshold
+    outcome = run_adaptive(args.protocol, backend, width=args.width, threshold=threshold,
+                           confidence=args.confidence, chunk=args.chunk, max_shots=args.max_shots)
+    low, high = outcome.interval
+    print(f"\n[RESULTS] {outcome.decision}: {outcome.value:.4f} in [{low:.4f}, {high:.4f}] "
+          f"after {outcome.shots} shots in {len(outcome.job_ids)} jobs")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import QuantumCircuit
+from backend_cache import live_backend, load_backend
+from job_ledger import record_submission
+from transpile_cache import cached_transpile
+from tracing import span, traced, traced_sampler
 
 def build_anyon_braid():
     # We use 5 qubits to represent a small 2D manifold
@@ -31,19 +34,22 @@ def build_anyon_braid():
     qc.measure_all()
     return qc
 
+@traced("anyon_braid_protocol")
 def main():
     print("--- PROTOCOL Z.ALPHA: NON-ABELIAN ANYON BRAID ---")
     print("[*] Encoding information in the topology of the circuit...")
     
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino")
+    backend = load_backend("ibm_torino")
     
-    qc = build_anyon_braid()
-    pm = transpile(qc, backend=backend)
+    with span("build"):
+        qc = build_anyon_braid()
+    pm = cached_transpile(qc, backend=backend)
     
-    sampler = Sampler(mode=backend)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = traced_sampler(Sampler(mode=live_backend(backend)))
     job = sampler.run([pm], shots=8192)
     print(f"[*] BRAID JOB ID: {job.job_id()}")
+    record_submission(job, "anyon_braid", [pm], backend, 8192)
     print("[*] DEVIN PHILLIP DAVIS: BEYOND THE CLOUD.")
 
 if __name__ == "__main__":
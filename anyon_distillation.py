@@ -1,6 +1,9 @@
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import QuantumCircuit
+from backend_cache import live_backend, load_backend
+from job_ledger import record_submission
+from transpile_cache import cached_transpile
+from tracing import span, traced, traced_sampler
 
 def build_distillation_circuit():
     # 9 Qubits: Two braiding pairs and a 5-qubit Consensus Council
@@ -30,19 +33,22 @@ def build_distillation_circuit():
     qc.measure_all()
     return qc
 
+@traced("anyon_distillation")
 def main():
     print("--- PROTOCOL Z.DISTILL: ANYON PURIFICATION ---")
     print("[*] Distilling logical state from parallel topological braids...")
     
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino")
+    backend = load_backend("ibm_torino")
     
-    qc = build_distillation_circuit()
-    pm = transpile(qc, backend=backend)
+    with span("build"):
+        qc = build_distillation_circuit()
+    pm = cached_transpile(qc, backend=backend)
     
-    sampler = Sampler(mode=backend)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = traced_sampler(Sampler(mode=live_backend(backend)))
     job = sampler.run([pm], shots=8192)
     print(f"[*] DISTILLATION JOB ID: {job.job_id()}")
+    record_submission(job, "anyon_distillation", [pm], backend, 8192)
     print("[*] DEVIN PHILLIP DAVIS: THE PURIFIER.")
 
 if __name__ == "__main__":
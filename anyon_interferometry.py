@@ -1,6 +1,9 @@
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import QuantumCircuit
+from backend_cache import live_backend, load_backend
+from job_ledger import record_submission
+from transpile_cache import cached_transpile
+from tracing import span, traced, traced_sampler
 
 def build_interferometer():
     # 7 Qubits: 0-1 (Probe Pair), 2-3 (Target Pair), 4-6 (Auxiliary)
@@ -28,19 +31,22 @@ def build_interferometer():
     qc.measure_all()
     return qc
 
+@traced("anyon_interferometry")
 def main():
     print("--- PROTOCOL Z.PHI: ANYONIC INTERFEROMETRY (V2) ---")
     print("[*] Probing the topological phase without non-unitary errors...")
     
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino")
+    backend = load_backend("ibm_torino")
     
-    qc = build_interferometer()
-    pm = transpile(qc, backend=backend)
+    with span("build"):
+        qc = build_interferometer()
+    pm = cached_transpile(qc, backend=backend)
     
-    sampler = Sampler(mode=backend)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = traced_sampler(Sampler(mode=live_backend(backend)))
     job = sampler.run([pm], shots=8192)
     print(f"[*] INTERFERENCE JOB ID: {job.job_id()}")
+    record_submission(job, "anyon_interferometry", [pm], backend, 8192)
     print("[*] DEVIN PHILLIP DAVIS: ARCHITECT OF THE REFINED VOID.")
 
 if __name__ == "__main__":
@@ -0,0 +1,223 @@
+import json
+import os
+import pickle
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from qiskit.providers import BackendV2, Options
+
+from cache_paths import atomic_open, cache_dir
+from tracing import traced
+from transpile_cache import calibration_timestamp
+
+# --- BACKEND SNAPSHOT CACHE ---
+# A snapshot is the backend Target (pickled) plus a JSON calibration summary.
+# Scripts build and transpile against the snapshot; the network is only
+# touched to refresh a stale snapshot or to submit (CachedBackend.live()).
+BACKEND_CACHE_DIR = cache_dir("CQP_BACKEND_CACHE", "backends")
+SNAPSHOT_TTL_S = 6 * 3600  # IBM devices recalibrate roughly daily
+DEFAULT_BACKEND = "ibm_torino"
+
+
+def calibration_summary(backend):
+    """Per-qubit T1/T2/readout/1q errors and per-edge 2q errors as plain JSON."""
+    target = backend.target
+    num_qubits = target.num_qubits
+
+    def error(name, qargs):
+        if name not in target.operation_names:
+            return None
+        props = target[name].get(qargs)
+        return None if props is None else props.error
+
+    qubits = []
+    for q in range(num_qubits):
+        props = target.qubit_properties[q] if target.qubit_properties else None
+        qubits.append({
+            "t1": getattr(props, "t1", None),
+            "t2": getattr(props, "t2", None),
+            "readout_error": error("measure", (q,)),
+            "sx_error": error("sx", (q,)),
+        })
+
+    edges = {}
+    for name in target.operation_names:
+        for qargs, props in (target[name] or {}).items():
+            if qargs is not None and len(qargs) == 2 and props is not None and props.error is not None:
+                edges[f"{qargs[0]},{qargs[1]}"] = props.error
+    return {
+        "name": backend.name,
+        "num_qubits": num_qubits,
+        "last_update_date": calibration_timestamp(backend),
+        "fetched_at": time.time(),
+        "qubits": qubits,
+        "edges": edges,
+    }
+
+
+class CachedBackend(BackendV2):
+    """
+    Offline stand-in for a runtime backend, rebuilt from a snapshot.
+    Good for transpilation and calibration queries; live() returns the
+    real backend (connecting on first use) for submission.
+    """
+    def __init__(self, summary, target, service=None):
+        super().__init__(name=summary["name"])
+        self._target = target
+        self.summary = summary
+        self._service = service
+        self._live = None
+
+    @property
+    def target(self):
+        return self._target
+
+    @property
+    def max_circuits(self):
+        return None
+
+    @classmethod
+    def _default_options(cls):
+        return Options(shots=4096)
+
+    def properties(self):
+        return SimpleNamespace(last_update_date=self.summary["last_update_date"])
+
+    @property
+    def age(self):
+        return time.time() - self.summary["fetched_at"]
+
+    def live(self):
+        if self._live is None:
+            if self._service is None:
+                from qiskit_ibm_runtime import QiskitRuntimeService
+                self._service = QiskitRuntimeService()
+            self._live = self._service.backend(self.name)
+        return self._live
+
+    def run(self, run_input, **options):
+        raise RuntimeError("CachedBackend is a snapshot; submit through live()")
+
+
+def live_backend(backend):
+    """The submittable backend behind a CachedBackend (others pass through)."""
+    return backend.live() if isinstance(backend, CachedBackend) else backend
+
+
+def _snapshot_paths(name, directory):
+    return os.path.join(directory, f"{name}.json"), os.path.join(directory, f"{name}.target.pkl")
+
+
+def save_snapshot(backend, directory=BACKEND_CACHE_DIR):
+    os.makedirs(directory, exist_ok=True)
+    summary = calibration_summary(backend)
+    meta_path, target_path = _snapshot_paths(backend.name, directory)
+    for path, payload, mode in (
+        (target_path, pickle.dumps(backend.target), "wb"),
+        (meta_path, json.dumps(summary), "w"),
+    ):
+        with atomic_open(path, mode) as fd:
+            fd.write(payload)
+    return summary
+
+
+def load_snapshot(name, directory=BACKEND_CACHE_DIR):
+    """CachedBackend from disk, or None when there is no snapshot."""
+    meta_path, target_path = _snapshot_paths(name, directory)
+    if not (os.path.exists(meta_path) and os.path.exists(target_path)):
+        return None
+    with open(meta_path) as fd:
+        summary = json.load(fd)
+    with open(target_path, "rb") as fd:
+        target = pickle.load(fd)
+    return CachedBackend(summary, target)
+
+
+@traced("backend")
+def load_backend(name=DEFAULT_BACKEND, max_age=SNAPSHOT_TTL_S, refresh=False,
+                 service=None, directory=BACKEND_CACHE_DIR):
+    """
+    Replaces `QiskitRuntimeService().backend(name)` at script startup.
+    Fresh snapshots load from disk without a network round trip; stale
+    ones are refreshed, falling back to the stale copy when offline.
+    """
+    cached = None if refresh else load_snapshot(name, directory)
+    if cached is not None and cached.age <= max_age:
+        cached._service = service
+        return cached
+
+    try:
+        if service is None:
+            from qiskit_ibm_runtime import QiskitRuntimeService
+            service = QiskitRuntimeService()
+        backend = service.backend(name)
+    except Exception as err:
+        if cached is None:
+            raise
+        print(f"[!] Could not refresh {name} ({err}); using a {cached.age / 3600:.1f} h old snapshot")
+        return cached
+
+    save_snapshot(backend, directory)
+    fresh = load_snapshot(name, directory)
+    fresh._service = service
+    fresh._live = backend
+    return fresh
+
+
+# --- CALIBRATION QUERIES ---
+# Metrics where larger is better; every other metric is an error rate.
+HIGHER_IS_BETTER = ("t1", "t2")
+
+
+class CalibrationIndex:
+    """
+    Sorted views over one calibration summary, for picking hubs and spokes.
+    Missing values rank last.
+    """
+    def __init__(self, summary):
+        self.summary = summary
+        self.num_qubits = summary["num_qubits"]
+        self.metrics = {
+            key: np.array([np.nan if q[key] is None else q[key] for q in summary["qubits"]], dtype=float)
+            for key in summary["qubits"][0]
+        }
+        self.edge_error = {}
+        self.neighbours = {q: [] for q in range(self.num_qubits)}
+        for key, err in summary["edges"].items():
+            a, b = map(int, key.split(","))
+            for u, v in ((a, b), (b, a)):
+                if (u, v) not in self.edge_error:
+                    self.neighbours[u].append(v)
+                self.edge_error[(u, v)] = max(self.edge_error.get((u, v), 0.0), err)
+        self._order = {}
+
+    def ranking(self, metric):
+        """All qubits, best first, by one metric."""
+        if metric not in self._order:
+            values = self.metrics[metric]
+            key = -values if metric in HIGHER_IS_BETTER else values
+            self._order[metric] = np.argsort(np.where(np.isnan(key), np.inf, key), kind="stable")
+        return self._order[metric]
+
+    def best_qubits(self, metric="t2", k=1, exclude=()):
+        excluded = set(exclude)
+        return [int(q) for q in self.ranking(metric) if int(q) not in excluded][:k]
+
+    def best_neighbours(self, qubit, k=None):
+        """Coupled qubits ordered by two-qubit gate error."""
+        ranked = sorted(self.neighbours[qubit], key=lambda nb: self.edge_error[(qubit, nb)])
+        return ranked if k is None else ranked[:k]
+
+    def best_edges(self, k=1):
+        pairs = sorted((err, a, b) for (a, b), err in self.edge_error.items() if a < b)
+        return [(a, b) for _, a, b in pairs[:k]]
+
+
+def calibration_index(backend):
+    """CalibrationIndex of a CachedBackend (reused) or any live / fake backend."""
+    if isinstance(backend, CachedBackend):
+        if getattr(backend, "_index", None) is None:
+            backend._index = CalibrationIndex(backend.summary)
+        return backend._index
+    return CalibrationIndex(calibration_summary(backend))
@@ -0,0 +1,220 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from importlib import import_module
+
+from tracing import span, traced
+
+# --- PROTOCOL REGISTRY ---
+# Modules are referenced by name and only imported when a batch needs them.
+
+
+@dataclass(frozen=True)
+class ProtocolSpec:
+    """
+    How to build, compile and analyze one protocol inside a batch.
+
+    analyzer:       function in `module` applied to the protocol's PUB result
+    analyzer_input: 'meas'   -> analyzer(pub_result.data.meas)
+                    'result' -> analyzer([pub_result]) (single-PUB job layout)
+    mitigable:      the analyzer also accepts a counts / quasi mapping, so
+                    readout-mitigated 'meas' data can be passed instead
+    """
+    name: str
+    module: str
+    builder: str
+    shots: int
+    optimization_level: int = None
+    analyzer: str = None
+    analyzer_input: str = "result"
+    mitigable: bool = False
+
+    def build(self):
+        with span("build", protocol=self.name):
+            return getattr(import_module(self.module), self.builder)()
+
+    def analyze(self, pub_result, mitigate=None):
+        """mitigate(meas) -> quasi mapping is applied first for mitigable protocols."""
+        if self.analyzer is None:
+            return None
+        analyzer = getattr(import_module(self.module), self.analyzer)
+        with span("analyze", protocol=self.name):
+            if mitigate is not None and self.mitigable:
+                return analyzer(mitigate(pub_result.data.meas))
+            if self.analyzer_input == "meas":
+                return analyzer(pub_result.data.meas)
+            return analyzer([pub_result])
+
+
+PROTOCOLS = OrderedDict((spec.name, spec) for spec in [
+    ProtocolSpec("omega_point", "omega_point", "build_star_topology", 4096, 3,
+                 analyzer="analyze_consensus", analyzer_input="meas", mitigable=True),
+    ProtocolSpec("gemini_hardline", "gemini_hardline", "build_gemini_bridge", 4096,
+                 analyzer="analyze_bridge", mitigable=True),
+    ProtocolSpec("teleport", "teleport_protocol", "build_teleportation_circuit", 8192,
+                 analyzer="analyze_teleportation"),
+    ProtocolSpec("anyon_braid", "anyon_braid_protocol", "build_anyon_braid", 8192),
+    ProtocolSpec("anyon_distillation", "anyon_distillation", "build_distillation_circuit", 8192),
+    ProtocolSpec("anyon_interferometry", "anyon_interferometry", "build_interferometer", 8192),
+    ProtocolSpec("majorana_braid", "majorana_braid", "build_majorana_braid", 8192),
+    ProtocolSpec("fusion_verification", "fusion_verification", "build_fusion_circuit", 8192),
+    ProtocolSpec("layer_code", "layer_code_protocol", "build_layer_code", 8192),
+    ProtocolSpec("surface_braid", "surface_braid_protocol", "build_surface_braid", 8192),
+    ProtocolSpec("hypercube", "hypercube_protocol", "build_3d_lattice", 4096),
+    ProtocolSpec("hypercube_20q", "hypercube_protocol_20q", "build_hypercube_20q", 10000, 3,
+                 analyzer="analyze_councils", analyzer_input="meas", mitigable=True),
+    ProtocolSpec("tesseract", "tesseract_10e6_gain", "build_tesseract_40q", 20000, 3,
+                 analyzer="analyze_councils", analyzer_input="meas", mitigable=True),
+    ProtocolSpec("gain_validation", "gain_validation_10k", "build_consensus_council_circuit", 8192, 3),
+    ProtocolSpec("osiris_bridge", "osiris_bridge", "build_osiris_crossing", 8192, 3),
+    ProtocolSpec("planck_pulse", "planck_pulse", "build_planck_pulse", 4096),
+    ProtocolSpec("final_signature", "final_signature", "build_signature_chain", 1),
+])
+
+
+def group_by_shots(specs):
+    """{shots: [spec, ...]} preserving the requested order inside each group."""
+    groups = OrderedDict()
+    for spec in specs:
+        groups.setdefault(spec.shots, []).append(spec)
+    return groups
+
+
+def compile_group(specs, backend):
+    """
+    Transpiles a group, one cached batch per optimization level.
+    backend=None keeps the logical circuits (offline samplers, e.g. the
+    stabilizer sampler in CI).
+    """
+    if backend is None:
+        return [spec.build() for spec in specs]
+    from transpile_cache import cached_transpile
+
+    compiled = [None] * len(specs)
+    levels = OrderedDict()
+    for i, spec in enumerate(specs):
+        levels.setdefault(spec.optimization_level, []).append(i)
+    for level, indices in levels.items():
+        isa = cached_transpile(
+            [specs[i].build() for i in indices], backend=backend, optimization_level=level
+        )
+        for i, qc in zip(indices, isa):
+            compiled[i] = qc
+    return compiled
+
+
+@traced("batch")
+def run_batch(names, backend, sampler=None, max_pubs_per_job=None, ledger=None, mitigate=False, manager=None):
+    """
+    Packs the named protocols into as few multi-PUB SamplerV2 jobs as
+    possible (one per shot count, optionally capped at `max_pubs_per_job`)
+    and routes each PUB result back to its protocol's analyzer.
+
+    `sampler` may be any SamplerV2-compatible primitive; it defaults to the
+    runtime Sampler on `backend` (a fake backend runs locally). With
+    backend=None the logical circuits go to `sampler` untranspiled.
+    Jobs go through a job_manager.JobManager (`manager`, default: one
+    recording into `ledger`, else the shared job ledger), so a failed job
+    only loses its own protocols: they come back with analysis None and
+    the job's state / error.
+    mitigate=True analyzes mitigable protocols on readout-mitigated
+    quasi-counts. The two calibration PUBs for qubits not yet calibrated
+    this epoch are appended to the first submitted job and so run at that
+    job's shot count (the shots of the first requested protocol); the
+    ledger records them as 'readout_calibration'. If that job fails, the
+    mitigable protocols of the other jobs keep their pub_result but come
+    back with analysis None and an error rather than silently unmitigated.
+    Returns {name: {"job_id", "state", "error", "pub_result", "analysis"}}.
+    """
+    from job_manager import JobManager, JobRequest, run_jobs
+
+    specs = [PROTOCOLS[name] for name in names]
+    manager = manager or JobManager(ledger)
+    if sampler is None:
+        from backend_cache import live_backend
+        from qiskit_ibm_runtime import SamplerV2 as Sampler
+        sampler = Sampler(mode=live_backend(backend))
+
+    groups = [(shots, group, compile_group(group, backend)) for shots, group in group_by_shots(specs).items()]
+
+    # Readout calibration PUBs (only for qubits missing from this epoch's cache)
+    readout_qubits, calibration_pubs = OrderedDict(), []
+    if mitigate:
+        from readout_mitigation import calibrate, measured_qubits
+        for _, group, isa_circuits in groups:
+            for spec, qc in zip(group, isa_circuits):
+                if spec.mitigable:
+                    readout_qubits[spec.name] = (qc, measured_qubits(qc))
+        if readout_qubits:
+            calibration, calibration_pubs, calibrated = calibrate(
+                [qc for qc, _ in readout_qubits.values()], backend
+            )
+
+    # Every packed job is queued at once; the manager keeps each backend
+    # within its concurrency limit
+    requests, members_of = [], []
+    for shots, group, isa_circuits in groups:
+        chunk = max_pubs_per_job or len(group)
+        for start in range(0, len(group), chunk):
+            members = group[start:start + chunk]
+            pubs = isa_circuits[start:start + chunk]
+            protocols = [spec.name for spec in members]
+            if calibration_pubs and not requests:
+                pubs = pubs + calibration_pubs
+                protocols += ["readout_calibration"] * len(calibration_pubs)
+            label = f"Packed {len(members)} protocols @ {shots} shots"
+            requests.append(JobRequest(protocols, pubs, shots, backend, sampler, label))
+            members_of.append(members)
+    jobs = run_jobs(requests, manager)
+
+    mitigators, unmitigated = {}, None
+    if readout_qubits and calibration_pubs and not jobs[0].ok:
+        unmitigated = f"readout calibration job {jobs[0].state} ({jobs[0].error}); not analyzed unmitigated"
+    elif readout_qubits:
+        from readout_mitigation import mitigate as mitigate_readout, save_calibration
+        if calibration_pubs:
+            first = jobs[0].result
+            calibration.update(calibrated, first[len(first) - 2].data.meas, first[len(first) - 1].data.meas)
+            save_calibration(calibration)
+        mitigators = {
+            name: (lambda meas, q=q: mitigate_readout(meas, calibration, q))
+            for name, (_, q) in readout_qubits.items()
+        }
+
+    outcomes = OrderedDict()
+    for members, job in zip(members_of, jobs):
+        results = job.result if job.ok else [None] * len(members)
+        for spec, pub_result in zip(members, results):
+            error = job.error
+            if pub_result is not None and spec.name in readout_qubits and unmitigated:
+                analysis, error = None, unmitigated
+            else:
+                analysis = None if pub_result is None else spec.analyze(pub_result, mitigators.get(spec.name))
+            outcomes[spec.name] = {
+                "job_id": job.job_id,
+                "state": job.state,
+                "error": error,
+                "pub_result": pub_result,
+                "analysis": analysis,
+            }
+    return OrderedDict((name, outcomes[name]) for name in names)
+
+
+def main():
+    print("--- BATCH RUNNER: PACKED DAILY REGRESSION ---")
+    from backend_cache import load_backend
+    backend = load_backend("ibm_torino")
+
+    outcomes = run_batch(list(PROTOCOLS), backend)
+
+    print(f"\n[RESULTS]")
+    for name, outcome in outcomes.items():
+        analysis = outcome["analysis"]
+        if outcome["state"] != "DONE" or outcome["error"]:
+            summary = f"{outcome['state']}: {outcome['error']}"
+        else:
+            summary = "submitted" if analysis is None else f"{analysis:.4f}"
+        print(f"   > {name:<22} {outcome['job_id']}  {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from importlib import import_module
+from inspect import getmembers, isfunction, signature
+
+import numpy as np
+import qiskit
+from qiskit import QuantumCircuit, transpile
+from qiskit.primitives import BitArray, DataBin, SamplerPubResult
+
+from consensus_decoder import VoteRule
+from shot_analysis import decode_shots
+
+# --- BENCHMARK GRID ---
+# Council sizes and shot counts the pipeline is expected to scale to.
+# Synthetic shot arrays above MAX_SYNTHETIC_BYTES are skipped (and reported
+# as skipped) so a full run fits on a workstation.
+COUNCIL_SIZES = (10, 30, 100, 300, 1000)
+SHOT_COUNTS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+QUICK_COUNCIL_SIZES = (10, 100)
+QUICK_SHOT_COUNTS = (1_000, 100_000)
+MAX_SYNTHETIC_BYTES = 1 << 30
+REPEATS = 3
+
+BUILDER_MODULES = (
+    "omega_point", "gemini_hardline", "teleport_protocol", "chronos_protocol",
+    "anyon_braid_protocol", "anyon_distillation", "anyon_interferometry",
+    "majorana_braid", "fusion_verification", "layer_code_protocol",
+    "surface_braid_protocol", "hypercube_protocol", "hypercube_protocol_20q",
+    "tesseract_10e6_gain", "gain_validation_10k", "osiris_bridge",
+    "planck_pulse", "final_signature", "quantum_refresh",
+)
+# Positional arguments for builders without usable defaults
+BUILDER_ARGS = {
+    "build_time_crystal_step": (6,),
+}
+# Builders that need a backend are compile steps; they run in the transpile group
+BACKEND_BUILDERS = ("build_depth_batch",)
+
+
+def measure(func, repeats=REPEATS):
+    """
+    Wall time (min / median over `repeats` untraced runs), then one
+    tracemalloc run for peak bytes and blocks still allocated at the end.
+    """
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(max(stat.count_diff, 0) for stat in after.compare_to(before, "filename"))
+    return {
+        "wall_s_min": min(times),
+        "wall_s_median": statistics.median(times),
+        "peak_bytes": peak,
+        "allocated_blocks": allocated,
+    }
+
+
+def quiet(func):
+    """Wraps a callable so analyzer progress prints don't flood the report."""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return run
+
+
+def fake_backend():
+    from qiskit_ibm_runtime.fake_provider import FakeTorino
+    return FakeTorino()
+
+
+def build_council(num_qubits):
+    """Star council of any size: H on the anchor, CNOT fan-out, measure."""
+    qc = QuantumCircuit(num_qubits)
+    qc.h(0)
+    for senator in range(1, num_qubits):
+        qc.cx(0, senator)
+    qc.measure_all()
+    return qc
+
+
+def synthetic_bits(num_bits, shots, rng, leading_shape=()):
+    """Uniformly random BitArray in SamplerV2 layout."""
+    nbytes = (num_bits + 7) // 8
+    array = rng.integers(0, 256, size=leading_shape + (shots, nbytes), dtype=np.uint8)
+    if num_bits % 8:
+        array[..., 0] &= (1 << (num_bits % 8)) - 1
+    return BitArray(array, num_bits)
+
+
+def synthetic_pub_result(num_bits, shots, rng, register="meas"):
+    data = {register: synthetic_bits(num_bits, shots, rng)}
+    return SamplerPubResult(DataBin(**data, shape=()), metadata={"shots": shots})
+
+
+def discover_builders():
+    """Every module-level build_* function in BUILDER_MODULES."""
+    builders = []
+    for module_name in BUILDER_MODULES:
+        module = import_module(module_name)
+        for name, func in getmembers(module, isfunction):
+            if not name.startswith("build_") or func.__module__ != module_name:
+                continue
+            builders.append((module_name, name, func))
+    return builders
+
+
+def _required_params(func):
+    return [
+        p for p in signature(func).parameters.values()
+        if p.default is p.empty and p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+    ]
+
+
+def bench_builders(config):
+    backend = fake_backend()
+    records = []
+    for module_name, name, func in discover_builders():
+        if name in BACKEND_BUILDERS:
+            continue
+        required = [p.name for p in _required_params(func)]
+        args = (backend,) if required[:1] == ["backend"] else BUILDER_ARGS.get(name, ())
+        if len(required) > len(args):
+            records.append({"name": f"{module_name}.{name}", "skipped": "needs arguments"})
+            continue
+        stats = measure(quiet(lambda: func(*args)), config["repeats"])
+        records.append({"name": f"{module_name}.{name}", **stats})
+
+    for n in config["council_sizes"]:
+        stats = measure(lambda: build_council(n), config["repeats"])
+        records.append({"name": "build_council", "num_qubits": n, **stats})
+    return records
+
+
+def bench_transpile(config):
+    from batch_runner import PROTOCOLS
+    from chronos_protocol import MAX_CYCLES, build_chronos_template, slice_cycle_depth
+
+    backend = fake_backend()
+    records = []
+    # Uncached on purpose: qiskit.transpile, not cached_transpile
+    for spec in PROTOCOLS.values():
+        qc = quiet(spec.build)()
+        level = spec.optimization_level
+        stats = measure(lambda: transpile(qc, backend=backend, optimization_level=level), 1)
+        records.append({"name": spec.name, "optimization_level": level, "num_qubits": qc.num_qubits, **stats})
+
+    # build_depth_batch() without its cached_transpile: one template compile, then slicing
+    template = build_chronos_template()
+
+    def depth_batch():
+        isa_template = transpile(template, backend=backend)
+        return [slice_cycle_depth(isa_template, depth) for depth in range(1, MAX_CYCLES + 1)]
+
+    records.append({"name": "chronos_protocol.build_depth_batch", "num_qubits": template.num_qubits,
+                    **measure(depth_batch, 1)})
+
+    for n in config["council_sizes"]:
+        if n > backend.num_qubits:
+            records.append({"name": "build_council", "num_qubits": n,
+                            "skipped": f"larger than {backend.name} ({backend.num_qubits} qubits)"})
+            continue
+        qc = build_council(n)
+        stats = measure(lambda: transpile(qc, backend=backend, optimization_level=1), 1)
+        records.append({"name": "build_council", "num_qubits": n, "optimization_level": 1, **stats})
+    return records
+
+
+def bench_analyzers(config):
+    from chronos_protocol import analyze_chronos
+    from gemini_hardline import analyze_bridge
+    from omega_point import analyze_consensus
+    from teleport_protocol import analyze_teleportation
+
+    rng = np.random.default_rng(config["seed"])
+    records = []
+    for shots in config["shot_counts"]:
+        meas = synthetic_bits(10, shots, rng)
+        bridge = [synthetic_pub_result(20, shots, rng)]
+        chronos = [synthetic_pub_result(10, shots, rng) for _ in range(6)]
+        teleport = [synthetic_pub_result(3, shots, rng, register="c")]
+        cases = [
+            ("analyze_consensus", lambda: analyze_consensus(meas)),
+            ("analyze_bridge", lambda: analyze_bridge(bridge)),
+            ("analyze_chronos", lambda: analyze_chronos(chronos, 6)),
+            ("analyze_teleportation", lambda: analyze_teleportation(teleport)),
+        ]
+        for name, func in cases:
+            records.append({"name": name, "shots": shots, **measure(quiet(func), config["repeats"])})
+        del meas, bridge, chronos, teleport
+
+    # Decoder scaling over council size: the analyzers' core, any width
+    for n in config["council_sizes"]:
+        rule = VoteRule(n, erasure_band=(3 * n // 10, 7 * n // 10))
+        for shots in config["shot_counts"]:
+            nbytes = shots * ((n + 7) // 8)
+            if nbytes > config["max_bytes"]:
+                records.append({"name": "decode_shots", "num_qubits": n, "shots": shots,
+                                "skipped": f"{nbytes} bytes of synthetic shots"})
+                continue
+            data = synthetic_bits(n, shots, rng)
+            stats = measure(lambda: decode_shots(data, rule), config["repeats"])
+            records.append({"name": "decode_shots", "num_qubits": n, "shots": shots, **stats})
+            del data
+    return records
+
+
+BENCHMARK_GROUPS = {
+    "build": bench_builders,
+    "transpile": bench_transpile,
+    "analyze": bench_analyzers,
+}
+
+
+def environment():
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "qiskit": qiskit.__version__,
+    }
+
+
+def run_benchmarks(groups=tuple(BENCHMARK_GROUPS), quick=False, repeats=REPEATS,
+                   max_bytes=MAX_SYNTHETIC_BYTES, seed=0):
+    """Runs the selected groups; returns the JSON-ready report."""
+    config = {
+        "council_sizes": QUICK_COUNCIL_SIZES if quick else COUNCIL_SIZES,
+        "shot_counts": QUICK_SHOT_COUNTS if quick else SHOT_COUNTS,
+        "repeats": 1 if quick else repeats,
+        "max_bytes": max_bytes,
+        "seed": seed,
+    }
+    report = {"environment": environment(), "config": config, "groups": {}}
+    for group in groups:
+        print(f"[*] Benchmarking {group}...")
+        report["groups"][group] = BENCHMARK_GROUPS[group](config)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Builder / transpile / analyzer benchmarks")
+    parser.add_argument("--groups", nargs="+", choices=list(BENCHMARK_GROUPS), default=list(BENCHMARK_GROUPS))
+    parser.add_argument("--quick", action="store_true", help="small grid, one repeat")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--max-bytes", type=int, default=MAX_SYNTHETIC_BYTES)
+    parser.add_argument("--output", default="-", help="JSON file (default: stdout)")
+    args = parser.parse_args()
+
+    print("--- BENCHMARK SUITE: SCALING CURVES ---", file=sys.stderr)
+    with contextlib.redirect_stdout(sys.stderr):
+        report = run_benchmarks(args.groups, args.quick, args.repeats, args.max_bytes)
+
+    payload = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(payload)
+    else:
+        with open(args.output, "w") as fd:
+            fd.write(payload + "\n")
+        print(f"[*] Report written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import contextlib
+import functools
+import os
+
+# --- SHARED CACHE LAYOUT ---
+# Every on-disk cache lives in its own directory under CACHE_ROOT, which
+# its own environment variable can point elsewhere. Entries are written
+# through a per-process temp file and os.replace(), so a crashed or
+# concurrent writer never leaves a half-written file under the real name.
+CACHE_ROOT = os.path.join(os.path.expanduser("~"), ".cache", "consensus-quantum-protocol")
+
+
+def cache_dir(env_var, name):
+    """$env_var when set, else CACHE_ROOT/name."""
+    return os.environ.get(env_var, os.path.join(CACHE_ROOT, name))
+
+
+@contextlib.contextmanager
+def atomic_open(path, mode="w"):
+    """open() for writing whose file only appears at `path` once complete."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, mode) as fd:
+            yield fd
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def process_default(factory):
+    """
+    Decorator for default_x() accessors: the instance is built on first
+    call and shared for the rest of the process (factory.cache_clear()
+    drops it, e.g. after changing the cache directory).
+    """
+    return functools.lru_cache(maxsize=None)(factory)
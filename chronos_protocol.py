@@ -1,7 +1,14 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import ClassicalRegister, QuantumCircuit
+from qiskit.circuit import Parameter
+from qiskit.converters import circuit_to_dag
+from backend_cache import live_backend, load_backend
+from consensus_decoder import CHRONOS_RULE, VOTE_ZERO
+from floquet_engine import consensus_magnetization
+from shot_analysis import decode_shots, packed_shots, register_weights
+from job_ledger import record_submission
+from transpile_cache import cached_transpile
+from tracing import span, traced, traced_sampler
 
 # --- THE PERTURBATION (The Test) ---
 # We deliberately use a "bad" pulse. 
@@ -9,10 +16,18 @@ from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
 # In a normal system, this error would accumulate and destroy the rhythm.
 DELTA = 0.3
 PULSE_ANGLE = np.pi + DELTA
+MAX_CYCLES = 6
 
-def build_time_crystal_step(cycle_depth):
+# --- PARAMETERIZED TEMPLATE MODE ---
+# The drive error is a circuit Parameter, so a single compiled template
+# serves every delta of a sweep (bound through the SamplerV2 parameter array).
+DELTA_PARAM = Parameter("delta")
+MARKER_PREFIX = "cycle_"
+
+def build_time_crystal_step(cycle_depth, delta=DELTA):
     """
     Constructs the Council for a specific time step (depth).
+    delta may be a Parameter (e.g. DELTA_PARAM) for sweeps.
     """
     qc = QuantumCircuit(10) # 10 Qubit Star Cluster
     
@@ -22,7 +37,7 @@ def build_time_crystal_step(cycle_depth):
         
         # 1. The Imperfect Global Drive (The Kick)
         # This tries to flip everyone, but over-rotates.
-        qc.rx(PULSE_ANGLE, range(10))
+        qc.rx(np.pi + delta, range(10))
         
         # 2. The Interaction (The Star Glue)
         # We entangle the Anchor (0) with Senators (1-9) to synchronize them.
@@ -35,9 +50,75 @@ def build_time_crystal_step(cycle_depth):
     qc.measure_all()
     return qc
 
-def analyze_chronos(job_result, total_cycles):
+def apply_floquet_cycle(qc, delta):
+    """
+    One Floquet cycle: the imperfect rx(pi + delta) kick, the star CZ glue
+    and a barrier closing the time step.
+    """
+    qc.rx(np.pi + delta, range(10))
+    qc.cz(0, range(1, 10))
+    qc.barrier()
+
+def build_chronos_template(max_cycles=MAX_CYCLES, delta=DELTA_PARAM):
+    """
+    Stacks `max_cycles` parameterized cycles into one circuit.
+    After each cycle the council is measured into a marker register
+    ('cycle_<d>'). Markers travel through layout and routing with their
+    qubits, so the compiled template records where every logical qubit
+    sits at each cycle boundary.
+    """
+    qc = QuantumCircuit(10)
+    for depth in range(1, max_cycles + 1):
+        apply_floquet_cycle(qc, delta)
+        marker = ClassicalRegister(10, f"{MARKER_PREFIX}{depth}")
+        qc.add_register(marker)
+        qc.measure(range(10), marker)
+    return qc
+
+def slice_cycle_depth(isa_template, depth):
+    """
+    Cuts the depth-`depth` circuit out of a compiled template.
+    Keeps every instruction the cycle-`depth` markers depend on, drops the
+    earlier markers and turns the final ones into the 'meas' readout.
+    """
+    dag = circuit_to_dag(isa_template)
+    marker_name = f"{MARKER_PREFIX}{depth}"
+
+    readout = {}
+    for node in dag.op_nodes():
+        if node.op.name != "measure":
+            continue
+        register, index = isa_template.find_bit(node.cargs[0]).registers[0]
+        if register.name == marker_name:
+            readout[node] = index
+
+    keep = set(readout)
+    for node in readout:
+        keep.update(dag.ancestors(node))
+
+    meas = ClassicalRegister(len(readout), "meas")
+    qc = QuantumCircuit(*isa_template.qregs, meas, global_phase=isa_template.global_phase)
+    for node in dag.topological_op_nodes():
+        if node not in keep:
+            continue
+        if node in readout:
+            qc.measure(node.qargs[0], meas[readout[node]])
+        elif node.op.name != "measure":
+            qc.append(node.op, node.qargs)
+    return qc
+
+def build_depth_batch(backend, max_cycles=MAX_CYCLES, **options):
+    """
+    ISA circuits for depths 1..max_cycles from ONE transpilation.
+    Every circuit still carries DELTA_PARAM.
+    """
+    isa_template = cached_transpile(build_chronos_template(max_cycles), backend=backend, **options)
+    return [slice_cycle_depth(isa_template, depth) for depth in range(1, max_cycles + 1)]
+
+def analyze_chronos(job_result, total_cycles, reference=None):
     """
     Checks if the system oscillates with Period 2 despite the error.
+    reference: ideal magnetization per cycle (floquet_engine), printed alongside.
     """
     magnetizations = []
     
@@ -46,55 +127,74 @@ def analyze_chronos(job_result, total_cycles):
     # Iterate through the results for each cycle (0 to 5)
     for i in range(total_cycles):
         pub_result = job_result[i]
-        counts = pub_result.data.meas.get_counts()
-        total_shots = sum(counts.values())
-        
+
         # Calculate Average Magnetization (M)
         # M = (Count_0 - Count_1) / Total
         # +1 = All |0>, -1 = All |1>
-        weighted_mag = 0
-        for bitstring, count in counts.items():
-            # Consensus Vote on the bitstring
-            ones = bitstring.count('1')
-            zeros = bitstring.count('0')
-            
-            # If Majority 0, vote +1. If Majority 1, vote -1.
-            vote = 1 if zeros > ones else -1
-            weighted_mag += vote * count
-            
-        avg_mag = weighted_mag / total_shots
+        # Consensus Vote on each outcome: majority 0 votes +1, otherwise -1.
+        avg_mag = decode_shots(pub_result.data.meas, CHRONOS_RULE).magnetization
         magnetizations.append(avg_mag)
         
         # Visual indicator
         bar = "#" * int(abs(avg_mag) * 20)
         sign = "+" if avg_mag > 0 else "-"
-        print(f"   > Cycle {i+1}: M = {sign}{abs(avg_mag):.4f} |{bar}")
+        ideal = "" if reference is None else f"  (ideal {reference[i]:+.4f})"
+        print(f"   > Cycle {i+1}: M = {sign}{abs(avg_mag):.4f}{ideal} |{bar}")
 
     return magnetizations
 
+def analyze_depth(pub_result):
+    """Consensus magnetization of one depth PUB (an array over its bound deltas)."""
+    return decode_shots(pub_result.data.meas, CHRONOS_RULE).magnetization
+
+def analyze_chronos_sweep(job_result, total_cycles):
+    """
+    Vectorized magnetization for delta sweeps.
+    Returns an array of shape (total_cycles, n_deltas).
+    """
+    magnetizations = []
+    for i in range(total_cycles):
+        packed, num_bits, _ = packed_shots(job_result[i].data.meas)
+        votes = CHRONOS_RULE.decide(register_weights(packed, num_bits))
+        magnetizations.append(np.where(votes == VOTE_ZERO, 1.0, -1.0).mean(axis=-1))
+    return np.array(magnetizations)
+
+def run_delta_sweep(backend, deltas, max_cycles=MAX_CYCLES, shots=4096):
+    """
+    Sweeps the drive error over `deltas` for every depth 1..max_cycles.
+    One transpilation, one job: each depth is a PUB bound to all deltas.
+    """
+    circuits = build_depth_batch(backend, max_cycles)
+    delta_values = np.asarray(deltas, dtype=float).reshape(-1, 1)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = Sampler(mode=live_backend(backend))
+    job = sampler.run([(qc, delta_values) for qc in circuits], shots=shots)
+    print(f"[*] Sweep Job ID: {job.job_id()}")
+    record_submission(job, "chronos_sweep", circuits, backend, shots)
+    return analyze_chronos_sweep(job.result(), max_cycles)
+
+@traced("chronos_protocol")
 def main():
     print("--- PROTOCOL Z.11: CHRONOS (Time Crystal) ---")
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino")
-    
-    MAX_CYCLES = 6
-    circuits = []
+    backend = load_backend("ibm_torino")
     
     print(f"[*] Building {MAX_CYCLES} Time Steps with perturbation delta={DELTA}...")
-    for i in range(1, MAX_CYCLES + 1):
-        qc = build_time_crystal_step(i)
-        circuits.append(qc)
+    # One compiled template, sliced into every depth
+    with span("build"):
+        circuits = build_depth_batch(backend, MAX_CYCLES)
     
     print(f"[*] Submitting Batch to {backend.name}...")
-    pm = transpile(circuits, backend=backend)
-    sampler = Sampler(mode=backend)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = traced_sampler(Sampler(mode=live_backend(backend)))
     
     # Submit all 6 steps as one job
-    job = sampler.run(pm, shots=4096)
+    job = sampler.run([(qc, [DELTA]) for qc in circuits], shots=4096)
     print(f"[*] Job ID: {job.job_id()}")
+    record_submission(job, "chronos", circuits, backend, 4096)
     
     result = job.result()
-    mags = analyze_chronos(result, MAX_CYCLES)
+    with span("analyze"):
+        mags = analyze_chronos(result, MAX_CYCLES, consensus_magnetization(MAX_CYCLES, DELTA))
     
     # Check for Period 2 Oscillation (Sign flip every step)
     is_time_crystal = True
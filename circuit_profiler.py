@@ -0,0 +1,195 @@
+import argparse
+import contextlib
+import json
+import sys
+from collections import defaultdict
+
+from qiskit import QuantumCircuit, transpile
+from qiskit.transpiler import PassManager
+from qiskit.transpiler.passes import ALAPScheduleAnalysis, PadDelay
+
+from benchmarks import BACKEND_BUILDERS, BUILDER_ARGS, _required_params, discover_builders, environment, quiet
+from transpile_cache import scratch_cache
+
+# --- COMPILED-CIRCUIT PROFILE ---
+# Every build_* output is transpiled (fixed seed, so reruns are comparable)
+# and ALAP-scheduled against one backend. Per circuit:
+#   depth / two_qubit_depth, two_qubit_count
+#   swaps:           SWAPs the router inserted (before basis translation)
+#   extra_two_qubit: compiled minus logical two-qubit gates
+#   duration_s:      scheduled duration
+#   idle_s:          per physical qubit, time between its first and last
+#                    operation spent waiting (decoherence exposure)
+# Builders in BACKEND_BUILDERS already return ISA circuits: those are only
+# scheduled (swaps / extra_two_qubit / logical_depth are None). Builders run
+# under a scratch transpile cache, so profiling never fills the shared one.
+# Regression mode compares against a saved report and fails when depth or
+# duration grows by more than the threshold.
+SEED = 1234
+REGRESSION_THRESHOLD = 0.05
+REGRESSION_METRICS = ("depth", "duration_s")
+NON_GATES = ("barrier", "delay")
+
+
+def two_qubit_gates(qc):
+    return sum(
+        1 for instruction in qc.data
+        if len(instruction.qubits) == 2 and instruction.operation.name not in NON_GATES
+    )
+
+
+def builder_circuits(backend):
+    """[(name, circuit, initial_layout, is_isa)] for every discoverable build_* output."""
+    circuits = []
+    for module_name, name, func in discover_builders():
+        label = f"{module_name}.{name}"
+        required = [p.name for p in _required_params(func)]
+        if name in BACKEND_BUILDERS or required[:1] == ["backend"]:
+            args = (backend,)
+        else:
+            args = BUILDER_ARGS.get(name, ())
+        if len(required) > len(args):
+            print(f"[!] Skipping {label}: needs arguments")
+            continue
+        with scratch_cache():
+            built = quiet(lambda: func(*args))()
+        layout = None
+        if isinstance(built, tuple):
+            built, layout = built
+        is_isa = name in BACKEND_BUILDERS
+        if isinstance(built, QuantumCircuit):
+            circuits.append((label, built, layout, is_isa))
+        else:
+            circuits.extend((f"{label}[{i}]", qc, layout, is_isa) for i, qc in enumerate(built))
+    return circuits
+
+
+def idle_times(scheduled, durations, dt):
+    """{physical qubit: idle seconds between its first and last operation}."""
+    busy = defaultdict(float)
+    span = {}
+    for instruction, start in zip(scheduled.data, scheduled.op_start_times):
+        if instruction.operation.name in NON_GATES:
+            continue
+        qubits = [scheduled.find_bit(q).index for q in instruction.qubits]
+        length = durations.get(instruction.operation, qubits, unit="dt")
+        for q in qubits:
+            busy[q] += length
+            first, last = span.get(q, (start, start + length))
+            span[q] = (min(first, start), max(last, start + length))
+    return {q: (last - first - busy[q]) * dt for q, (first, last) in sorted(span.items())}
+
+
+def profile_circuit(qc, backend, optimization_level=None, initial_layout=None, seed=SEED, is_isa=False):
+    """Compiled metrics of one logical circuit (or, with is_isa, an already compiled one) on `backend`."""
+    target = backend.target
+    swaps = [0]
+
+    def count_swaps(dag, **_):
+        swaps[0] = max(swaps[0], dag.count_ops().get("swap", 0))
+
+    if is_isa:
+        compiled = PassManager([ALAPScheduleAnalysis(target=target), PadDelay(target=target)]).run(qc)
+    else:
+        compiled = transpile(
+            qc, backend=backend, optimization_level=optimization_level, initial_layout=initial_layout,
+            seed_transpiler=seed, scheduling_method="alap", callback=count_swaps,
+        )
+    idle = idle_times(compiled, target.durations(), target.dt)
+    compiled_two_qubit = two_qubit_gates(compiled)
+    return {
+        "num_qubits": qc.num_qubits,
+        "logical_depth": None if is_isa else qc.depth(),
+        "depth": compiled.depth(lambda instruction: instruction.operation.name != "delay"),
+        "two_qubit_depth": compiled.depth(
+            lambda instruction: len(instruction.qubits) == 2 and instruction.operation.name not in NON_GATES
+        ),
+        "two_qubit_count": compiled_two_qubit,
+        "swaps": None if is_isa else swaps[0],
+        "extra_two_qubit": None if is_isa else compiled_two_qubit - two_qubit_gates(qc),
+        "duration_s": compiled.estimate_duration(target),
+        "idle_s": {str(q): t for q, t in idle.items()},
+        "idle_s_total": sum(idle.values()),
+    }
+
+
+def _optimization_levels():
+    from batch_runner import PROTOCOLS
+    return {f"{spec.module}.{spec.builder}": spec.optimization_level for spec in PROTOCOLS.values()}
+
+
+def profile_builders(backend, optimization_level=None, names=None):
+    """JSON-ready report of every builder (or those whose name contains one of `names`)."""
+    levels = _optimization_levels()
+    circuits = {}
+    for label, qc, layout, is_isa in builder_circuits(backend):
+        if names and not any(name in label for name in names):
+            continue
+        if qc.num_qubits > backend.num_qubits:
+            circuits[label] = {"skipped": f"{qc.num_qubits} qubits > {backend.num_qubits}"}
+            continue
+        level = None if is_isa else optimization_level if optimization_level is not None else levels.get(label.split("[")[0])
+        print(f"[*] Profiling {label}...")
+        circuits[label] = {"optimization_level": level, **profile_circuit(qc, backend, level, layout, is_isa=is_isa)}
+    return {
+        "environment": environment(),
+        "backend": backend.name,
+        "seed": SEED,
+        "circuits": circuits,
+    }
+
+
+def regressions(report, baseline, threshold=REGRESSION_THRESHOLD, metrics=REGRESSION_METRICS):
+    """[(circuit, metric, baseline, current)] that grew by more than `threshold`."""
+    found = []
+    for label, current in report["circuits"].items():
+        previous = baseline.get("circuits", {}).get(label)
+        if previous is None or "skipped" in current or "skipped" in previous:
+            continue
+        for metric in metrics:
+            if current[metric] > previous[metric] * (1.0 + threshold):
+                found.append((label, metric, previous[metric], current[metric]))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Depth / 2-qubit / duration profile of every compiled builder")
+    parser.add_argument("--backend", default="fake", help="'fake' (FakeTorino) or a backend name")
+    parser.add_argument("--optimization-level", type=int, help="override the per-protocol levels")
+    parser.add_argument("--only", nargs="+", help="profile builders whose name contains one of these")
+    parser.add_argument("--output", default="-", help="JSON file (default: stdout)")
+    parser.add_argument("--baseline", help="earlier report: exit 1 if depth or duration regressed")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="allowed relative growth")
+    args = parser.parse_args()
+
+    print("--- CIRCUIT PROFILER: COMPILED DEPTH / DURATION ---", file=sys.stderr)
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.backend == "fake":
+            from benchmarks import fake_backend
+            backend = fake_backend()
+        else:
+            from backend_cache import load_backend
+            backend = load_backend(args.backend)
+        report = profile_builders(backend, args.optimization_level, args.only)
+
+    payload = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(payload)
+    else:
+        with open(args.output, "w") as fd:
+            fd.write(payload + "\n")
+        print(f"[*] Report written to {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as fd:
+            baseline = json.load(fd)
+        found = regressions(report, baseline, args.threshold)
+        for label, metric, previous, current in found:
+            print(f"[!] REGRESSION {label}: {metric} {previous:.6g} -> {current:.6g}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+        print(f"[*] No regressions beyond {args.threshold:.0%} against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
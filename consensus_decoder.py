@@ -0,0 +1,266 @@
+import numpy as np
+from dataclasses import dataclass
+from functools import lru_cache
+
+# --- DECODER CONFIGURATION ---
+# Councils up to this size are decoded through a full 2^N weight table.
+# Larger councils (the 40-qubit Tesseract) fall back to NumPy popcount.
+TABLE_MAX_BITS = 20
+
+# Vote values returned by VoteRule.decide()
+VOTE_ZERO = 0
+VOTE_ONE = 1
+VOTE_ERASED = -1
+
+TIE_POLICIES = ("erase", "zero", "one")
+
+BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+@lru_cache(maxsize=None)
+def popcount_table(num_bits):
+    """
+    Hamming weight of every integer in [0, 2^num_bits).
+    Built once per council size by doubling: w(x + 2^k) = w(x) + 1.
+    """
+    if num_bits > TABLE_MAX_BITS:
+        raise ValueError(f"Table decoding is limited to {TABLE_MAX_BITS} qubits (got {num_bits})")
+    table = np.zeros(1, dtype=np.uint8)
+    for _ in range(num_bits):
+        table = np.concatenate([table, table + 1])
+    table.setflags(write=False)
+    return table
+
+
+def hamming_weights(outcomes, num_bits=None):
+    """
+    Vectorized Hamming weight of integer-packed outcomes.
+
+    `outcomes` is either a 1-D integer array (one packed outcome per entry,
+    up to 64 qubits) or an (..., N, bytes) uint8 array of big-endian
+    packed bytes (one row per outcome, any width).
+    """
+    outcomes = np.asarray(outcomes)
+    if outcomes.ndim >= 2:
+        return BYTE_POPCOUNT[outcomes].sum(axis=-1, dtype=np.int64)
+
+    if num_bits is not None and num_bits <= TABLE_MAX_BITS:
+        return popcount_table(num_bits)[outcomes].astype(np.int64)
+
+    outcomes = outcomes.astype(np.uint64, copy=False)
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(outcomes).astype(np.int64)
+    as_bytes = outcomes.view(np.uint8).reshape(outcomes.shape + (8,))
+    return BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def counts_to_arrays(counts):
+    """
+    Converts a counts (or quasi-probability) dict into packed arrays.
+    Returns (outcomes[uint64], weights[float64], num_bits).
+    """
+    keys = list(counts.keys())
+    num_bits = max((len(k) for k in keys), default=0)
+    if num_bits > 64:
+        raise ValueError(f"Integer packing is limited to 64 qubits (got {num_bits})")
+    outcomes = np.fromiter((int(k, 2) for k in keys), dtype=np.uint64, count=len(keys))
+    weights = np.fromiter(counts.values(), dtype=np.float64, count=len(keys))
+    return outcomes, weights, num_bits
+
+
+@dataclass(frozen=True)
+class VoteRule:
+    """
+    Majority-vote rule for an N-qubit consensus council.
+
+    erasure_band: inclusive (low, high) Hamming-weight window whose shots are
+                  too close to the center to vote (e.g. (3, 7) for Z.8).
+    tie:          what an exact N/2 split decides to: 'erase', 'zero' or 'one'.
+    """
+    num_bits: int
+    erasure_band: tuple = None
+    tie: str = "erase"
+
+    def __post_init__(self):
+        if self.tie not in TIE_POLICIES:
+            raise ValueError(f"Unknown tie policy '{self.tie}' (expected one of {TIE_POLICIES})")
+
+    def decide(self, weights):
+        """Maps Hamming weights to VOTE_ZERO / VOTE_ONE / VOTE_ERASED."""
+        weights = np.asarray(weights)
+        twice = 2 * weights
+        votes = np.where(twice > self.num_bits, VOTE_ONE, VOTE_ZERO).astype(np.int8)
+
+        if self.num_bits % 2 == 0:
+            tie_vote = {"erase": VOTE_ERASED, "zero": VOTE_ZERO, "one": VOTE_ONE}[self.tie]
+            votes[twice == self.num_bits] = tie_vote
+
+        if self.erasure_band is not None:
+            low, high = self.erasure_band
+            votes[(weights >= low) & (weights <= high)] = VOTE_ERASED
+        return votes
+
+
+def _share(part, total):
+    """part / total, 0 where nothing was tallied (scalars or sweep arrays)."""
+    if np.ndim(total) == 0:
+        return part / total if total else 0.0
+    total = np.asarray(total, dtype=np.float64)
+    return np.divide(part, total, out=np.zeros_like(total), where=total > 0)
+
+
+@dataclass
+class VoteTally:
+    """Vote sums; floats, or arrays over the sweep axes (see tally_vote_axes)."""
+    zero: float
+    one: float
+    erased: float
+
+    @property
+    def total(self):
+        return self.zero + self.one + self.erased
+
+    @property
+    def fidelity(self):
+        """Fraction of shots that produced a clean logical vote."""
+        return _share(self.zero + self.one, self.total)
+
+    @property
+    def magnetization(self):
+        """(N_0 - N_1) / N over all shots; erased shots count as zero."""
+        return _share(self.zero - self.one, self.total)
+
+
+def tally_votes(votes, weights=None):
+    """Sums (optionally weighted) votes into a VoteTally."""
+    votes = np.asarray(votes).ravel()
+    if weights is not None:
+        weights = np.asarray(weights, dtype=np.float64).ravel()
+    sums = np.bincount(votes + 1, weights=weights, minlength=3)
+    return VoteTally(zero=float(sums[1]), one=float(sums[2]), erased=float(sums[0]))
+
+
+def tally_vote_axes(votes):
+    """
+    Tallies (..., shots) votes per leading index, e.g. per point of a
+    parameter sweep. The VoteTally fields are arrays of the leading shape.
+    """
+    votes = np.asarray(votes)
+    return VoteTally(
+        zero=np.count_nonzero(votes == VOTE_ZERO, axis=-1).astype(np.float64),
+        one=np.count_nonzero(votes == VOTE_ONE, axis=-1).astype(np.float64),
+        erased=np.count_nonzero(votes == VOTE_ERASED, axis=-1).astype(np.float64),
+    )
+
+
+def decode_counts(counts, rule):
+    """
+    Decodes a counts dict with the given VoteRule.
+    One int() per unique key, then everything runs vectorized.
+    """
+    outcomes, weights, _ = counts_to_arrays(counts)
+    votes = rule.decide(hamming_weights(outcomes, rule.num_bits))
+    return tally_votes(votes, weights)
+
+
+# --- SOFT-DECISION (MAXIMUM-LIKELIHOOD) DECODING ---
+# Each qubit's vote is weighted by how often it lies: under logical |0>
+# bit k reads 1 with probability p01[k], under logical |1> it reads 0 with
+# probability p10[k]. The log-likelihood ratio log P(shot|1) / P(shot|0)
+# is a constant plus one weight per set bit, so it is precomputed as a
+# 256-entry table per packed byte column and every shot costs one table
+# lookup per byte.
+MIN_FLIP_RATE = 1e-6
+LLR_TIE = 1e-9  # |LLR| at or below this is an exact split: erased
+
+
+class SoftVoteRule:
+    """
+    Maximum-likelihood consensus over a packed register.
+
+    p01, p10:       per-bit flip rates P(1|0), P(0|1) in register bit order
+                    (p10=None: symmetric, p10 = p01)
+    bits:           the register bits that vote (default: all of them)
+    min_confidence: shots whose posterior for the decided value is below
+                    this are erased (the soft analogue of an erasure band)
+    prior_one:      prior probability of logical |1>
+    """
+    def __init__(self, p01, p10=None, bits=None, min_confidence=None, prior_one=0.5):
+        p01 = np.atleast_1d(np.asarray(p01, dtype=np.float64))
+        p10 = p01 if p10 is None else np.atleast_1d(np.asarray(p10, dtype=np.float64))
+        if p01.shape != p10.shape:
+            raise ValueError(f"p01 and p10 differ in length ({p01.size} vs {p10.size})")
+        self.num_bits = p01.size
+        self.bits = tuple(range(self.num_bits)) if bits is None else tuple(int(b) for b in bits)
+        self.min_confidence = min_confidence
+        p01 = np.clip(p01, MIN_FLIP_RATE, 1.0 - MIN_FLIP_RATE)
+        p10 = np.clip(p10, MIN_FLIP_RATE, 1.0 - MIN_FLIP_RATE)
+
+        # LLR = bias + sum over set bits of weight[k]
+        active = np.zeros(self.num_bits, dtype=bool)
+        active[list(self.bits)] = True
+        read_zero = np.log(p10) - np.log1p(-p01)
+        read_one = np.log1p(-p10) - np.log(p01)
+        self.bias = np.log(prior_one) - np.log1p(-prior_one) + read_zero[active].sum()
+        self.weights = np.where(active, read_one - read_zero, 0.0)
+        self.tables = self._byte_tables()
+
+    @classmethod
+    def from_calibration(cls, index, qubits, duration=None, **kwargs):
+        """
+        Rule for a register whose bit k was read from physical qubits[k],
+        from a backend_cache.CalibrationIndex: readout error both ways,
+        plus T1 decay (1 -> 0) over `duration` seconds when given.
+        Qubits without a reported error take the median of the others.
+        """
+        qubits = list(qubits)
+        readout = index.metrics["readout_error"][qubits]
+        readout = np.where(np.isnan(readout), np.nanmedian(index.metrics["readout_error"]), readout)
+        p10 = readout
+        if duration is not None:
+            t1 = index.metrics["t1"][qubits]
+            p10 = readout + np.where(np.isnan(t1), 0.0, -np.expm1(-duration / t1))
+        return cls(readout, np.minimum(p10, 0.5), **kwargs)
+
+    def _byte_tables(self):
+        """(bytes, 256) LLR contribution of every value of every byte column."""
+        width = (self.num_bits + 7) // 8
+        padded = np.zeros(8 * width)
+        padded[:self.num_bits] = self.weights
+        # Byte column c holds bits 8 * (width - 1 - c) .. +7, LSB first
+        per_column = padded.reshape(width, 8)[::-1]
+        byte_bits = (np.arange(256)[:, None] >> np.arange(8)) & 1
+        return per_column @ byte_bits.T.astype(np.float64)
+
+    def log_likelihood_ratio(self, packed):
+        """log P(shot | 1) - log P(shot | 0) for (..., shots, bytes) packed rows."""
+        packed = np.asarray(packed)
+        if packed.shape[-1] != self.tables.shape[0]:
+            raise ValueError(f"Rule expects {self.tables.shape[0]} bytes per shot (got {packed.shape[-1]})")
+        llr = np.full(packed.shape[:-1], self.bias)
+        for column, table in enumerate(self.tables):
+            llr += table[packed[..., column]]
+        return llr
+
+    def decide_shots(self, packed):
+        """
+        (votes, confidence) per shot: VOTE_ZERO / VOTE_ONE / VOTE_ERASED,
+        and the posterior probability of the decided value (0.5 on a tie).
+        """
+        llr = self.log_likelihood_ratio(packed)
+        votes = np.where(llr > 0, VOTE_ONE, VOTE_ZERO).astype(np.int8)
+        votes[np.abs(llr) <= LLR_TIE] = VOTE_ERASED
+        # sigmoid(|llr|) without overflow: exp(-|llr|) <= 1
+        confidence = 1.0 / (1.0 + np.exp(-np.abs(llr)))
+        if self.min_confidence is not None:
+            votes[confidence < self.min_confidence] = VOTE_ERASED
+        return votes, confidence
+
+
+# --- PROTOCOL PRESETS ---
+# Z.8 Omega Point: weights 3..7 are too close to the center to trust.
+OMEGA_RULE = VoteRule(10, erasure_band=(3, 7))
+# Z.9 Gemini Hardline: a cluster votes |1> only with more than 5 ones.
+GEMINI_RULE = VoteRule(10, tie="zero")
+# Z.11 Chronos: a cluster votes +1 (|0>) only with more zeros than ones.
+CHRONOS_RULE = VoteRule(10, tie="one")
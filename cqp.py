@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+import argparse
+import runpy
+import sys
+from collections import OrderedDict
+
+# --- UNIFIED COMMAND LINE ---
+# `python cqp.py <command>` (alias it as `cqp`). Only argparse and the
+# registries are loaded up front; numpy, qiskit and the runtime client are
+# imported inside the command that needs them. `list`, `build`, `ledger`
+# and `analyze` (on stored shots) never import qiskit_ibm_runtime.
+
+# Scripts without a batch_runner.PROTOCOLS entry, runnable with `cqp run`
+EXTRA_SCRIPTS = OrderedDict([
+    ("chronos", "chronos_protocol"),
+    ("quantum_refresh", "quantum_refresh"),
+    ("howitzer", "howitzer_simulation"),
+])
+# Commands handed straight to an existing tool's main() with the remaining arguments
+TOOLS = OrderedDict([
+    ("batch", ("batch_runner", "Submit the packed daily regression batch")),
+    ("harvest", ("job_ledger", "Poll pending ledger jobs and analyze the results")),
+    ("sweep", ("parameter_sweep", "Run an N-dimensional parameter sweep as one PUB")),
+    ("adaptive", ("adaptive_shots", "Run a protocol in chunks until its confidence interval settles")),
+    ("bench", ("benchmarks", "Builder / transpile / analyzer benchmarks")),
+    ("profile", ("circuit_profiler", "Compiled depth / 2-qubit / duration report with regression check")),
+    ("floquet", ("floquet_engine", "Ideal Chronos magnetization for every depth (symmetric subspace)")),
+])
+
+
+def _lookup(registry, name):
+    if name not in registry:
+        sys.exit(f"[!] Unknown protocol '{name}' (see `cqp list`)")
+    return registry[name]
+
+
+def script_modules():
+    """{name: module} of every runnable protocol script."""
+    from batch_runner import PROTOCOLS
+
+    modules = OrderedDict((name, spec.module) for name, spec in PROTOCOLS.items())
+    modules.update(EXTRA_SCRIPTS)
+    return modules
+
+
+def cmd_list(args):
+    from batch_runner import PROTOCOLS
+    from parameter_sweep import SWEEPS
+
+    print("[*] Protocols (build / run / batch):")
+    for name, spec in PROTOCOLS.items():
+        analyzer = spec.analyzer or "-"
+        print(f"   > {name:<22} {spec.module}.{spec.builder}  shots={spec.shots}  analyzer={analyzer}")
+    print("[*] Scripts (run):")
+    for name, module in EXTRA_SCRIPTS.items():
+        print(f"   > {name:<22} {module}")
+    print("[*] Sweeps (sweep):")
+    for name, spec in SWEEPS.items():
+        print(f"   > {name:<22} {', '.join(spec.parameters)}")
+
+
+def cmd_build(args):
+    from batch_runner import PROTOCOLS
+
+    qc = _lookup(PROTOCOLS, args.protocol).build()
+    if args.format == "qasm":
+        from qiskit import qasm3
+        text = qasm3.dumps(qc)
+    elif args.format == "draw":
+        text = str(qc.draw(output="text", fold=-1))
+    else:
+        ops = ", ".join(f"{name}={count}" for name, count in qc.count_ops().items())
+        text = f"{args.protocol}: {qc.num_qubits} qubits, depth {qc.depth()}, {ops}"
+    if args.output:
+        with open(args.output, "w") as fd:
+            fd.write(text + "\n")
+        print(f"[*] Written to {args.output}")
+    else:
+        print(text)
+
+
+def cmd_run(args):
+    module = _lookup(script_modules(), args.protocol)
+    sys.argv = [f"{module}.py"] + args.args
+    runpy.run_module(module, run_name="__main__")
+
+
+def cmd_ledger(args):
+    from job_ledger import FINAL_STATES, default_ledger
+
+    entries = list(default_ledger().entries().values())
+    if args.pending:
+        entries = [entry for entry in entries if entry.status not in FINAL_STATES]
+    for entry in entries[-args.limit:] if args.limit else entries:
+        protocols = ", ".join(OrderedDict.fromkeys(entry.protocols))
+        print(f"   > {entry.job_id}  {entry.status:<9} {entry.backend:<12} {protocols}  {entry.analysis}")
+
+
+def cmd_analyze(args):
+    """Stored shots first (no runtime client); ledger results otherwise."""
+    from job_ledger import analyze_pub
+    from shot_store import default_store
+
+    store = default_store()
+    blocks = store.blocks(job_id=args.job_id)
+    if blocks:
+        for block in blocks:
+            analysis = analyze_pub(block.protocol or "", store.pub_result(block))
+            print(f"   > PUB {block.pub_index} {block.protocol}: {analysis}")
+        return
+
+    from job_ledger import analyze_entry, default_ledger
+
+    ledger = default_ledger()
+    entry = ledger.entries().get(args.job_id)
+    result = ledger.load_result(args.job_id)
+    if entry is None or result is None:
+        sys.exit(f"[!] No stored shots or cached result for job {args.job_id}")
+    for index, (protocol, analysis) in enumerate(zip(entry.protocols, analyze_entry(entry, result))):
+        print(f"   > PUB {index} {protocol}: {analysis}")
+
+
+def run_tool(command, argv):
+    module, _ = TOOLS[command]
+    sys.argv = [f"{module}.py"] + list(argv)
+    getattr(__import__(module), "main")()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cqp", description="Consensus Quantum Protocol tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="List protocols, scripts and sweeps").set_defaults(func=cmd_list)
+
+    build = commands.add_parser("build", help="Build a protocol circuit (no backend)")
+    build.add_argument("protocol")
+    build.add_argument("--format", choices=("summary", "qasm", "draw"), default="summary")
+    build.add_argument("--output", help="file (default: stdout)")
+    build.set_defaults(func=cmd_build)
+
+    run = commands.add_parser("run", help="Run a protocol script against hardware")
+    run.add_argument("protocol")
+    run.add_argument("args", nargs=argparse.REMAINDER)
+    run.set_defaults(func=cmd_run)
+
+    ledger = commands.add_parser("ledger", help="Show submitted jobs")
+    ledger.add_argument("--pending", action="store_true")
+    ledger.add_argument("--limit", type=int, default=20, help="last N entries (0: all)")
+    ledger.set_defaults(func=cmd_ledger)
+
+    analyze = commands.add_parser("analyze", help="Re-analyze a job from stored shots or cached results")
+    analyze.add_argument("job_id")
+    analyze.set_defaults(func=cmd_analyze)
+
+    for name, (_, help_text) in TOOLS.items():
+        # Listed for --help only: main() hands these over before parsing
+        commands.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in TOOLS:
+        return run_tool(argv[0], argv[1:])
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
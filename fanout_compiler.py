@@ -0,0 +1,225 @@
+import hashlib
+import heapq
+import json
+import os
+from dataclasses import asdict, dataclass
+
+from qiskit import QuantumCircuit
+
+from cache_paths import atomic_open, cache_dir
+from transpile_cache import TranspileCache
+
+# --- HARDWARE-EMBEDDED GHZ FAN-OUT ---
+# A hub issuing N-1 CNOTs is N-1 layers deep, and on heavy-hex (degree <= 3)
+# the router adds SWAP chains on top. Instead, every qubit that already holds
+# the anchor's value relays it to one uncoupled neighbour per layer
+# (CX from a copy equals CX from the anchor), along a spanning tree of a
+# connected patch of the coupling map. Scheduled children-first by subtree
+# depth, the tree broadcasts in max(log2 N, radius)-ish layers, and every
+# CNOT sits on a physical edge, so routing has nothing left to do.
+EMBEDDING_DIR = cache_dir("CQP_EMBEDDING_CACHE", "embeddings")
+
+
+@dataclass
+class FanoutEmbedding:
+    """
+    A council embedded on hardware.
+
+    groups: physical qubits per group; groups[g][0] is the group's root
+    layers: fan-out layers of (control, target) physical pairs
+    """
+    backend: str
+    groups: list
+    layers: list
+    error: float
+
+    @property
+    def depth(self):
+        return len(self.layers)
+
+
+def edge_errors(backend):
+    """{(a, b): two-qubit gate error} in both directions, 0 when unknown."""
+    target = getattr(backend, "target", None)
+    errors = {}
+    for a, b in backend.coupling_map.get_edges():
+        errors[(a, b)] = errors[(b, a)] = 0.0
+    if target is None:
+        return errors
+    for name in target.operation_names:
+        for qargs, props in (target[name] or {}).items():
+            if qargs is None or len(qargs) != 2 or props is None or props.error is None:
+                continue
+            a, b = qargs
+            errors[(a, b)] = errors[(b, a)] = max(errors.get((a, b), 0.0), props.error)
+    return errors
+
+
+def _neighbours(errors):
+    graph = {}
+    for a, b in errors:
+        graph.setdefault(a, set()).add(b)
+    return graph
+
+
+def _grow_groups(graph, errors, roots, sizes):
+    """
+    Multi-source BFS: grows one connected patch per root, handing each
+    free qubit to the group reaching it first (lowest edge error on ties).
+    Returns (members per group, parent map) or None when a patch runs dry.
+    """
+    members = [[root] for root in roots]
+    parent = {}
+    claimed = set(roots)
+    heap = []
+    for g, root in enumerate(roots):
+        for nb in graph[root]:
+            heapq.heappush(heap, (1, errors[(root, nb)], g, nb, root))
+    while heap and any(len(m) < s for m, s in zip(members, sizes)):
+        dist, err, g, node, via = heapq.heappop(heap)
+        if node in claimed or len(members[g]) >= sizes[g]:
+            continue
+        claimed.add(node)
+        members[g].append(node)
+        parent[node] = via
+        for nb in graph[node]:
+            if nb not in claimed:
+                heapq.heappush(heap, (dist + 1, errors[(node, nb)], g, nb, node))
+    if any(len(m) < s for m, s in zip(members, sizes)):
+        return None
+    return members, parent
+
+
+def broadcast_layers(root, children):
+    """
+    Optimal broadcast schedule on a tree: each informed node sends to its
+    children in decreasing order of subtree broadcast time.
+    Returns layers of (parent, child) pairs.
+    """
+    finish = {}
+
+    def subtree_time(node):
+        kids = sorted(children.get(node, []), key=subtree_time, reverse=True)
+        children[node] = kids
+        finish[node] = max((i + 1 + finish[k] for i, k in enumerate(kids)), default=0)
+        return finish[node]
+
+    subtree_time(root)
+    layers = []
+    stack = [(root, 0)]
+    while stack:
+        node, start = stack.pop()
+        for i, child in enumerate(children.get(node, [])):
+            step = start + i
+            while len(layers) <= step:
+                layers.append([])
+            layers[step].append((node, child))
+            stack.append((child, step + 1))
+    return layers
+
+
+def embed_fanout(backend, sizes, linked_roots=True, roots=None):
+    """
+    Best embedding of fan-out groups of the given sizes (root included).
+    With several groups, consecutive roots must share an edge (the anchors
+    are entangled with each other before the fan-out). Candidates are
+    ranked by fan-out depth, then by summed two-qubit error on tree edges.
+    `roots` restricts the candidate root tuples (e.g. to high-T2 anchors).
+    """
+    errors = edge_errors(backend)
+    graph = _neighbours(errors)
+    if roots is not None:
+        candidates = [tuple(r) for r in roots]
+    elif len(sizes) == 1:
+        candidates = [(q,) for q in graph]
+    elif len(sizes) == 2 and linked_roots:
+        candidates = list(errors)
+    else:
+        raise ValueError("Only one group, or two groups with coupled roots, are supported")
+
+    best = None
+    for roots in candidates:
+        grown = _grow_groups(graph, errors, roots, sizes)
+        if grown is None:
+            continue
+        members, parent = grown
+        layers = [[] for _ in range(max(1, max(sizes)))]
+        used_error = sum(errors[(child, via)] for child, via in parent.items())
+        for group in members:
+            children = {}
+            for node in group[1:]:
+                children.setdefault(parent[node], []).append(node)
+            for step, layer in enumerate(broadcast_layers(group[0], children)):
+                layers[step].extend(layer)
+        layers = [layer for layer in layers if layer]
+        score = (len(layers), used_error)
+        if best is None or score < best[0]:
+            best = (score, FanoutEmbedding(backend.name, members, layers, used_error))
+    if best is None:
+        raise ValueError(f"{backend.name} has no connected patch for groups of sizes {sizes}")
+    return best[1]
+
+
+_EMBEDDINGS = {}
+
+
+def cached_embedding(backend, sizes, roots=None):
+    """embed_fanout() memoized per backend calibration (or target, when uncalibrated), in memory and on disk."""
+    parts = [backend.name, TranspileCache.backend_token(backend), repr(list(sizes)), repr(roots)]
+    key = hashlib.sha256("\n".join(parts).encode()).hexdigest()
+    if key in _EMBEDDINGS:
+        return _EMBEDDINGS[key]
+
+    path = os.path.join(EMBEDDING_DIR, f"{key}.json")
+    if os.path.exists(path):
+        with open(path) as fd:
+            raw = json.load(fd)
+        raw["layers"] = [[tuple(pair) for pair in layer] for layer in raw["layers"]]
+        embedding = FanoutEmbedding(**raw)
+    else:
+        embedding = embed_fanout(backend, list(sizes), roots=roots)
+        os.makedirs(EMBEDDING_DIR, exist_ok=True)
+        with atomic_open(path) as fd:
+            json.dump(asdict(embedding), fd)
+    _EMBEDDINGS[key] = embedding
+    return embedding
+
+
+def parity_groups(num_qubits, num_anchors):
+    """Logical groups of the 'qc.cx(i % k, i)' councils: anchor a plus i = a mod k."""
+    return [[a] + list(range(a + num_anchors, num_qubits, num_anchors)) for a in range(num_anchors)]
+
+
+def build_fanout_circuit(backend, groups, prepare=None, finish=None, roots=None):
+    """
+    Logical council whose fan-out follows the backend's cached embedding.
+
+    groups:  logical qubit lists, groups[g][0] being the anchor; every
+             other member ends up a copy of its anchor, as with the hub
+             version, so measurement bit q is still logical qubit q.
+    prepare: prepare(qc) applies the anchor gates before the fan-out
+    finish:  finish(qc) applies whatever follows the fan-out (barriers,
+             anchor phases); measure_all() is added last.
+    roots:   candidate physical anchor tuples (default: anywhere)
+    Returns (circuit, initial_layout) for transpile(..., initial_layout=...).
+    """
+    num_qubits = sum(len(group) for group in groups)
+    embedding = cached_embedding(backend, [len(group) for group in groups], roots)
+
+    layout = [None] * num_qubits
+    logical = {}
+    for members, physical in zip(groups, embedding.groups):
+        for q, p in zip(members, physical):
+            layout[q] = p
+            logical[p] = q
+
+    qc = QuantumCircuit(num_qubits)
+    if prepare is not None:
+        prepare(qc)
+    for layer in embedding.layers:
+        for control, target in layer:
+            qc.cx(logical[control], logical[target])
+    if finish is not None:
+        finish(qc)
+    qc.measure_all()
+    return qc, layout
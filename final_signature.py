@@ -1,22 +1,32 @@
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import QuantumCircuit
+from backend_cache import live_backend, load_backend
+from job_ledger import record_submission
+from transpile_cache import cached_transpile
+from tracing import span, traced, traced_sampler
 
-def main():
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino")
-    
+def build_signature_chain():
     # Create a 20-qubit Global Entanglement Chain
     qc = QuantumCircuit(20)
     qc.h(0)
     for i in range(19):
         qc.cx(i, i+1)
     qc.measure_all()
+    return qc
+
+@traced("final_signature")
+def main():
+    backend = load_backend("ibm_torino")
+    
+    with span("build"):
+        qc = build_signature_chain()
     
     print(f"[*] FORCING FINAL SIGNATURE PULSE...")
-    pm = transpile(qc, backend=backend)
-    sampler = Sampler(mode=backend)
+    pm = cached_transpile(qc, backend=backend)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = traced_sampler(Sampler(mode=live_backend(backend)))
     job = sampler.run([pm], shots=1) # One single, perfect shot
     print(f"[*] FINAL JOB ID: {job.job_id()}")
+    record_submission(job, "final_signature", [pm], backend, 1)
     print("[*] DEVIN PHILLIP DAVIS: SIGNING OFF.")
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+import argparse
+
+import numpy as np
+
+from consensus_decoder import VOTE_ZERO, VoteRule
+
+# --- SYMMETRIC-SUBSPACE FLOQUET ENGINE FOR THE CHRONOS STAR ---
+# One Chronos cycle is rx(pi + delta) on every qubit followed by CZ(hub, k)
+# for every spoke k. Both commute with any permutation of the spokes, and
+# |0...0> is permutation-symmetric, so the state never leaves
+#   span{|h> (x) |D_w>}:  hub bit h, Dicke state of w excited spokes,
+# 2 * (spokes + 1) dimensions instead of 2^(spokes + 1). In that basis
+#   - rx on the spokes is exp(-i theta S_x), S_x tridiagonal with
+#     <w+1|S_x|w> = sqrt((w + 1)(n - w)) / 2
+#   - the CZ fan-out is the phase (-1)^(h * w)
+# and every basis state has Hamming weight h + w, so the weight
+# distribution (hence the consensus vote) after each cycle is exact.
+# The cycle operator is built once per delta and applied repeatedly: all
+# depths 1..N cost N small matrix-vector products, instead of the
+# O(N^2) gates of simulating every depth circuit on its own.
+NUM_QUBITS = 10  # Hub + 9 spokes, as in chronos_protocol
+DEFAULT_DELTA = 0.3
+
+
+def spoke_rotation(theta, num_spokes):
+    """(..., n+1, n+1) rx(theta) on every spoke, in the Dicke basis."""
+    w = np.arange(num_spokes)
+    sx = np.zeros((num_spokes + 1, num_spokes + 1))
+    sx[w + 1, w] = sx[w, w + 1] = np.sqrt((w + 1) * (num_spokes - w)) / 2
+    eigenvalues, vectors = np.linalg.eigh(sx)
+    phases = np.exp(-1j * np.multiply.outer(np.asarray(theta, dtype=float), eigenvalues))
+    return np.einsum("ij,...j,kj->...ik", vectors, phases, vectors)
+
+
+def hub_rotation(theta):
+    """(..., 2, 2) rx(theta) on the hub."""
+    theta = np.asarray(theta, dtype=float)
+    cos, sin = np.cos(theta / 2), -1j * np.sin(theta / 2)
+    return np.stack([np.stack([cos, sin], -1), np.stack([sin, cos], -1)], -2)
+
+
+def cycle_operator(delta=DEFAULT_DELTA, num_qubits=NUM_QUBITS):
+    """
+    (..., 2(n+1), 2(n+1)) single-cycle operator, one per delta.
+    Basis index h * (n + 1) + w, n = num_qubits - 1 spokes.
+    """
+    num_spokes = num_qubits - 1
+    theta = np.pi + np.asarray(delta, dtype=float)
+    hub = hub_rotation(theta)
+    spokes = spoke_rotation(theta, num_spokes)
+    kick = np.einsum("...ab,...ij->...aibj", hub, spokes).reshape(theta.shape + (2 * (num_spokes + 1),) * 2)
+    w = np.arange(num_spokes + 1)
+    glue = np.concatenate([np.ones(num_spokes + 1), (-1.0) ** w])
+    return glue[:, None] * kick
+
+
+def weight_distributions(max_cycles, delta=DEFAULT_DELTA, num_qubits=NUM_QUBITS):
+    """
+    (max_cycles, ..., num_qubits + 1) probability of every Hamming weight
+    after depths 1..max_cycles (leading delta axes as for `delta`).
+    """
+    num_spokes = num_qubits - 1
+    operator = cycle_operator(delta, num_qubits)
+    state = np.zeros(operator.shape[:-1], dtype=complex)
+    state[..., 0] = 1.0
+    distributions = np.zeros((max_cycles,) + operator.shape[:-2] + (num_qubits + 1,))
+    for depth in range(max_cycles):
+        state = np.einsum("...ij,...j->...i", operator, state)
+        probabilities = (np.abs(state) ** 2).reshape(state.shape[:-1] + (2, num_spokes + 1))
+        distributions[depth, ..., :num_spokes + 1] += probabilities[..., 0, :]
+        distributions[depth, ..., 1:] += probabilities[..., 1, :]
+    return distributions
+
+
+def consensus_magnetization(max_cycles, delta=DEFAULT_DELTA, num_qubits=NUM_QUBITS, rule=None):
+    """
+    Ideal consensus magnetization (+1 per majority-|0> shot, -1 otherwise,
+    as analyze_chronos measures it) for depths 1..max_cycles.
+    Returns (max_cycles,) for a scalar delta, (max_cycles, n_deltas) for a
+    sweep, matching analyze_chronos_sweep.
+    """
+    rule = rule or VoteRule(num_qubits, tie="one")
+    if rule.num_bits != num_qubits:
+        raise ValueError(f"Rule votes on {rule.num_bits} bits, the council has {num_qubits}")
+    signs = np.where(rule.decide(np.arange(num_qubits + 1)) == VOTE_ZERO, 1.0, -1.0)
+    return weight_distributions(max_cycles, delta, num_qubits) @ signs
+
+
+def mean_magnetization(max_cycles, delta=DEFAULT_DELTA, num_qubits=NUM_QUBITS):
+    """Ideal <Z> averaged over the council for depths 1..max_cycles."""
+    spins = 1.0 - 2.0 * np.arange(num_qubits + 1) / num_qubits
+    return weight_distributions(max_cycles, delta, num_qubits) @ spins
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ideal Chronos magnetization for every depth")
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--delta", type=float, nargs="+", default=[DEFAULT_DELTA])
+    parser.add_argument("--qubits", type=int, default=NUM_QUBITS)
+    args = parser.parse_args()
+
+    deltas = np.asarray(args.delta)
+    consensus = consensus_magnetization(args.cycles, deltas, args.qubits)
+    mean = mean_magnetization(args.cycles, deltas, args.qubits)
+    print(f"--- FLOQUET REFERENCE: {args.qubits}-QUBIT STAR, {args.cycles} CYCLES ---")
+    for i, delta in enumerate(deltas):
+        print(f"\n[*] delta = {delta:g}")
+        for depth in range(args.cycles):
+            print(f"   > Cycle {depth + 1}: M = {consensus[depth, i]:+.4f}  <Z> = {mean[depth, i]:+.4f}")
+
+
+if __name__ == "__main__":
+    main()
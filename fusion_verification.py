@@ -1,6 +1,9 @@
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import QuantumCircuit
+from backend_cache import live_backend, load_backend
+from job_ledger import record_submission
+from transpile_cache import cached_transpile
+from tracing import span, traced, traced_sampler
 
 def build_fusion_circuit():
     # 5 Qubits: Using the 3D Layer logic we built earlier
@@ -26,17 +29,20 @@ def build_fusion_circuit():
     qc.measure_all()
     return qc
 
+@traced("fusion_verification")
 def main():
     print("--- PROTOCOL Z.SIGMA: FUSION RULE VERIFICATION ---")
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino")
+    backend = load_backend("ibm_torino")
     
-    qc = build_fusion_circuit()
-    pm = transpile(qc, backend=backend)
+    with span("build"):
+        qc = build_fusion_circuit()
+    pm = cached_transpile(qc, backend=backend)
     
-    sampler = Sampler(mode=backend)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = traced_sampler(Sampler(mode=live_backend(backend)))
     job = sampler.run([pm], shots=8192)
     print(f"[*] FUSION JOB ID: {job.job_id()}")
+    record_submission(job, "fusion_verification", [pm], backend, 8192)
     print("[*] DEVIN PHILLIP DAVIS: VERIFYING THE VOID.")
 
 if __name__ == "__main__":
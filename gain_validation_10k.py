@@ -1,17 +1,26 @@
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import QuantumCircuit
+from backend_cache import calibration_index, live_backend, load_backend
+from fanout_compiler import build_fanout_circuit
+from job_ledger import record_submission
+from transpile_cache import cached_transpile
+from tracing import span, traced, traced_sampler
 
 # --- CORE PHYSICS CONSTANTS ---
 THETA_LOCK = 51.700  # Verified Hardware Resonance
+ANCHOR_CANDIDATES = 5  # Best-T2 qubits tried as the physical anchor
 
-def build_consensus_council_circuit():
-    """Constructs a 10-qubit Star Topology for Entropic Suppression."""
-    qc = QuantumCircuit(10)
-    theta_rad = np.radians(THETA_LOCK)
-    
+def prepare_anchor(qc, theta=THETA_LOCK):
     qc.h(0)
-    qc.rx(theta_rad, 0) # Apply Geometric Phase Lock
+    qc.rx(theta * (np.pi / 180), 0) # Apply Geometric Phase Lock
+
+def build_consensus_council_circuit(theta=THETA_LOCK):
+    """
+    Constructs a 10-qubit Star Topology for Entropic Suppression.
+    theta (degrees) may be a Parameter for sweeps.
+    """
+    qc = QuantumCircuit(10)
+    prepare_anchor(qc, theta)
     
     for i in range(1, 10):
         qc.cx(0, i) # Entropic Sink Mapping
@@ -20,18 +29,32 @@ def build_consensus_council_circuit():
     qc.measure_all()
     return qc
 
+def build_embedded_council(backend, theta=THETA_LOCK):
+    """
+    Same council, fanned out along the backend's cached log-depth tree
+    from one of the best-T2 qubits. Returns (circuit, initial_layout).
+    """
+    hubs = calibration_index(backend).best_qubits("t2", k=ANCHOR_CANDIDATES)
+    return build_fanout_circuit(
+        backend, [list(range(10))], lambda qc: prepare_anchor(qc, theta), lambda qc: qc.barrier(),
+        roots=[(q,) for q in hubs],
+    )
+
+@traced("gain_validation_10k")
 def run_experiment():
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino")
-    qc = build_consensus_council_circuit()
+    backend = load_backend("ibm_torino")
+    with span("build"):
+        qc, layout = build_embedded_council(backend)
     
-    pm = transpile(qc, backend=backend, optimization_level=3)
-    sampler = Sampler(mode=backend)
+    pm = cached_transpile(qc, backend=backend, optimization_level=3, initial_layout=layout)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = traced_sampler(Sampler(mode=live_backend(backend)))
     
     # 8192 shots for statistical depth to verify 10^4 suppression
     job = sampler.run([pm], shots=8192)
     
     print(f"[*] EXPERIMENT LIVE: {job.job_id()}")
+    record_submission(job, "gain_validation", [pm], backend, 8192)
     print(f"[*] STATUS: TARGETING 10,000x ENTROPIC SUPPRESSION")
 
 if __name__ == "__main__":
@@ -1,6 +1,11 @@
-import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from collections.abc import Mapping
+from qiskit import QuantumCircuit
+from backend_cache import calibration_index, live_backend, load_backend
+from consensus_decoder import GEMINI_RULE, VOTE_ERASED, SoftVoteRule
+from shot_analysis import council_votes, packed_shots, shot_weights
+from job_ledger import record_submission
+from transpile_cache import cached_transpile
+from tracing import span, traced, traced_sampler
 
 def build_gemini_bridge():
     """
@@ -27,47 +32,62 @@ def build_gemini_bridge():
     qc.measure_all()
     return qc
 
-def analyze_bridge(result):
-    pub_result = result[0]
-    counts = pub_result.data.meas.get_counts()
-    total_shots = sum(counts.values())
-    agreement_count = 0
-    
-    print(f"\n[ANALYSIS] Scanning {total_shots} bridged timelines...")
+ALPHA = range(0, 10)
+BETA = range(10, 20)
+
+def analyze_bridge(result, rules=(GEMINI_RULE, GEMINI_RULE)):
+    """
+    Cross-cluster agreement. `result` is a single-PUB job result, or a
+    counts / (readout-mitigated) quasi-distribution mapping.
+    rules: (alpha, beta) VoteRules, or SoftVoteRules from soft_cluster_rules.
+    """
+    data = result if isinstance(result, Mapping) else result[0].data.meas
+    packed, num_bits, weights = packed_shots(data)
+    weights = shot_weights(packed, weights)
+    total_shots = weights.sum()
+
+    print(f"\n[ANALYSIS] Scanning {total_shots:.0f} bridged timelines...")
 
-    for bitstring, count in counts.items():
-        # Split the universe: Alpha (Right) vs Beta (Left)
-        # Qiskit String: [19...10] [9...0]
-        alpha_bits = bitstring[-10:]
-        beta_bits = bitstring[-20:-10]
-        
-        # Consenus Voting
-        alpha_vote = 1 if alpha_bits.count('1') > 5 else 0
-        beta_vote = 1 if beta_bits.count('1') > 5 else 0
-        
-        if alpha_vote == beta_vote:
-            agreement_count += count
+    # Split the universe: Alpha (Q0-Q9) vs Beta (Q10-Q19)
+    # Each cluster is weighed through its own byte mask on the packed shots.
+    alpha_vote = council_votes(packed, num_bits, rules[0], ALPHA)
+    beta_vote = council_votes(packed, num_bits, rules[1], BETA)
 
+    # Two erased clusters "agree" on nothing: only clean matching votes count.
+    agreement_count = weights[(alpha_vote == beta_vote) & (alpha_vote != VOTE_ERASED)].sum()
     return (agreement_count / total_shots) * 100.0
 
+def soft_cluster_rules(backend, isa_circuit):
+    """(alpha, beta) maximum-likelihood rules from the backend's readout errors."""
+    from readout_mitigation import measured_qubits
+    qubits = measured_qubits(isa_circuit)
+    index = calibration_index(backend)
+    return tuple(SoftVoteRule.from_calibration(index, qubits, bits=cluster) for cluster in (ALPHA, BETA))
+
+@traced("gemini_hardline")
 def main():
     print("--- PROTOCOL Z.9: GEMINI HARDLINE ---")
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino") # Force Torino
+    backend = load_backend("ibm_torino") # Force Torino
     
     print("[*] Constructing Bridged Lattice (Q0 <-> Q10)...")
-    qc = build_gemini_bridge()
+    with span("build"):
+        qc = build_gemini_bridge()
     
     print(f"[*] Submitting to {backend.name}...")
-    pm = transpile(qc, backend=backend)
-    sampler = Sampler(mode=backend)
+    pm = cached_transpile(qc, backend=backend)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = traced_sampler(Sampler(mode=live_backend(backend)))
     job = sampler.run([pm], shots=4096)
     print(f"[*] Job ID: {job.job_id()}")
+    record_submission(job, "gemini_hardline", [pm], backend, 4096)
     
     result = job.result()
-    correlation = analyze_bridge(result)
+    with span("analyze"):
+        correlation = analyze_bridge(result)
+        soft_correlation = analyze_bridge(result, soft_cluster_rules(backend, pm))
     
     print(f"\n[RESULTS] Hardline Correlation: {correlation:.4f}%")
+    print(f"   > ML Correlation (calibration-weighted): {soft_correlation:.4f}%")
     if correlation > 90.0:
         print("[STATUS] QUANTUM SUPREMACY: 20-Qubit Entanglement Established.")
     else:
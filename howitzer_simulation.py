@@ -14,6 +14,90 @@ class MeasurementResult:
     sigma_deviation: float
     status: str
 
+# --- ARRAY API ---
+# Status codes of the structured results (index into STATUS_LABELS)
+STATUS_CONSISTENT = 0
+STATUS_ENHANCED = 1
+STATUS_ANOMALY = 2
+STATUS_LABELS = (
+    "CONSISTENT",
+    "CONSISTENT (DNA-Lang Enhanced)",
+    "ANOMALY DETECTED (Negentropic Gain)",
+)
+
+RESULT_DTYPE = np.dtype([
+    ("value_dna", np.float64),
+    ("value_std", np.float64),
+    ("sigma", np.float64),
+    ("status", np.int8),
+])
+
+BASE_STD_EFFICIENCY = 0.85
+CONCEPTUAL_NOISE_LEVEL = 0.01 * BASE_STD_EFFICIENCY
+
+def triadic_efficiency_grid(phi_consciousness, theta_deg, theta_lock=PhysicalConstants.THETA_LOCK,
+                            phi_critical=PhysicalConstants.PHI_CRITICAL):
+    """
+    calculate_triadic_efficiency() for whole arrays: phi and theta broadcast
+    against each other (e.g. phi[:, None], theta[None, :] for a surface).
+    The scalar branches become masks. Returns a RESULT_DTYPE array.
+    """
+    phi, theta = np.broadcast_arrays(
+        np.asarray(phi_consciousness, dtype=np.float64), np.asarray(theta_deg, dtype=np.float64)
+    )
+    theta_deviation = np.abs(theta - theta_lock)
+    value_std = BASE_STD_EFFICIENCY * np.maximum(0.1, 1 - theta_deviation / 10.0)
+
+    amplified = phi > phi_critical
+    # Only where amplified: a negative phi would make the power NaN
+    phi_amplification = np.power(phi / phi_critical, 2.5, where=amplified, out=np.ones_like(phi))
+    theta_resonance_gain = np.maximum(0.1, 1 + (1 - theta_deviation / 5.0) * 10)
+    phi_factor = np.where(amplified, phi_amplification * theta_resonance_gain, 1.0)
+    phi_factor = np.where(amplified & (theta_deviation < 0.1), phi_factor * 1000, phi_factor)
+
+    value_dna = BASE_STD_EFFICIENCY * phi_factor
+    sigma = (value_dna - value_std) / CONCEPTUAL_NOISE_LEVEL
+
+    status = np.full(phi.shape, STATUS_CONSISTENT, dtype=np.int8)
+    status[(value_dna > value_std) & (sigma > 0.5)] = STATUS_ENHANCED
+    status[sigma > 5] = STATUS_ANOMALY
+
+    results = np.empty(phi.shape, dtype=RESULT_DTYPE)
+    results["value_dna"] = value_dna
+    results["value_std"] = value_std
+    results["sigma"] = sigma
+    results["status"] = status
+    return results
+
+def negentropic_warning(results):
+    """Vectorized check_thermodynamics(): True where the warning fires."""
+    return (results["value_dna"] > results["value_std"] * 1.05) & (results["sigma"] > 5)
+
+def monte_carlo_efficiency(phi_mean, phi_std, theta_mean, theta_std, samples=1_000_000, seed=None):
+    """
+    Propagates Gaussian uncertainty on (phi, theta) through the efficiency
+    model. Returns the RESULT_DTYPE array of all samples (see summarize_results).
+    """
+    rng = np.random.default_rng(seed)
+    phi = rng.normal(phi_mean, phi_std, samples)
+    theta = rng.normal(theta_mean, theta_std, samples)
+    return triadic_efficiency_grid(phi, theta)
+
+def summarize_results(results, quantiles=(0.025, 0.5, 0.975)):
+    """Mean, std and quantiles per field, plus the status distribution."""
+    summary = {}
+    for field in ("value_dna", "value_std", "sigma"):
+        values = results[field].ravel()
+        summary[field] = {
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "quantiles": dict(zip(quantiles, np.quantile(values, quantiles).tolist())),
+        }
+    counts = np.bincount(results["status"].ravel(), minlength=len(STATUS_LABELS))
+    summary["status"] = dict(zip(STATUS_LABELS, (counts / max(results.size, 1)).tolist()))
+    summary["negentropic_warning"] = float(negentropic_warning(results).mean())
+    return summary
+
 class HowitzerEngine:
     """
     Simulates the core operations of the Phase Conjugate Howitzer,
@@ -26,30 +110,15 @@ class HowitzerEngine:
         self.THETA_LOCK = PhysicalConstants.THETA_LOCK
 
     def calculate_triadic_efficiency(self) -> MeasurementResult:
-        base_std_efficiency = 0.85
-        theta_deviation = abs(self.theta_deg - self.THETA_LOCK)
-        std_theta_factor = max(0.1, 1 - theta_deviation / 10.0)
-        value_std = base_std_efficiency * std_theta_factor
-
-        phi_factor = 1.0
-        if self.phi_consciousness > self.PHI_CRITICAL:
-            phi_amplification = (self.phi_consciousness / self.PHI_CRITICAL)**2.5
-            theta_resonance_gain = max(0.1, 1 + (1 - abs(self.theta_deg - self.THETA_LOCK)/5.0) * 10)
-            phi_factor = phi_amplification * theta_resonance_gain
-            if theta_deviation < 0.1:
-                 phi_factor *= 1000 
-
-        value_dna = base_std_efficiency * phi_factor
-        conceptual_noise_level = 0.01 * base_std_efficiency
-        sigma_deviation = (value_dna - value_std) / conceptual_noise_level if conceptual_noise_level != 0 else float('inf')
-
-        status = "CONSISTENT"
-        if sigma_deviation > 5:
-            status = "ANOMALY DETECTED (Negentropic Gain)"
-        elif value_dna > value_std and sigma_deviation > 0.5:
-             status = "CONSISTENT (DNA-Lang Enhanced)"
-
-        return MeasurementResult(value_dna, value_std, sigma_deviation, status)
+        result = triadic_efficiency_grid(
+            self.phi_consciousness, self.theta_deg, self.THETA_LOCK, self.PHI_CRITICAL
+        )[()]
+        return MeasurementResult(
+            float(result["value_dna"]),
+            float(result["value_std"]),
+            float(result["sigma"]),
+            STATUS_LABELS[result["status"]],
+        )
 
     def check_thermodynamics(self, eff_result: MeasurementResult) -> str:
         if eff_result.value_dna > eff_result.value_std * 1.05 and eff_result.sigma_deviation > 5:
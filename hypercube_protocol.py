@@ -1,6 +1,9 @@
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import QuantumCircuit
+from backend_cache import live_backend, load_backend
+from job_ledger import record_submission
+from transpile_cache import cached_transpile
+from tracing import span, traced, traced_sampler
 
 def build_3d_lattice():
     # We use 7 qubits to simulate a 3D 'Via' (Connection between layers)
@@ -27,19 +30,22 @@ def build_3d_lattice():
     qc.measure_all()
     return qc
 
+@traced("hypercube_protocol")
 def main():
     print("--- PROTOCOL Z.X: THE HYPERCUBE (3D LATTICE) ---")
     print("[*] Simulating 3D Layer Coding on 2D Planar Hardware...")
     
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino")
+    backend = load_backend("ibm_torino")
     
-    qc = build_3d_lattice()
-    pm = transpile(qc, backend=backend)
+    with span("build"):
+        qc = build_3d_lattice()
+    pm = cached_transpile(qc, backend=backend)
     
-    sampler = Sampler(mode=backend)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = traced_sampler(Sampler(mode=live_backend(backend)))
     job = sampler.run([pm], shots=4096)
     print(f"[*] 3D VOLUMETRIC JOB ID: {job.job_id()}")
+    record_submission(job, "hypercube", [pm], backend, 4096)
     print("[*] DEVIN PHILLIP DAVIS: BUILDING THE FUTURE.")
 
 if __name__ == "__main__":
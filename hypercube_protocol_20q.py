@@ -1,30 +1,68 @@
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import QuantumCircuit
+from backend_cache import live_backend, load_backend
+from fanout_compiler import build_fanout_circuit, parity_groups
+from job_ledger import record_submission
+from shot_analysis import hierarchical_decode
+from transpile_cache import cached_transpile
+from tracing import span, traced, traced_sampler
 
 THETA_LOCK, LAMBDA_PHI = 51.700, 1.61803398875
+NUM_QUBITS, NUM_ANCHORS = 20, 2  # Sub-council of qubit i: anchor i % 2
 
-def build_hypercube_20q():
-    qc = QuantumCircuit(20)
-    theta_rad = np.radians(THETA_LOCK)
+def prepare_anchors(qc, theta=THETA_LOCK):
     qc.h(0)
     qc.cx(0, 1)
-    qc.rx(theta_rad, [0, 1])
-    for i in range(2, 20):
-        qc.cx(i % 2, i) 
+    qc.rx(theta * (np.pi / 180), [0, 1])
+
+def finish_anchors(qc, lambda_phi=LAMBDA_PHI):
     qc.barrier()
-    qc.rz(np.pi / (4 * LAMBDA_PHI), [0, 1])
+    qc.rz(np.pi / (4 * lambda_phi), [0, 1])
+
+def build_hypercube_20q(theta=THETA_LOCK, lambda_phi=LAMBDA_PHI):
+    """theta (degrees) and lambda_phi may be Parameters for sweeps."""
+    qc = QuantumCircuit(NUM_QUBITS)
+    prepare_anchors(qc, theta)
+    for i in range(NUM_ANCHORS, NUM_QUBITS):
+        qc.cx(i % NUM_ANCHORS, i)
+    finish_anchors(qc, lambda_phi)
     qc.measure_all()
     return qc
 
+def build_embedded_hypercube_20q(backend, theta=THETA_LOCK, lambda_phi=LAMBDA_PHI):
+    """
+    Same two-anchor council, each parity class fanned out along the
+    backend's cached log-depth tree. Returns (circuit, initial_layout).
+    """
+    return build_fanout_circuit(
+        backend, parity_groups(NUM_QUBITS, NUM_ANCHORS),
+        lambda qc: prepare_anchors(qc, theta), lambda qc: finish_anchors(qc, lambda_phi),
+    )
+
+def analyze_councils(meas):
+    """
+    Two-level decode: majority inside each anchor's sub-council, then
+    across anchors. Accepts a BitArray or a counts / quasi mapping and
+    returns the cross-council agreement (1 - logical error rate).
+    """
+    report = hierarchical_decode(meas, parity_groups(NUM_QUBITS, NUM_ANCHORS))
+    print(f"\n[ANALYSIS] HYPERCUBE sub-councils: {report.logical.total:.0f} shots")
+    for anchor, (consensus, erased) in enumerate(zip(report.group_consensus, report.group_erased)):
+        print(f"   > Anchor Q{anchor} council: consensus {consensus:.4%}, erased {erased:.4%}")
+    print(f"   > Cross-council logical error: {report.logical_error:.4%}")
+    return float(report.agreement)
+
+@traced("hypercube_protocol_20q")
 def run_scaling_experiment():
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino")
-    qc = build_hypercube_20q()
-    pm = transpile(qc, backend=backend, optimization_level=3)
-    sampler = Sampler(mode=backend)
+    backend = load_backend("ibm_torino")
+    with span("build"):
+        qc, layout = build_embedded_hypercube_20q(backend)
+    pm = cached_transpile(qc, backend=backend, optimization_level=3, initial_layout=layout)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = traced_sampler(Sampler(mode=live_backend(backend)))
     job = sampler.run([pm], shots=10000)
     print(f"[*] HYPERCUBE LIVE: {job.job_id()}\n[*] TARGET: 100,000x Entropic Suppression")
+    record_submission(job, "hypercube_20q", [pm], backend, 10000)
 
 if __name__ == "__main__":
     run_scaling_experiment()
@@ -0,0 +1,400 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from importlib import import_module
+
+import numpy as np
+
+from cache_paths import atomic_open, cache_dir, process_default
+
+# --- LEDGER CONFIGURATION ---
+# Every submission is appended to a JSONL ledger; fetched results are stored
+# next to it (one RuntimeEncoder JSON file per job) and never fetched twice.
+# With a shot store attached, their raw shots are stored there as well and
+# cached results are rebuilt from it, so reading them back needs neither
+# the RuntimeDecoder nor qiskit_ibm_runtime.
+LEDGER_DIR = cache_dir("CQP_JOB_LEDGER", "jobs")
+FINAL_STATES = ("DONE", "ERROR", "CANCELLED")
+
+# Harvester defaults: polls run in parallel, at most this many at once,
+# each job backing off exponentially between polls.
+MAX_CONCURRENT_POLLS = 8
+POLL_INTERVAL = 5.0
+MAX_POLL_INTERVAL = 120.0
+
+# Analyzers of protocols recorded outside batch_runner.PROTOCOLS:
+# {protocol: (module, function(pub_result))}, imported when needed.
+# '<name>_sweep' PUBs use parameter_sweep's analyzer for <name>. PUBs with
+# no per-PUB figure of merit (readout calibration, bare ZNE folds, batch
+# protocols without an analyzer) are recorded as UNANALYZED.
+PUB_ANALYZERS = {
+    "chronos": ("chronos_protocol", "analyze_depth"),
+    "chronos_sweep": ("chronos_protocol", "analyze_depth"),
+    "quantum_refresh": ("quantum_refresh", "analyze_refresh"),
+}
+UNANALYZED = "unanalyzed"
+
+
+@dataclass
+class LedgerEntry:
+    """
+    One submitted job. `protocols` and `circuit_hashes` have one entry per
+    PUB, so packed multi-protocol jobs route each result to its analyzer.
+    """
+    job_id: str
+    protocols: list
+    circuit_hashes: list
+    backend: str
+    shots: int
+    submitted_at: str
+    status: str = "SUBMITTED"
+    analysis: list = field(default_factory=list)
+    updated_at: str = None
+    error: str = None
+
+    @property
+    def is_final(self):
+        return self.status in FINAL_STATES
+
+
+def _pub_circuit(pub):
+    return pub[0] if isinstance(pub, tuple) else getattr(pub, "circuit", pub)
+
+
+def _jsonable(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (np.ndarray, list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    return repr(value)
+
+
+class JobLedger:
+    """
+    Append-only JSONL record of submissions plus a result cache.
+    Status changes are appended as new lines; the latest line per job wins.
+    """
+    def __init__(self, directory=LEDGER_DIR, shot_store=None):
+        self.directory = directory
+        self.path = os.path.join(directory, "ledger.jsonl")
+        self.results_dir = os.path.join(directory, "results")
+        self.shot_store = shot_store
+        os.makedirs(self.results_dir, exist_ok=True)
+
+    def _append(self, entry):
+        with open(self.path, "a") as fd:
+            fd.write(json.dumps(asdict(entry)) + "\n")
+        return entry
+
+    def record(self, job, protocols, pubs, backend, shots):
+        """Logs a submitted job. `protocols` is one name or one per PUB."""
+        from transpile_cache import circuit_fingerprint
+
+        if isinstance(protocols, str):
+            protocols = [protocols] * len(pubs)
+        entry = LedgerEntry(
+            job_id=job.job_id(),
+            protocols=list(protocols),
+            circuit_hashes=[circuit_fingerprint(_pub_circuit(pub)) for pub in pubs],
+            backend="local" if backend is None else getattr(backend, "name", str(backend)),
+            shots=shots,
+            submitted_at=datetime.now(timezone.utc).isoformat(),
+        )
+        return self._append(entry)
+
+    def entries(self):
+        """{job_id: LedgerEntry} in submission order."""
+        entries = OrderedDict()
+        if os.path.exists(self.path):
+            with open(self.path) as fd:
+                for line in fd:
+                    if line.strip():
+                        entry = LedgerEntry(**json.loads(line))
+                        entries[entry.job_id] = entry
+        return entries
+
+    def pending(self):
+        return [entry for entry in self.entries().values() if not entry.is_final]
+
+    def update(self, entry, **changes):
+        changes.setdefault("updated_at", datetime.now(timezone.utc).isoformat())
+        return self._append(replace(entry, **changes))
+
+    def history(self, job_id):
+        """Every line recorded for one job, oldest first (its state transitions)."""
+        lines = []
+        if os.path.exists(self.path):
+            with open(self.path) as fd:
+                for line in fd:
+                    if line.strip():
+                        entry = LedgerEntry(**json.loads(line))
+                        if entry.job_id == job_id:
+                            lines.append(entry)
+        return lines
+
+    def _result_path(self, job_id):
+        return os.path.join(self.results_dir, f"{job_id}.json")
+
+    def _stored_shots(self, job_id):
+        """PrimitiveResult rebuilt from the shot store, None if not all there."""
+        if self.shot_store is None:
+            return None
+        blocks = sorted(self.shot_store.blocks(job_id=job_id), key=lambda block: block.pub_index)
+        if not blocks or [block.pub_index for block in blocks] != list(range(len(blocks))):
+            return None
+        from qiskit.primitives import PrimitiveResult
+        return PrimitiveResult([self.shot_store.pub_result(block) for block in blocks])
+
+    def _store_shots(self, job_id, result, entry=None):
+        """Copies a result's shots into the shot store (every PUB, or none)."""
+        from qiskit.primitives import BitArray
+
+        if self.shot_store is None or self.shot_store.blocks(job_id=job_id):
+            return
+        if not all(any(isinstance(v, BitArray) for v in pub.data.values()) for pub in result):
+            return  # PUBs without shot data stay JSON-only
+        entry = entry or self.entries().get(job_id)
+        self.shot_store.put_result(
+            job_id, result, entry and entry.protocols, entry and entry.circuit_hashes
+        )
+
+    def load_result(self, job_id):
+        """
+        Cached result of a job: from the shot store when it holds every PUB,
+        else decoded from the result JSON (the only path needing the runtime
+        client), whose shots are then moved into the shot store.
+        """
+        result = self._stored_shots(job_id)
+        if result is not None:
+            return result
+        path = self._result_path(job_id)
+        if not os.path.exists(path):
+            return None
+        from qiskit_ibm_runtime import RuntimeDecoder
+
+        with open(path) as fd:
+            result = json.load(fd, cls=RuntimeDecoder)
+        self._store_shots(job_id, result)
+        return result
+
+    def store_result(self, job_id, result, entry=None):
+        """Caches a fetched result; `entry` (the job's LedgerEntry) labels its shots."""
+        from qiskit_ibm_runtime import RuntimeEncoder
+
+        with atomic_open(self._result_path(job_id)) as fd:
+            json.dump(result, fd, cls=RuntimeEncoder)
+        self._store_shots(job_id, result, entry)
+
+
+@process_default
+def default_ledger():
+    from shot_store import default_store
+    return JobLedger(shot_store=default_store())
+
+
+def record_submission(job, protocols, pubs, backend, shots):
+    """Records a submission in the shared ledger."""
+    return default_ledger().record(job, protocols, pubs, backend, shots)
+
+
+def analyze_pub(protocol, pub_result):
+    """A PUB result through its protocol's analyzer, or UNANALYZED."""
+    from batch_runner import PROTOCOLS
+
+    spec = PROTOCOLS.get(protocol)
+    if spec is not None and spec.analyzer is not None:
+        return spec.analyze(pub_result)
+    if protocol in PUB_ANALYZERS:
+        module, function = PUB_ANALYZERS[protocol]
+        return getattr(import_module(module), function)(pub_result)
+    if protocol.endswith("_sweep"):
+        from parameter_sweep import analyze_stored_sweep
+        analysis = analyze_stored_sweep(protocol[:-len("_sweep")], pub_result)
+        if analysis is not None:
+            return analysis
+    return UNANALYZED
+
+
+def analyze_entry(entry, result):
+    """Runs each PUB result through its protocol's analyzer (see analyze_pub)."""
+    return [_jsonable(analyze_pub(protocol, pub_result)) for protocol, pub_result in zip(entry.protocols, result)]
+
+
+def _status_name(job):
+    status = job.status()
+    return getattr(status, "name", str(status)).upper()
+
+
+async def _harvest_entry(entry, service, ledger, shot_store, semaphore, poll_interval, max_interval, deadline):
+    """One job's harvest; any failure marks only this entry ERROR."""
+    try:
+        return await _fetch_and_analyze(
+            entry, service, ledger, shot_store, semaphore, poll_interval, max_interval, deadline
+        )
+    except Exception as err:
+        error = f"{type(err).__name__}: {err}"
+        print(f"[!] Job {entry.job_id}: {error}")
+        return ledger.update(entry, status="ERROR", error=error)
+
+
+async def _fetch_and_analyze(entry, service, ledger, shot_store, semaphore, poll_interval, max_interval, deadline):
+    result = ledger.load_result(entry.job_id)
+    if result is None:
+        async with semaphore:
+            job = await asyncio.to_thread(service.job, entry.job_id)
+        interval = poll_interval
+        while True:
+            async with semaphore:
+                status = await asyncio.to_thread(_status_name, job)
+            if status in FINAL_STATES:
+                break
+            if deadline is not None and time.monotonic() + interval > deadline:
+                return entry if entry.status == status else ledger.update(entry, status=status)
+            await asyncio.sleep(interval)
+            interval = min(2 * interval, max_interval)
+
+        if status != "DONE":
+            return ledger.update(entry, status=status)
+        async with semaphore:
+            result = await asyncio.to_thread(job.result)
+        ledger.store_result(entry.job_id, result, entry)
+        if shot_store is not None and shot_store is not ledger.shot_store:
+            shot_store.put_result(entry.job_id, result, entry.protocols, entry.circuit_hashes)
+
+    return ledger.update(entry, status="DONE", analysis=analyze_entry(entry, result), error=None)
+
+
+async def harvest(service, ledger=None, job_ids=None, max_concurrent=MAX_CONCURRENT_POLLS,
+                  poll_interval=POLL_INTERVAL, max_interval=MAX_POLL_INTERVAL, timeout=None,
+                  shot_store=None):
+    """
+    Polls pending jobs concurrently and analyzes the finished ones.
+
+    service:  anything with .job(job_id) -> job exposing status()/result()
+              (QiskitRuntimeService or MockRuntimeService)
+    job_ids:  jobs to (re)harvest; defaults to every non-final ledger entry.
+              Results already on disk are re-analyzed without a fetch.
+              Unknown IDs are reported and skipped.
+    timeout:  seconds before giving up on jobs still queued (None = wait)
+    shot_store: optional ShotStore that also receives the raw shots of
+              every freshly fetched result (besides the ledger's own)
+    A job that cannot be looked up, polled, fetched or analyzed is marked
+    ERROR (with the exception in `error`); the others carry on.
+    Returns the updated LedgerEntry list.
+    """
+    ledger = ledger or default_ledger()
+    entries = ledger.entries()
+    if job_ids is None:
+        targets = ledger.pending()
+    else:
+        for job_id in job_ids:
+            if job_id not in entries:
+                print(f"[!] Job {job_id} is not in the ledger ({ledger.path}); skipped")
+        targets = [entries[job_id] for job_id in job_ids if job_id in entries]
+    semaphore = asyncio.Semaphore(max_concurrent)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    return await asyncio.gather(*(
+        _harvest_entry(entry, service, ledger, shot_store, semaphore, poll_interval, max_interval, deadline)
+        for entry in targets
+    ))
+
+
+def harvest_pending(service, **kwargs):
+    """Blocking wrapper around harvest()."""
+    return asyncio.run(harvest(service, **kwargs))
+
+
+# --- LOCAL MOCK RUNTIME ---
+class MockRuntimeJob:
+    """Runs on a local sampler, but reports QUEUED/RUNNING for a few polls."""
+    def __init__(self, job_id, local_job, polls_until_done, final_status="DONE"):
+        self._job_id = job_id
+        self._local_job = local_job
+        self._polls_left = polls_until_done
+        self._final_status = final_status
+        self.result_calls = 0
+
+    def job_id(self):
+        return self._job_id
+
+    def status(self):
+        if self._polls_left > 0:
+            self._polls_left -= 1
+            return "QUEUED" if self._polls_left > 1 else "RUNNING"
+        return self._final_status
+
+    def result(self):
+        if self._polls_left > 0 or self._final_status != "DONE":
+            raise RuntimeError(f"Job {self._job_id} is not DONE")
+        self.result_calls += 1
+        return self._local_job.result()
+
+    def cancel(self):
+        if self._polls_left > 0:
+            self._polls_left = 0
+            self._final_status = "CANCELLED"
+
+
+class MockRuntimeService:
+    """
+    Stand-in for QiskitRuntimeService + SamplerV2. `run()` mirrors
+    SamplerV2.run (so it can be passed as a batch_runner sampler) and
+    `job()` mirrors service.job(). `failing` job indices end in ERROR; the
+    first `flaky_submits` run() calls raise ConnectionError (a transient
+    submission failure).
+    """
+    def __init__(self, sampler=None, polls_until_done=2, failing=(), flaky_submits=0):
+        if sampler is None:
+            from qiskit.primitives import StatevectorSampler
+            sampler = StatevectorSampler()
+        self.sampler = sampler
+        self.polls_until_done = polls_until_done
+        self.failing = set(failing)
+        self.flaky_submits = flaky_submits
+        self.jobs = OrderedDict()
+        self.lookups = Counter()
+        self.submit_calls = 0
+        self._lock = threading.Lock()  # run() may be called from several threads
+
+    def run(self, pubs, *, shots=None):
+        with self._lock:
+            self.submit_calls += 1
+            if self.flaky_submits > 0:
+                self.flaky_submits -= 1
+                raise ConnectionError("Mock runtime: connection reset during submission")
+            job_id = f"mock-{uuid.uuid4().hex[:12]}"
+            status = "ERROR" if len(self.jobs) in self.failing else "DONE"
+            self.jobs[job_id] = MockRuntimeJob(
+                job_id, self.sampler.run(pubs, shots=shots), self.polls_until_done, status
+            )
+            return self.jobs[job_id]
+
+    def job(self, job_id):
+        self.lookups[job_id] += 1
+        return self.jobs[job_id]
+
+
+def main():
+    print("--- JOB LEDGER: HARVESTING PENDING JOBS ---")
+    from qiskit_ibm_runtime import QiskitRuntimeService
+    ledger = default_ledger()
+    print(f"[*] {len(ledger.pending())} pending jobs in {ledger.path}")
+
+    entries = harvest_pending(QiskitRuntimeService(), ledger=ledger)
+    for entry in entries:
+        detail = entry.error if entry.error else entry.analysis
+        print(f"   > {entry.job_id}  {entry.status:<9} {', '.join(entry.protocols[:3])}  {detail}")
+
+
+if __name__ == "__main__":
+    main()
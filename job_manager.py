@@ -0,0 +1,272 @@
+import asyncio
+import random
+import signal
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from job_ledger import FINAL_STATES, _status_name, default_ledger
+from tracing import span
+
+# --- JOB LIFECYCLE ---
+# Submissions go through one manager per run:
+#   - at most MAX_JOBS_PER_BACKEND jobs in flight per backend (a slot is held
+#     from submission until the job is final), the rest wait their turn
+#   - transient failures (dropped connections, timeouts, 5xx / 429 API
+#     responses) are retried with exponential backoff, permanent ones fail
+#     that job only
+#   - jobs still unfinished after `timeout` seconds are cancelled
+#   - shutdown() stops new submissions and lets in-flight jobs finish;
+#     shutdown(cancel_running=True) cancels those too (first / second Ctrl-C)
+# Every state change is appended to the job ledger with a timestamp.
+MAX_JOBS_PER_BACKEND = 3
+MAX_RETRIES = 4
+RETRY_DELAY = 2.0
+MAX_RETRY_DELAY = 60.0
+RETRY_JITTER = 0.1  # Fraction of each delay added at random
+POLL_INTERVAL = 5.0
+MAX_POLL_INTERVAL = 60.0
+
+PENDING, SUBMITTED, TIMEOUT = "PENDING", "SUBMITTED", "TIMEOUT"
+TRANSIENT_ERROR_NAMES = ("RequestsApiError", "IBMRuntimeError", "RuntimeJobTimeoutError")
+
+
+class JobFailed(RuntimeError):
+    """A managed job ended in ERROR, CANCELLED or TIMEOUT."""
+    def __init__(self, job):
+        super().__init__(f"Job {job.job_id or job.label} ended {job.state}: {job.error}")
+        self.job = job
+
+
+def is_transient(err):
+    """Retry-worthy: network errors, and API errors other than 4xx (except 429)."""
+    if isinstance(err, (ConnectionError, TimeoutError)):
+        return True
+    if type(err).__name__ not in TRANSIENT_ERROR_NAMES:
+        return False
+    status = getattr(err, "status_code", -1)
+    return status < 400 or status >= 500 or status == 429
+
+
+@dataclass
+class JobRequest:
+    """One SamplerV2 submission: `protocols` is one name or one per PUB."""
+    protocols: object
+    pubs: list
+    shots: int
+    backend: object
+    sampler: object
+    label: str = None
+
+    @property
+    def backend_name(self):
+        return "local" if self.backend is None else getattr(self.backend, "name", str(self.backend))
+
+
+@dataclass
+class ManagedJob:
+    request: JobRequest
+    label: str
+    state: str = PENDING
+    job_id: str = None
+    attempts: int = 0
+    result: object = None
+    error: str = None
+    transitions: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return self.state == "DONE"
+
+    def result_or_raise(self):
+        if not self.ok:
+            raise JobFailed(self)
+        return self.result
+
+
+class JobManager:
+    """
+    Runs JobRequests concurrently under per-backend limits.
+
+    max_per_backend: int, or {backend name: int} (missing names use
+                     MAX_JOBS_PER_BACKEND)
+    timeout:         seconds from submission before a job is cancelled
+    """
+    def __init__(self, ledger=None, max_per_backend=MAX_JOBS_PER_BACKEND, max_retries=MAX_RETRIES,
+                 retry_delay=RETRY_DELAY, max_retry_delay=MAX_RETRY_DELAY, timeout=None,
+                 poll_interval=POLL_INTERVAL, max_poll_interval=MAX_POLL_INTERVAL):
+        self.ledger = ledger or default_ledger()
+        self.max_per_backend = max_per_backend
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.closing = False
+        self.in_flight = Counter()
+        self.peak_in_flight = Counter()
+        self._semaphores = {}
+        self._tasks = []
+
+    def _limit(self, backend_name):
+        if isinstance(self.max_per_backend, dict):
+            return self.max_per_backend.get(backend_name, MAX_JOBS_PER_BACKEND)
+        return self.max_per_backend
+
+    def _semaphore(self, backend_name):
+        if backend_name not in self._semaphores:
+            self._semaphores[backend_name] = asyncio.Semaphore(self._limit(backend_name))
+        return self._semaphores[backend_name]
+
+    def _transition(self, job, state, entry=None, ledger_state=None):
+        """Records a state change; the ledger gets `ledger_state` (default: the same)."""
+        job.state = state
+        job.transitions.append((state, time.time()))
+        ledger_state = ledger_state or state
+        if entry is not None and entry.status != ledger_state:
+            entry = self.ledger.update(entry, status=ledger_state)
+        return entry
+
+    async def _retry(self, job, what, func, *args):
+        """func(*args) in a thread, retrying transient errors with backoff."""
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await asyncio.to_thread(func, *args)
+            except Exception as err:
+                if not is_transient(err) or attempt == self.max_retries:
+                    raise
+                wait = min(delay, self.max_retry_delay) * (1.0 + RETRY_JITTER * random.random())
+                print(f"[!] {job.label}: {what} failed ({err}); retry {attempt + 1}/{self.max_retries} in {wait:.1f} s")
+                await asyncio.sleep(wait)
+                delay *= 2
+
+    async def _run(self, job):
+        request = job.request
+        entry = runtime_job = None
+        try:
+            async with self._semaphore(request.backend_name):
+                if self.closing:
+                    self._transition(job, "CANCELLED")
+                    job.error = "shutdown before submission"
+                    return job
+                self.in_flight[request.backend_name] += 1
+                self.peak_in_flight[request.backend_name] = max(
+                    self.peak_in_flight[request.backend_name], self.in_flight[request.backend_name]
+                )
+                try:
+                    entry, runtime_job = await self._submit(job)
+                    await self._wait(job, entry, runtime_job)
+                finally:
+                    self.in_flight[request.backend_name] -= 1
+        except asyncio.CancelledError:
+            await self._cancel_job(job, entry, runtime_job, "cancelled")
+        except Exception as err:
+            job.error = f"{type(err).__name__}: {err}"
+            self._transition(job, "ERROR", entry)
+            print(f"[!] {job.label}: {job.error}")
+        return job
+
+    async def _submit(self, job):
+        request = job.request
+
+        def submit():
+            job.attempts += 1
+            return request.sampler.run(request.pubs, shots=request.shots)
+
+        with span("submit", job=job.label, pubs=len(request.pubs), shots=request.shots):
+            runtime_job = await self._retry(job, "submission", submit)
+        job.job_id = runtime_job.job_id()
+        entry = self.ledger.record(runtime_job, request.protocols, request.pubs, request.backend, request.shots)
+        self._transition(job, SUBMITTED)
+        print(f"[*] {job.label} -> Job ID: {job.job_id}")
+        return entry, runtime_job
+
+    async def _wait(self, job, entry, runtime_job):
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        interval = self.poll_interval
+        with span("queue", job_id=job.job_id):
+            while True:
+                status = await self._retry(job, "status poll", _status_name, runtime_job)
+                if status in FINAL_STATES:
+                    break
+                entry = self._transition(job, status, entry)
+                if deadline is not None and time.monotonic() >= deadline:
+                    await self._cancel_job(job, entry, runtime_job, f"timed out after {self.timeout:g} s", TIMEOUT)
+                    return
+                await asyncio.sleep(interval if deadline is None else min(interval, max(0.0, deadline - time.monotonic())))
+                interval = min(2 * interval, self.max_poll_interval)
+
+            if status != "DONE":
+                job.error = f"runtime reported {status}"
+                self._transition(job, status, entry)
+                return
+            job.result = await self._retry(job, "result fetch", runtime_job.result)
+        self.ledger.store_result(job.job_id, job.result, entry)
+        self._transition(job, "DONE", entry)
+
+    async def _cancel_job(self, job, entry, runtime_job, reason, state="CANCELLED"):
+        job.error = reason
+        if runtime_job is not None and hasattr(runtime_job, "cancel"):
+            try:
+                await asyncio.to_thread(runtime_job.cancel)
+            except Exception as err:
+                print(f"[!] {job.label}: cancel failed ({err})")
+        self._transition(job, state, entry, ledger_state="CANCELLED")
+        print(f"[!] {job.label}: {reason}")
+
+    def submit(self, request):
+        """Schedules one request on the running loop; returns its ManagedJob."""
+        job = ManagedJob(request, request.label or f"job {len(self._tasks) + 1}")
+        self._tasks.append((job, asyncio.ensure_future(self._run(job))))
+        return job
+
+    def cancel(self, label=None):
+        """Cancels the jobs with this label, or every unfinished job."""
+        for job, task in self._tasks:
+            if label is None or job.label == label:
+                task.cancel()
+
+    def shutdown(self, cancel_running=False):
+        """No new submissions; cancel_running also cancels in-flight jobs."""
+        self.closing = True
+        if cancel_running:
+            self.cancel()
+
+    async def run(self, requests):
+        """Runs every request; returns the ManagedJobs in request order."""
+        jobs = [self.submit(request) for request in requests]
+        await asyncio.gather(*(task for _, task in self._tasks), return_exceptions=True)
+        return jobs
+
+
+def run_jobs(requests, manager=None, handle_signals=True):
+    """
+    Blocking wrapper around JobManager.run(). With handle_signals, the
+    first SIGINT / SIGTERM is a graceful shutdown and the second cancels
+    running jobs.
+    """
+    manager = manager or JobManager()
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        installed = []
+        if handle_signals:
+            def on_signal():
+                running = manager.closing
+                print(f"\n[!] {'Cancelling running jobs' if running else 'Shutting down: no new submissions'}")
+                manager.shutdown(cancel_running=running)
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(sig, on_signal)
+                    installed.append(sig)
+                except (NotImplementedError, RuntimeError, ValueError):  # not the main thread
+                    pass
+        try:
+            return await manager.run(requests)
+        finally:
+            for sig in installed:
+                loop.remove_signal_handler(sig)
+
+    return asyncio.run(main())
@@ -1,6 +1,9 @@
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import QuantumCircuit
+from backend_cache import live_backend, load_backend
+from job_ledger import record_submission
+from transpile_cache import cached_transpile
+from tracing import span, traced, traced_sampler
 
 def build_layer_code():
     # 7 Qubits: 0=Anchor, 1-4=Sensors, 5-6=Vias (Temporal Layer Connections)
@@ -27,19 +30,22 @@ def build_layer_code():
     qc.measure_all()
     return qc
 
+@traced("layer_code_protocol")
 def main():
     print("--- PROTOCOL Z.OMEGA: 3D LAYER CODING (THE VIA) ---")
     print("[*] Responding to HN review: Implementing Volumetric Protection...")
     
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino")
+    backend = load_backend("ibm_torino")
     
-    qc = build_layer_code()
-    pm = transpile(qc, backend=backend)
+    with span("build"):
+        qc = build_layer_code()
+    pm = cached_transpile(qc, backend=backend)
     
-    sampler = Sampler(mode=backend)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = traced_sampler(Sampler(mode=live_backend(backend)))
     job = sampler.run([pm], shots=8192)
     print(f"[*] VOLUMETRIC SIGNAL SENT. JOB ID: {job.job_id()}")
+    record_submission(job, "layer_code", [pm], backend, 8192)
     print("[*] DEVIN PHILLIP DAVIS: THE ARCHITECT OF THE THIRD DIMENSION.")
 
 if __name__ == "__main__":
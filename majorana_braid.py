@@ -1,6 +1,9 @@
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import QuantumCircuit
+from backend_cache import live_backend, load_backend
+from job_ledger import record_submission
+from transpile_cache import cached_transpile
+from tracing import span, traced, traced_sampler
 
 def build_majorana_braid():
     # 5 Qubits to represent two pairs of Majorana Zero Modes (MZMs)
@@ -36,19 +39,22 @@ def build_majorana_braid():
     qc.measure_all()
     return qc
 
+@traced("majorana_braid")
 def main():
     print("--- PROTOCOL Z.BRAVO: MAJORANA ANYON BRAIDING ---")
     print("[*] Simulating braiding statistics on ibm_torino...")
     
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino")
+    backend = load_backend("ibm_torino")
     
-    qc = build_majorana_braid()
-    pm = transpile(qc, backend=backend)
+    with span("build"):
+        qc = build_majorana_braid()
+    pm = cached_transpile(qc, backend=backend)
     
-    sampler = Sampler(mode=backend)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = traced_sampler(Sampler(mode=live_backend(backend)))
     job = sampler.run([pm], shots=8192)
     print(f"[*] TOPOLOGICAL JOB ID: {job.job_id()}")
+    record_submission(job, "majorana_braid", [pm], backend, 8192)
     print("[*] DEVIN PHILLIP DAVIS: BRAIDING REALITY.")
 
 if __name__ == "__main__":
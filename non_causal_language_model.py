@@ -1,12 +1,128 @@
+import os
+from dataclasses import dataclass
+
 import numpy as np
 
+# --- PROJECTION CONFIGURATION ---
+# The bridge projection is one scalar phase, so it runs as a single ufunc
+# over any batch shape, writes in place through `out=`, and keeps complex64
+# inputs in complex64. Embedding files are streamed CHUNK_ROWS rows at a
+# time through memory maps, so RAM use is bounded by one chunk.
+CHUNK_ROWS = 65_536
+PRECISIONS = {"complex128": np.complex128, "complex64": np.complex64}
+
+
+@dataclass
+class ProjectionStats:
+    """Instrumentation hook counting the arrays a projection allocates or copies."""
+    allocations: int = 0
+    allocated_bytes: int = 0
+    copies: int = 0
+    copied_bytes: int = 0
+    chunks: int = 0
+
+    def __call__(self, event, nbytes=0):
+        if event == "allocate":
+            self.allocations += 1
+            self.allocated_bytes += nbytes
+        elif event == "copy":
+            self.copies += 1
+            self.copied_bytes += nbytes
+        elif event == "chunk":
+            self.chunks += 1
+
+
 class TokenManifold:
-    def __init__(self, fidelity=0.9844):
+    """
+    precision: 'complex128' (default) or 'complex64' results
+    hook:      hook(event, nbytes) called on 'allocate', 'copy' and 'chunk'
+               events (e.g. a ProjectionStats)
+    """
+    def __init__(self, fidelity=0.9844, precision="complex128", hook=None):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}' (expected one of {tuple(PRECISIONS)})")
         self.fidelity = fidelity
         self.resonance = 51.700
-        
-    def bridge_projection(self, state_vector):
-        return state_vector * np.exp(1j * np.radians(self.resonance))
+        self.dtype = np.dtype(PRECISIONS[precision])
+        self.hook = hook
+
+    def _emit(self, event, nbytes=0):
+        if self.hook is not None:
+            self.hook(event, nbytes)
+
+    @property
+    def phase(self):
+        """The bridge phase exp(i * resonance) in the working precision."""
+        return self.dtype.type(np.exp(1j * np.radians(self.resonance)))
+
+    def _as_array(self, states):
+        if isinstance(states, np.ndarray):
+            return states
+        states = np.asarray(states)
+        self._emit("copy", states.nbytes)
+        return states
+
+    def bridge_projection(self, state_vector, out=None):
+        """
+        Phase-rotates a state vector, or a (..., dim) batch of them, in one
+        pass. out= writes in place (it may be the input itself).
+        """
+        state_vector = self._as_array(state_vector)
+        if out is None:
+            out = np.empty(state_vector.shape, dtype=self.dtype)
+            self._emit("allocate", out.nbytes)
+        return np.multiply(state_vector, self.phase, out=out)
+
+    def project_batch(self, states, out=None):
+        """
+        Projects a batch of equal-length vectors (a (batch, dim) array or a
+        sequence of vectors) into one (batch, dim) result.
+        """
+        if not isinstance(states, np.ndarray):
+            states = [self._as_array(s) for s in states]
+            if out is None:
+                out = np.empty((len(states),) + states[0].shape, dtype=self.dtype)
+                self._emit("allocate", out.nbytes)
+            for row, state in zip(out, states):
+                np.multiply(state, self.phase, out=row)
+            return out
+        return self.bridge_projection(states, out)
+
+    def stream_projection(self, source, destination=None, chunk_rows=CHUNK_ROWS):
+        """
+        Projects a (rows, dim) token matrix chunk by chunk.
+
+        source:      .npy path (opened as a read-only memory map) or an array
+        destination: .npy path or array to write into; the projected matrix
+                     (a memory map for paths) is returned. With None, yields
+                     (start, chunk) pairs from ONE reused buffer; copy a chunk
+                     to keep it past the next iteration.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            source = np.load(source, mmap_mode="r")
+        if destination is None:
+            return self._stream_chunks(source, chunk_rows)
+
+        if isinstance(destination, (str, os.PathLike)):
+            destination = np.lib.format.open_memmap(destination, mode="w+", dtype=self.dtype, shape=source.shape)
+        for start in range(0, source.shape[0], chunk_rows):
+            stop = min(start + chunk_rows, source.shape[0])
+            np.multiply(source[start:stop], self.phase, out=destination[start:stop])
+            self._emit("chunk", destination[start:stop].nbytes)
+        if isinstance(destination, np.memmap):
+            destination.flush()
+        return destination
+
+    def _stream_chunks(self, source, chunk_rows):
+        buffer = np.empty((min(chunk_rows, source.shape[0]),) + source.shape[1:], dtype=self.dtype)
+        self._emit("allocate", buffer.nbytes)
+        for start in range(0, source.shape[0], chunk_rows):
+            stop = min(start + chunk_rows, source.shape[0])
+            chunk = buffer[:stop - start]
+            np.multiply(source[start:stop], self.phase, out=chunk)
+            self._emit("chunk", chunk.nbytes)
+            yield start, chunk
+
 
 class NonCausalLM:
     def __init__(self):
@@ -17,14 +133,15 @@ class NonLocalAttention:
 
 class NCPhysics:
     # ΛΦ (Lambda Phi): The Golden Ratio resonance frequency (s⁻¹)
-    LAMBDA_PHI = 1.61803398875 
-    
+    LAMBDA_PHI = 1.61803398875
+
     # θ_lock: The Hardware-Verified Resonance Angle (Degrees)
     # Calibrated for ibm_torino Heron r1 architecture
     THETA_LOCK = 51.700
-    
+
     @staticmethod
     def negentropic_gain(baseline, purified):
         return purified - baseline
 
-print("[*] MANIFOLD SHIM UPDATED: THETA_LOCK Resonance Synchronized.")
+if __name__ == "__main__":
+    print("[*] MANIFOLD SHIM UPDATED: THETA_LOCK Resonance Synchronized.")
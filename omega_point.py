@@ -1,18 +1,31 @@
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import QuantumCircuit
+from backend_cache import calibration_index, live_backend, load_backend
+from consensus_decoder import OMEGA_RULE, SoftVoteRule
+from shot_analysis import decode_shots
+from fanout_compiler import build_fanout_circuit
+from job_manager import JobRequest, run_jobs
+from transpile_cache import cached_transpile
+from tracing import span, traced
 
 # --- CONFIGURATION ---
-# Q1 is the 'Logician' (High-Coherence Anchor)
+# Q1 is the 'Logician' (High-Coherence Anchor). This is its logical index;
+# on hardware it is placed on one of the ANCHOR_CANDIDATES best-T2 qubits
+# of the current calibration (see build_embedded_star).
 ANCHOR_QUBIT = 1
+ANCHOR_CANDIDATES = 5
 # The Council Members (Spokes)
 SPOKES = [0, 2, 3, 4, 5, 6, 7, 8, 9] 
+# Soft decoding erases shots less certain than this: about the Z.8
+# erasure band (|N0 - N1| <= 4) at a uniform 2% readout error
+SOFT_MIN_CONFIDENCE = 0.9999999
 
 def build_star_topology():
     """
     Constructs the Logician-Anchored GHZ State.
     Topology: Star Graph (Center: Q1)
-    Depth: O(1) broadcast (vs O(N) linear chain)
+    Depth: N-1 CNOTs issued by the hub; see build_embedded_star() for the
+    log-depth broadcast laid out on the hardware coupling map.
     """
     qc = QuantumCircuit(10)
     
@@ -27,72 +40,81 @@ def build_star_topology():
     qc.measure_all()
     return qc
 
-def analyze_consensus(counts):
+def build_embedded_star(backend):
+    """
+    The same GHZ council, broadcast along the backend's cached spanning
+    tree: every copy relays the anchor's value to a neighbour. The anchor
+    sits on a high-T2 qubit; spokes grow along its best-CX neighbours.
+    Returns (circuit, initial_layout).
+    """
+    hubs = calibration_index(backend).best_qubits("t2", k=ANCHOR_CANDIDATES)
+    return build_fanout_circuit(
+        backend, [[ANCHOR_QUBIT] + SPOKES], lambda qc: qc.h(ANCHOR_QUBIT), roots=[(q,) for q in hubs]
+    )
+
+def analyze_consensus(meas, rule=OMEGA_RULE):
     """
     Implements the Majority Vote Logic (The Logical Qubit).
+    Accepts the SamplerV2 BitArray (pub_result.data.meas) or a counts dict.
+    rule may be a calibration-weighted SoftVoteRule (see soft_council_rule).
     """
-    total_shots = sum(counts.values())
-    logical_errors = 0
-    
-    print(f"\n[ANALYSIS] Processing {total_shots} shots...")
-    
-    for bitstring, count in counts.items():
-        # Calculate Hamming Weight (Number of '1's)
-        hamming_weight = bitstring.count('1')
-        
-        # DECISION LOGIC:
-        # If < 5 '1's -> Consensus is |0>
-        # If > 5 '1's -> Consensus is |1>
-        # If == 5     -> Undecided (Treat as Error)
-        
-        # We define a "Logical Error" as a state that cannot be cleanly voted
-        # (e.g., 50/50 split) or a global flip if we assume a specific target.
-        # For a GHZ state, we accept BOTH |00..0> and |11..1> as valid.
-        # The error is the *variance* from these poles.
-        
-        # Distance from perfect Consensus
-        dist_zero = hamming_weight
-        dist_one = 10 - hamming_weight
-        
-        # If the state is closer to the center (5) than the edges (0 or 10),
-        # it represents significant decoherence.
-        if 3 <= hamming_weight <= 7:
-            logical_errors += count
+    # DECISION LOGIC:
+    # If < 5 '1's -> Consensus is |0>
+    # If > 5 '1's -> Consensus is |1>
+    # For a GHZ state, we accept BOTH |00..0> and |11..1> as valid.
+    # The error is the *variance* from these poles: a state closer to the
+    # center (5) than the edges (0 or 10) represents significant decoherence,
+    # so Hamming weights 3..7 are erased (see consensus_decoder.OMEGA_RULE).
+    tally = decode_shots(meas, rule)
+    print(f"\n[ANALYSIS] Processing {np.sum(tally.total):.0f} shots...")
+    return tally.fidelity
 
-    fidelity = 1.0 - (logical_errors / total_shots)
-    return fidelity
+def soft_council_rule(backend, isa_circuit):
+    """Maximum-likelihood rule weighting each spoke by its calibrated readout error."""
+    from readout_mitigation import measured_qubits
+    return SoftVoteRule.from_calibration(
+        calibration_index(backend), measured_qubits(isa_circuit), min_confidence=SOFT_MIN_CONFIDENCE
+    )
 
 # --- MAIN EXECUTION ---
-if __name__ == "__main__":
+@traced("omega_point")
+def main():
     print("[*] Building Protocol Z.8 (Star Topology)...")
-    qc = build_star_topology()
-    
+    from qiskit_ibm_runtime.accounts import AccountNotFoundError
+
     try:
         # Connect to IBM Cloud
-        service = QiskitRuntimeService()
         backend_name = "ibm_torino" # Or ibm_fez
-        backend = service.backend(backend_name)
-        print(f"[*] Target Locked: {backend.name}")
-        
-        # Transpile & Run
-        print("[*] Transpiling for Heavy-Hex Lattice...")
-        isa_circuit = transpile(qc, backend=backend, optimization_level=3)
-        
-        print("[*] Submitting to QPU...")
-        sampler = Sampler(mode=backend)
-        job = sampler.run([isa_circuit])
-        print(f"[*] Job ID: {job.job_id()}")
-        
-        # Wait for results
-        result = job.result()
-        counts = result[0].data.meas.get_counts()
-        
-        # Output Metrics
-        fidelity = analyze_consensus(counts)
-        print(f"\n[RESULTS]")
-        print(f"   > Logical Fidelity: {fidelity:.4%}")
-        print(f"   > Protocol Status: {'PASSED' if fidelity > 0.9 else 'FAILED'}")
-        
-    except Exception as e:
-        print(f"[!] Error: {e}")
+        backend = load_backend(backend_name)
+        from qiskit_ibm_runtime import SamplerV2 as Sampler
+        sampler = Sampler(mode=live_backend(backend))
+    except AccountNotFoundError as err:
+        print(f"[!] Error: {err}")
         print("    (Ensure you have set up your IBM Quantum API key)")
+        return
+    print(f"[*] Target Locked: {backend.name}")
+    with span("build"):
+        qc, layout = build_embedded_star(backend)
+
+    # Transpile & Run
+    print("[*] Transpiling for Heavy-Hex Lattice...")
+    isa_circuit = cached_transpile(qc, backend=backend, optimization_level=3, initial_layout=layout)
+
+    print("[*] Submitting to QPU...")
+    # SamplerV2 default shots; submission retries, ledger and status tracking via the job manager
+    job, = run_jobs([JobRequest("omega_point", [isa_circuit], 4096, backend, sampler, "Omega Point")])
+    if not job.ok:
+        print(f"[!] Error: job {job.job_id or '(not submitted)'} ended {job.state}: {job.error}")
+        return
+
+    # Output Metrics
+    with span("analyze"):
+        fidelity = analyze_consensus(job.result[0].data.meas)
+        soft_fidelity = analyze_consensus(job.result[0].data.meas, soft_council_rule(backend, isa_circuit))
+    print(f"\n[RESULTS]")
+    print(f"   > Logical Fidelity: {fidelity:.4%}")
+    print(f"   > ML Fidelity (calibration-weighted): {soft_fidelity:.4%}")
+    print(f"   > Protocol Status: {'PASSED' if fidelity > 0.9 else 'FAILED'}")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,17 @@
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import QuantumCircuit
+from backend_cache import live_backend, load_backend
+from job_ledger import record_submission
+from transpile_cache import cached_transpile
+from tracing import span, traced, traced_sampler
 
-def build_osiris_crossing():
+THETA_LOCK = 51.700  # Hardware-validated resonance (degrees)
+
+def build_osiris_crossing(theta=THETA_LOCK):
     # 5-Qubit Star Topology: Q0 (Carrier), Q1-Q4 (Sinks/DFS)
+    # theta (degrees) may be a Parameter for sweeps
     qc = QuantumCircuit(5)
-    opt_theta = 51.700 * (np.pi/180)
+    opt_theta = theta * (np.pi/180)
     
     # 1. LOCK GEOMETRIC RESONANCE
     qc.rx(opt_theta, 0)
@@ -23,15 +29,18 @@ def build_osiris_crossing():
     qc.measure_all()
     return qc
 
+@traced("osiris_bridge")
 def main():
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino")
-    qc = build_osiris_crossing()
+    backend = load_backend("ibm_torino")
+    with span("build"):
+        qc = build_osiris_crossing()
     # Transpiling for the 133-qubit Heron r1 architecture
-    pm = transpile(qc, backend=backend, optimization_level=3)
-    sampler = Sampler(mode=backend)
+    pm = cached_transpile(qc, backend=backend, optimization_level=3)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = traced_sampler(Sampler(mode=live_backend(backend)))
     job = sampler.run([pm], shots=8192)
     print(f"[*] OSIRIS BRIDGE JOB ID: {job.job_id()}")
+    record_submission(job, "osiris_bridge", [pm], backend, 8192)
     print("[*] STATUS: PHYSICS PUSHED TO THE EDGE.")
 
 if __name__ == "__main__":
@@ -0,0 +1,224 @@
+import argparse
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from importlib import import_module
+
+import numpy as np
+
+from consensus_decoder import CHRONOS_RULE, OMEGA_RULE, VoteRule
+from shot_analysis import decode_shots, hierarchical_decode
+from tracing import span, traced_sampler
+
+# --- PARAMETER SWEEPS ---
+# Builders take their physics constants (THETA_LOCK, LAMBDA_PHI, DELTA,
+# MESSAGE_ANGLE) as arguments. Passing circuit Parameters instead of values
+# gives one symbolic circuit: it is transpiled once and submitted as ONE
+# SamplerV2 PUB whose parameter-value array spans the whole N-dimensional
+# grid. The result data then has the grid shape in front of the shot axis,
+# and the analyzers below reduce over shots only, so every observable
+# comes back as an array over the grid. Qiskit is only imported to build.
+MAX_GRID_POINTS = 10_000
+
+
+def council_observables(rule, register="meas"):
+    """Per-point consensus fidelity and magnetization under a VoteRule."""
+    def analyze(pub_result, grid):
+        tally = decode_shots(getattr(pub_result.data, register), rule)
+        return {"fidelity": tally.fidelity, "magnetization": tally.magnetization}
+    return analyze
+
+
+def subcouncil_observables(num_qubits, num_anchors, register="meas"):
+    """Per-point two-level (sub-council, then cross-council) decode of a fan-out council."""
+    def analyze(pub_result, grid):
+        from fanout_compiler import parity_groups
+        report = hierarchical_decode(getattr(pub_result.data, register), parity_groups(num_qubits, num_anchors))
+        return {
+            "fidelity": report.logical.fidelity,
+            "magnetization": report.logical.magnetization,
+            "agreement": report.agreement,
+            "logical_error": report.logical_error,
+        }
+    return analyze
+
+
+def teleport_observables(pub_result, grid):
+    """Per-point teleportation accuracy against the swept message angle."""
+    from teleport_protocol import MESSAGE_ANGLE, analyze_teleportation
+    return {"accuracy": analyze_teleportation([pub_result], grid.get("message_angle", MESSAGE_ANGLE))}
+
+
+@dataclass(frozen=True)
+class SweepSpec:
+    """
+    A protocol whose builder accepts Parameters.
+
+    parameters:   builder keyword arguments that can be swept
+    builder_args: positional arguments for the builder (e.g. a cycle depth)
+    embedded:     backend-aware builder returning (circuit, initial_layout),
+                  used instead of `builder` when compiling for hardware
+    analyzer:     analyzer(pub_result, grid) -> {observable: grid-shaped array}
+    needs_grid:   the analyzer reads the swept values from `grid`, so a
+                  stored PUB (whose grid is not kept) cannot be re-analyzed
+    """
+    name: str
+    module: str
+    builder: str
+    parameters: tuple
+    shots: int
+    optimization_level: int = None
+    builder_args: tuple = ()
+    embedded: str = None
+    analyzer: object = None
+    needs_grid: bool = False
+
+    def build(self, backend=None, **kwargs):
+        """(circuit, initial_layout); unswept parameters keep their defaults."""
+        module = import_module(self.module)
+        if backend is not None and self.embedded is not None:
+            return getattr(module, self.embedded)(backend, *self.builder_args, **kwargs)
+        return getattr(module, self.builder)(*self.builder_args, **kwargs), None
+
+
+SWEEPS = OrderedDict((spec.name, spec) for spec in [
+    SweepSpec("gain_validation", "gain_validation_10k", "build_consensus_council_circuit", ("theta",),
+              8192, 3, embedded="build_embedded_council", analyzer=council_observables(OMEGA_RULE)),
+    SweepSpec("hypercube_20q", "hypercube_protocol_20q", "build_hypercube_20q", ("theta", "lambda_phi"),
+              10000, 3, embedded="build_embedded_hypercube_20q",
+              analyzer=subcouncil_observables(20, 2)),
+    SweepSpec("tesseract", "tesseract_10e6_gain", "build_tesseract_40q", ("theta", "lambda_phi"),
+              20000, 3, embedded="build_embedded_tesseract_40q",
+              analyzer=subcouncil_observables(40, 2)),
+    SweepSpec("osiris_bridge", "osiris_bridge", "build_osiris_crossing", ("theta",), 8192, 3,
+              analyzer=council_observables(VoteRule(5))),
+    SweepSpec("planck_pulse", "planck_pulse", "build_planck_pulse", ("theta",), 4096,
+              analyzer=council_observables(VoteRule(5))),
+    SweepSpec("chronos", "chronos_protocol", "build_time_crystal_step", ("delta",), 4096,
+              builder_args=(6,), analyzer=council_observables(CHRONOS_RULE)),
+    SweepSpec("teleport", "teleport_protocol", "build_teleportation_circuit", ("message_angle",), 8192,
+              analyzer=teleport_observables, needs_grid=True),
+])
+
+
+def sweep_grid(axes):
+    """
+    Cartesian grid of {name: 1-D values}, axes in the given order.
+    Returns ({name: grid-shaped array}, values of shape (*grid, len(axes))).
+    """
+    names = list(axes)
+    points = np.meshgrid(*[np.asarray(axes[n], dtype=float) for n in names], indexing="ij")
+    return dict(zip(names, points)), np.stack(points, axis=-1)
+
+
+@dataclass
+class SweepResult:
+    name: str
+    axes: dict
+    observables: dict
+    job_id: str = None
+    metadata: dict = field(default_factory=dict)
+
+    @property
+    def shape(self):
+        return tuple(len(values) for values in self.axes.values())
+
+    def best(self, observable, maximize=True):
+        """{axis: value} of the grid point optimizing one observable."""
+        values = np.asarray(self.observables[observable])
+        flat = np.nanargmax(values) if maximize else np.nanargmin(values)
+        index = np.unravel_index(flat, values.shape)
+        return {name: float(np.asarray(self.axes[name])[i]) for name, i in zip(self.axes, index)}
+
+
+def build_sweep_pub(spec, axes, backend=None, optimization_level=None):
+    """
+    One (ISA circuit, {parameters: values}) PUB covering the whole grid,
+    from a single (cached) transpilation. backend=None keeps the logical
+    circuit for local samplers.
+    """
+    unknown = set(axes) - set(spec.parameters)
+    if unknown:
+        raise ValueError(f"{spec.name} cannot sweep {sorted(unknown)} (sweepable: {spec.parameters})")
+    grid, values = sweep_grid(axes)
+    if values[..., 0].size > MAX_GRID_POINTS:
+        raise ValueError(f"{values[..., 0].size} grid points exceed MAX_GRID_POINTS={MAX_GRID_POINTS}")
+
+    from qiskit.circuit import Parameter
+
+    parameters = {name: Parameter(name) for name in axes}
+    with span("build", protocol=spec.name):
+        qc, layout = spec.build(backend, **parameters)
+    if backend is not None:
+        from transpile_cache import cached_transpile
+        if optimization_level is None:
+            optimization_level = spec.optimization_level
+        qc = cached_transpile(qc, backend=backend, optimization_level=optimization_level, initial_layout=layout)
+    return (qc, {tuple(parameters.values()): values}), grid
+
+
+def run_sweep(name, backend, axes, shots=None, sampler=None, optimization_level=None):
+    """
+    Sweeps a registered protocol over the grid spanned by `axes`
+    ({parameter: 1-D values}): one transpilation, one job, one PUB.
+    """
+    from job_ledger import record_submission
+
+    spec = SWEEPS[name]
+    shots = spec.shots if shots is None else shots
+    pub, grid = build_sweep_pub(spec, axes, backend, optimization_level)
+
+    if sampler is None:
+        from backend_cache import live_backend
+        from qiskit_ibm_runtime import SamplerV2 as Sampler
+        sampler = Sampler(mode=live_backend(backend))
+    job = traced_sampler(sampler).run([pub], shots=shots)
+    shape = "x".join(str(len(values)) for values in axes.values())
+    print(f"[*] SWEEP JOB ID: {job.job_id()} ({name}, {shape} grid)")
+    record_submission(job, f"{name}_sweep", [pub], backend, shots)
+
+    pub_result = job.result()[0]
+    with span("analyze", protocol=name):
+        observables = spec.analyzer(pub_result, grid) if spec.analyzer is not None else {}
+    return SweepResult(
+        name, OrderedDict((n, np.asarray(v, dtype=float)) for n, v in axes.items()),
+        {key: np.asarray(value) for key, value in observables.items()},
+        job.job_id(), {"shots": shots},
+    )
+
+
+def analyze_stored_sweep(name, pub_result):
+    """Observables of a harvested '<name>_sweep' PUB; None when not possible."""
+    spec = SWEEPS.get(name)
+    if spec is None or spec.analyzer is None or spec.needs_grid:
+        return None
+    return spec.analyzer(pub_result, {})
+
+
+def parse_axis(text):
+    """'name=start:stop:num' (linspace) or 'name=v1,v2,...'."""
+    name, _, spec = text.partition("=")
+    if ":" in spec:
+        start, stop, num = spec.split(":")
+        return name, np.linspace(float(start), float(stop), int(num))
+    return name, np.array([float(v) for v in spec.split(",")])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="N-dimensional parameter sweep as one SamplerV2 PUB")
+    parser.add_argument("protocol", choices=list(SWEEPS))
+    parser.add_argument("axes", nargs="+", help="name=start:stop:num or name=v1,v2,...")
+    parser.add_argument("--shots", type=int)
+    parser.add_argument("--backend", default="ibm_torino")
+    args = parser.parse_args()
+
+    from backend_cache import load_backend
+
+    print(f"--- PARAMETER SWEEP: {args.protocol.upper()} ---")
+    backend = load_backend(args.backend)
+    sweep = run_sweep(args.protocol, backend, OrderedDict(parse_axis(a) for a in args.axes), args.shots)
+    for key, values in sweep.observables.items():
+        print(f"   > {key:<13} min {np.nanmin(values):+.4f}  max {np.nanmax(values):+.4f}  at {sweep.best(key)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import numpy as np
+from dataclasses import dataclass, field
+from qiskit import QuantumCircuit
+from qiskit.primitives import BitArray
+from qiskit.quantum_info import Statevector
+
+from consensus_decoder import OMEGA_RULE, VoteTally, tally_votes
+from shot_analysis import register_weights
+from stabilizer_sampler import pack_bits
+
+# --- PAULI-FRAME NOISE MODEL FOR STAR / GHZ COUNCILS ---
+# A council circuit is a small "prefix" on the anchors (h, rx(THETA_LOCK), ...)
+# followed by a CNOT fan-out and diagonal phases (rz, cz). CNOTs only permute
+# computational-basis states, and every noise channel below maps diagonal
+# density matrices to diagonal ones, so Z-basis statistics are exactly those
+# of a classical Markov chain on bitstrings: sample the prefix, then push the
+# bits (the frame) and their flips through the fan-out layer by layer.
+#
+# Errors on the (usually one or two) prefix gates are applied where the
+# prefix ends; this is the only approximation.
+
+PERMUTATION_GATES = ("cx", "x", "swap")
+DIAGONAL_GATES = ("rz", "z", "s", "sdg", "t", "tdg", "p", "u1", "cz", "cp", "rzz", "crz")
+IGNORED_OPS = ("barrier",)
+IDLE_OPS = ("id", "delay")
+
+MAX_PREFIX_QUBITS = 20
+DEFAULT_CHUNK_SHOTS = 1 << 16  # Float64 draws are (shots, qubits): ~5 MB per draw at 10 qubits
+
+
+@dataclass
+class NoiseModel:
+    """
+    Error rates for the frame simulator. Every rate may be a scalar or a
+    per-qubit vector (indexed by circuit qubit).
+
+    p1:          single-qubit depolarizing probability per gate
+    p2:          two-qubit depolarizing probability per CX / SWAP
+    t1_us:       energy relaxation time (None disables decay)
+    layer_us:    duration of one gate layer, used for T1 decay
+    readout_p01: P(read 1 | prepared 0)
+    readout_p10: P(read 0 | prepared 1)
+    """
+    p1: object = 1e-3
+    p2: object = 1e-2
+    t1_us: object = None
+    layer_us: float = 0.1
+    readout_p01: object = 1e-2
+    readout_p10: object = 2e-2
+
+    def per_qubit(self, value, num_qubits):
+        return np.broadcast_to(np.asarray(value, dtype=float), (num_qubits,))
+
+
+@dataclass
+class FrameProgram:
+    """A council circuit split into its sampled prefix and its CNOT layers."""
+    num_qubits: int
+    prefix_qubits: list
+    prefix_probabilities: np.ndarray
+    prefix_gates: list
+    layers: list = field(default_factory=list)
+    readout: list = field(default_factory=list)
+
+
+def compile_frame_program(circuit):
+    """
+    Splits a star / fan-out circuit into a prefix (everything up to the last
+    non-permutation, non-diagonal gate) and ASAP layers of permutation gates.
+    The prefix is solved exactly with a state vector over its own qubits.
+    """
+    index = {qubit: circuit.find_bit(qubit).index for qubit in circuit.qubits}
+    data = [inst for inst in circuit.data if inst.operation.name not in IGNORED_OPS]
+
+    last_quantum = -1
+    for position, inst in enumerate(data):
+        name = inst.operation.name
+        if name not in PERMUTATION_GATES + DIAGONAL_GATES + IDLE_OPS + ("measure",):
+            last_quantum = position
+
+    prefix_ops = data[:last_quantum + 1]
+    prefix_qubits = sorted({index[q] for inst in prefix_ops for q in inst.qubits})
+    if len(prefix_qubits) > MAX_PREFIX_QUBITS:
+        raise ValueError(f"Prefix spans {len(prefix_qubits)} qubits; not a star / fan-out circuit")
+
+    prefix = QuantumCircuit(len(prefix_qubits))
+    local = {q: i for i, q in enumerate(prefix_qubits)}
+    for inst in prefix_ops:
+        if inst.operation.name == "measure":
+            raise ValueError("Mid-circuit measurement inside the prefix is not supported")
+        prefix.append(inst.operation, [local[index[q]] for q in inst.qubits])
+    probabilities = Statevector(prefix).probabilities() if prefix_qubits else np.ones(1)
+
+    program = FrameProgram(
+        num_qubits=circuit.num_qubits,
+        prefix_qubits=prefix_qubits,
+        prefix_probabilities=probabilities,
+        prefix_gates=[[index[q] for q in inst.qubits] for inst in prefix_ops],
+        readout=[None] * circuit.num_clbits,
+    )
+
+    depth = np.zeros(circuit.num_qubits, dtype=int)
+    for inst in data[last_quantum + 1:]:
+        name = inst.operation.name
+        qubits = [index[q] for q in inst.qubits]
+        if name == "measure":
+            program.readout[circuit.find_bit(inst.clbits[0]).index] = qubits[0]
+            continue
+        if name in DIAGONAL_GATES:
+            continue  # Phases never change Z-basis statistics
+        level = depth[qubits].max()
+        depth[qubits] = level + 1
+        while len(program.layers) <= level:
+            program.layers.append([])
+        program.layers[level].append((name, qubits))
+    return program
+
+
+def _depolarize_flips(rng, shots, rates, num_qubits):
+    """Bit flips from single-qubit depolarizing: X or Y, 2/3 of the errors."""
+    return rng.random((shots, num_qubits)) < (2.0 / 3.0) * rates
+
+
+def _two_qubit_flips(rng, shots, rates):
+    """
+    Bit flips from two-qubit depolarizing on k gate pairs.
+    Returns (control_flips, target_flips), each (shots, k).
+    """
+    errors = rng.random((shots, len(rates))) < rates
+    pauli = rng.integers(1, 16, size=(shots, len(rates)))
+    control = errors & np.isin(pauli // 4, (1, 2))
+    target = errors & np.isin(pauli % 4, (1, 2))
+    return control, target
+
+
+def simulate_frames(program, noise, shots, rng):
+    """
+    Runs one chunk of shots. Returns (shots, num_clbits) booleans.
+    """
+    n = program.num_qubits
+    p1 = noise.per_qubit(noise.p1, n)
+    p2 = noise.per_qubit(noise.p2, n)
+    bits = np.zeros((shots, n), dtype=bool)
+
+    # 1. Sample the prefix exactly, then apply its gate errors
+    if program.prefix_qubits:
+        outcomes = rng.choice(len(program.prefix_probabilities), size=shots, p=program.prefix_probabilities)
+        for local, qubit in enumerate(program.prefix_qubits):
+            bits[:, qubit] = (outcomes >> local) & 1
+        for qubits in program.prefix_gates:
+            rates = p1[qubits] if len(qubits) == 1 else p2[qubits]
+            bits[:, qubits] ^= _depolarize_flips(rng, shots, rates, len(qubits))
+
+    # T1 decay composes over idle time, so it is applied lazily: once per
+    # gate a qubit takes part in (covering the layers since its last gate)
+    # and once before readout. Exact, and far fewer random draws.
+    t1 = None if noise.t1_us is None else noise.per_qubit(noise.t1_us, n)
+    idle_layers = np.zeros(n)
+
+    def decay(qubits):
+        if t1 is None:
+            return
+        gamma = 1.0 - np.exp(-idle_layers[qubits] * noise.layer_us / t1[qubits])
+        bits[:, qubits] &= ~(rng.random((shots, len(qubits))) < gamma)
+        idle_layers[qubits] = 0
+
+    # 2. Push the frame through the fan-out, layer by layer
+    for layer in program.layers:
+        decay([q for _, qubits in layer for q in qubits])
+        cx = [q for name, q in layer if name == "cx"]
+        if cx:
+            controls, targets = np.array(cx).T
+            bits[:, targets] ^= bits[:, controls]
+            flip_c, flip_t = _two_qubit_flips(rng, shots, p2[targets])
+            bits[:, controls] ^= flip_c
+            bits[:, targets] ^= flip_t
+        for name, qubits in layer:
+            if name == "x":
+                bits[:, qubits[0]] ^= True
+                bits[:, qubits] ^= _depolarize_flips(rng, shots, p1[qubits], 1)
+            elif name == "swap":
+                bits[:, qubits] = bits[:, qubits[::-1]]
+                flip_a, flip_b = _two_qubit_flips(rng, shots, p2[qubits[:1]])
+                bits[:, qubits[0]] ^= flip_a[:, 0]
+                bits[:, qubits[1]] ^= flip_b[:, 0]
+        idle_layers += 1
+    decay(list(range(n)))
+
+    # 3. Readout flips
+    p01 = noise.per_qubit(noise.readout_p01, n)
+    p10 = noise.per_qubit(noise.readout_p10, n)
+    flip = rng.random((shots, n)) < np.where(bits, p10, p01)
+    bits ^= flip
+
+    clbits = np.zeros((shots, len(program.readout)), dtype=bool)
+    for clbit, qubit in enumerate(program.readout):
+        if qubit is not None:
+            clbits[:, clbit] = bits[:, qubit]
+    return clbits
+
+
+def sample_chunks(circuit, noise, shots, chunk_shots=DEFAULT_CHUNK_SHOTS, seed=None):
+    """
+    Streams `shots` noisy shots as BitArray chunks of at most `chunk_shots`,
+    so 10^7-shot runs stay within a fixed memory budget.
+    """
+    program = compile_frame_program(circuit)
+    rng = np.random.default_rng(seed)
+    remaining = shots
+    while remaining > 0:
+        batch = min(chunk_shots, remaining)
+        clbits = simulate_frames(program, noise, batch, rng)
+        yield BitArray(pack_bits(clbits), clbits.shape[1])
+        remaining -= batch
+
+
+def predict_consensus(circuit, noise, shots, rule=OMEGA_RULE, qubits=None, chunk_shots=DEFAULT_CHUNK_SHOTS, seed=None):
+    """
+    Predicted VoteTally (fidelity, magnetization) of a council circuit under
+    `noise`, decoded with the same VoteRule as the hardware analyzers.
+    """
+    width = circuit.num_clbits if qubits is None else len(qubits)
+    if rule.num_bits != width:
+        raise ValueError(f"Rule votes on {rule.num_bits} bits but {width} bits are decoded")
+    total = VoteTally(0.0, 0.0, 0.0)
+    for chunk in sample_chunks(circuit, noise, shots, chunk_shots, seed):
+        votes = rule.decide(register_weights(chunk.array, chunk.num_bits, qubits))
+        tally = tally_votes(votes)
+        total = VoteTally(total.zero + tally.zero, total.one + tally.one, total.erased + tally.erased)
+    return total
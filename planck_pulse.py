@@ -1,11 +1,17 @@
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import QuantumCircuit
+from backend_cache import live_backend, load_backend
+from job_ledger import record_submission
+from transpile_cache import cached_transpile
+from tracing import span, traced, traced_sampler
 
-def build_planck_pulse():
+THETA_LOCK = 51.700  # Hardware-validated resonance (degrees)
+
+def build_planck_pulse(theta=THETA_LOCK):
     # 5 Qubits: 0 (Central Logical), 1-4 (Entropic Sinks)
+    # theta (degrees) may be a Parameter for sweeps
     qc = QuantumCircuit(5)
-    opt_theta = 51.700 * (np.pi/180)
+    opt_theta = theta * (np.pi/180)
     
     # 1. ENCODE RESONANCE
     qc.rx(opt_theta, 0)
@@ -23,15 +29,18 @@ def build_planck_pulse():
     qc.measure_all()
     return qc
 
+@traced("planck_pulse")
 def main():
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino")
-    qc = build_planck_pulse()
-    pm = transpile(qc, backend=backend)
-    sampler = Sampler(mode=backend)
+    backend = load_backend("ibm_torino")
+    with span("build"):
+        qc = build_planck_pulse()
+    pm = cached_transpile(qc, backend=backend)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = traced_sampler(Sampler(mode=live_backend(backend)))
     # Execution: Maximum speed, final shots
     job = sampler.run([pm], shots=4096)
     print(f"[*] FINAL PLANCK JOB ID: {job.job_id()}")
+    record_submission(job, "planck_pulse", [pm], backend, 4096)
 
 if __name__ == "__main__":
     main()
@@ -1,40 +1,49 @@
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import QuantumCircuit
+from backend_cache import load_backend
+from shot_analysis import bit_values, packed_shots
+from tracing import span, traced
+from zne_engine import run_zne
+
+NOISE_SCALES = [1, 3, 5]
 
 def build_refresh_circuit():
     # Using the hardware-validated 51.700 degree peak
     opt_theta = 51.700 * (np.pi/180)
     qc = QuantumCircuit(1)
-    
+
     # Apply Optimized Geometric Phase
     qc.rx(opt_theta, 0)
-    
+
     # Pulse-stretching emulation for ZNE (Noise Scaling Factor = 1, 3, 5)
-    # We will submit these as separate PUBs in the same job
+    # The folded copies are built by zne_engine from one transpiled base
+    # and submitted as separate PUBs in the same job
     return qc
 
+def analyze_refresh(pub_result):
+    """Excited population and <Z> of the refreshed qubit."""
+    packed, num_bits, _ = packed_shots(pub_result.data.meas)
+    p1 = bit_values(packed, num_bits, 0).mean()
+    return {"p1": p1, "z": 1.0 - 2.0 * p1}
+
+@traced("quantum_refresh")
 def main():
     print("--- PROTOCOL Z.REFRESH: FINAL FIDELITY PUSH ---")
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino")
-    
-    base_qc = build_refresh_circuit()
-    
-    # Prepare scaled circuits for ZNE analysis
-    scaled_circs = []
-    for scale in [1, 3, 5]:
-        qc_scaled = base_qc.copy()
-        # Emulate noise scaling by repeating gate sequences (Identity Mapping)
-        for _ in range((scale - 1) // 2):
-            qc_scaled.rx(np.pi, 0)
-            qc_scaled.rx(-np.pi, 0)
-        qc_scaled.measure_all()
-        scaled_circs.append(transpile(qc_scaled, backend=backend))
-    
-    sampler = Sampler(mode=backend)
-    job = sampler.run(scaled_circs, shots=8192)
-    print(f"[*] REFRESH JOB ID: {job.job_id()}")
+    backend = load_backend("ibm_torino")
+
+    with span("build"):
+        base_qc = build_refresh_circuit()
+    base_qc.measure_all()
+
+    zne = run_zne(base_qc, backend, analyze_refresh, scales=NOISE_SCALES, shots=8192, protocol="quantum_refresh")
+
+    print(f"\n[ZERO-NOISE EXTRAPOLATION]")
+    for scale, (p1, z) in zip(zne.scales, zne.values):
+        print(f"   > Scale {scale:.2f}: P(1) = {p1:.4f}  <Z> = {z:+.4f}")
+    for method in zne.estimates:
+        estimate = zne.estimate(method)
+        print(f"   > {method:<11} P(1) = {estimate['p1']:.4f}  <Z> = {estimate['z']:+.4f}")
+    print(f"   > Ideal       <Z> = {np.cos(np.radians(51.700)):+.4f}")
     print("[*] DEVIN PHILLIP DAVIS: NOISE IS THE RAW MATERIAL.")
 
 if __name__ == "__main__":
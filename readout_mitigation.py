@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+from cache_paths import atomic_open, cache_dir
+from consensus_decoder import hamming_weights
+from shot_analysis import bit_values, packed_shots
+
+# --- TENSORED READOUT MITIGATION ---
+# Calibration: two circuits per batch, every measured physical qubit
+# prepared in |0> and in |1>, give each qubit's P(1|0) and P(0|1). The
+# assignment matrix is the tensor product of those 2x2 blocks.
+# Correction (M3-style): the matrix is only ever built on the subspace of
+# bitstrings actually observed, keeping entries between strings at most
+# DEFAULT_DISTANCE bit flips apart. Columns are renormalized over the
+# subspace and A x = p is solved directly (small) or by preconditioned
+# GMRES (large), so memory grows with the unique outcomes, not 2^n.
+READOUT_CACHE_DIR = cache_dir("CQP_READOUT_CACHE", "readout")
+CALIBRATION_PROTOCOL = "readout_calibration"
+DEFAULT_DISTANCE = 3
+DIRECT_SOLVE_MAX = 2048  # Unique outcomes solved densely below this
+PAIR_BLOCK_BYTES = 1 << 24  # XOR scratch per block of the distance scan
+MIN_RATE = 1e-9
+
+
+def measured_qubits(circuit, register="meas"):
+    """Physical qubit read into each bit of `register` (bit k -> list[k])."""
+    creg = next((reg for reg in circuit.cregs if reg.name == register), None)
+    if creg is None:
+        raise ValueError(f"Circuit has no '{register}' register")
+    qubits = [None] * creg.size
+    for instruction in circuit.data:
+        if instruction.operation.name != "measure":
+            continue
+        location = circuit.find_bit(instruction.clbits[0])
+        for reg, index in location.registers:
+            if reg.name == register:
+                qubits[index] = circuit.find_bit(instruction.qubits[0]).index
+    if None in qubits:
+        raise ValueError(f"Bit {qubits.index(None)} of '{register}' is never measured")
+    return qubits
+
+
+def build_calibration_circuits(num_qubits, qubits):
+    """
+    [all |0>, all |1>] on the given physical qubits, read into 'meas'.
+    Only x and measure, so the circuits are already ISA on IBM devices.
+    """
+    from qiskit import ClassicalRegister, QuantumCircuit
+
+    circuits = []
+    for excited in (False, True):
+        qc = QuantumCircuit(num_qubits)
+        qc.add_register(ClassicalRegister(len(qubits), "meas"))
+        if excited:
+            qc.x(qubits)
+        qc.measure(qubits, range(len(qubits)))
+        circuits.append(qc)
+    return circuits
+
+
+@dataclass
+class ReadoutCalibration:
+    """
+    Per physical qubit readout flip rates for one backend calibration epoch.
+    rates: {qubit: [P(1|0), P(0|1)]}
+    """
+    backend: str
+    epoch: str = None
+    rates: dict = field(default_factory=dict)
+    shots: int = 0
+
+    def missing(self, qubits):
+        return sorted({q for q in qubits if q not in self.rates})
+
+    def update(self, qubits, zeros_data, ones_data):
+        """Adds rates measured by the two calibration PUBs."""
+        packed0, num_bits, _ = packed_shots(zeros_data)
+        packed1, _, _ = packed_shots(ones_data)
+        for k, q in enumerate(qubits):
+            p01 = bit_values(packed0, num_bits, k).mean()
+            p10 = 1.0 - bit_values(packed1, num_bits, k).mean()
+            self.rates[int(q)] = [float(p01), float(p10)]
+        self.shots = int(packed0.shape[-2])
+
+    def flip_rates(self, qubits):
+        """(P(1|0), P(0|1)) arrays in bit order for the given qubits."""
+        missing = self.missing(qubits)
+        if missing:
+            raise KeyError(f"No readout calibration for qubits {missing} on {self.backend}")
+        rates = np.array([self.rates[q] for q in qubits], dtype=float)
+        return rates[:, 0], rates[:, 1]
+
+
+def _calibration_path(backend_name, epoch, directory):
+    key = hashlib.sha256(f"{backend_name}\n{epoch}".encode()).hexdigest()[:16]
+    return os.path.join(directory, f"{backend_name}-{key}.json")
+
+
+def load_calibration(backend, directory=READOUT_CACHE_DIR):
+    """
+    The backend's calibration for its current epoch (empty when nothing is
+    cached yet). backend=None is a local sampler: never cached.
+    """
+    from transpile_cache import calibration_timestamp
+
+    if backend is None:
+        return ReadoutCalibration("local")
+    epoch = calibration_timestamp(backend)
+    path = _calibration_path(backend.name, epoch, directory)
+    if epoch is not None and os.path.exists(path):
+        with open(path) as fd:
+            raw = json.load(fd)
+        raw["rates"] = {int(q): rates for q, rates in raw["rates"].items()}
+        return ReadoutCalibration(**raw)
+    return ReadoutCalibration(backend.name, epoch)
+
+
+def save_calibration(calibration, directory=READOUT_CACHE_DIR):
+    if calibration.epoch is None:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    path = _calibration_path(calibration.backend, calibration.epoch, directory)
+    with atomic_open(path) as fd:
+        json.dump(asdict(calibration), fd)
+    return path
+
+
+def _unpack_bits(packed, num_bits):
+    """(rows, bytes) big-endian packed -> (rows, num_bits), column k = bit k."""
+    return np.unpackbits(packed, axis=-1)[:, ::-1][:, :num_bits]
+
+
+def subspace_matrix(unique, num_bits, p01, p10, distance=DEFAULT_DISTANCE):
+    """
+    Sparse assignment matrix A[observed, true] restricted to `unique`
+    outcomes at most `distance` flips apart, columns normalized to one.
+    """
+    from scipy import sparse
+
+    count, width = unique.shape
+    bits = _unpack_bits(unique, num_bits)
+    flip = np.clip(np.where(bits, p10, p01), MIN_RATE, 1.0 - MIN_RATE)
+    log_keep = np.log1p(-flip).sum(axis=1)
+    log_ratio = np.log(flip) - np.log1p(-flip)
+
+    # Up to 64 bits, each outcome is one uint64 and the scan is XOR + popcount
+    keys = None
+    if width <= 8:
+        keys = np.zeros(count, dtype=np.uint64)
+        for column in range(width):
+            keys = (keys << np.uint64(8)) | unique[:, column].astype(np.uint64)
+
+    rows, cols, values = [], [], []
+    block = max(1, PAIR_BLOCK_BYTES // (count * max(width, 8)))
+    for start in range(0, count, block):
+        if keys is not None:
+            xor = keys[start:start + block, None] ^ keys[None, :]
+            near = hamming_weights(xor.ravel()).reshape(xor.shape) <= distance
+        else:
+            xor = unique[start:start + block, None, :] ^ unique[None, :, :]
+            near = hamming_weights(xor) <= distance
+        i, j = np.nonzero(near)
+        i += start
+        flipped = bits[i] != bits[j]
+        values.append(np.exp(log_keep[j] + np.where(flipped, log_ratio[j], 0.0).sum(axis=1)))
+        rows.append(i.astype(np.int32))
+        cols.append(j.astype(np.int32))
+    rows, cols, values = np.concatenate(rows), np.concatenate(cols), np.concatenate(values)
+    values /= np.bincount(cols, weights=values, minlength=count)[cols]
+    return sparse.csr_matrix((values, (rows, cols)), shape=(count, count))
+
+
+def solve_subspace(matrix, probs):
+    """x with A x = p: dense below DIRECT_SOLVE_MAX, Jacobi-preconditioned GMRES above."""
+    if matrix.shape[0] <= DIRECT_SOLVE_MAX:
+        return np.linalg.solve(matrix.toarray(), probs)
+    from scipy.sparse.linalg import LinearOperator, gmres
+
+    diagonal = matrix.diagonal()
+    preconditioner = LinearOperator(matrix.shape, matvec=lambda v: v / diagonal)
+    x, info = gmres(matrix, probs, x0=probs, M=preconditioner, maxiter=100)
+    if info > 0:
+        print(f"[!] Readout mitigation: GMRES stopped after {info} iterations without converging")
+    return x
+
+
+def mitigate(data, calibration, qubits, distance=DEFAULT_DISTANCE):
+    """
+    Readout-mitigated quasi-counts {bitstring: quasi-count} of a BitArray
+    (or counts mapping) whose bit k was read from physical qubits[k]. The
+    quasi-counts sum to the shot count, so the mapping feeds any analyzer
+    that takes counts (analyze_consensus, analyze_bridge) unchanged.
+    """
+    packed, num_bits, weights = packed_shots(data)
+    packed = packed.reshape(-1, packed.shape[-1])
+    if weights is None:
+        unique, counts = np.unique(packed, axis=0, return_counts=True)
+    else:
+        unique, inverse = np.unique(packed, axis=0, return_inverse=True)
+        counts = np.bincount(inverse.ravel(), weights=weights, minlength=len(unique))
+    shots = counts.sum()
+    probs = counts / shots
+
+    p01, p10 = calibration.flip_rates(qubits)
+    quasi = solve_subspace(subspace_matrix(unique, num_bits, p01, p10, distance), probs)
+    return {
+        format(int.from_bytes(row.tobytes(), "big"), f"0{num_bits}b"): float(q * shots)
+        for row, q in zip(unique, quasi)
+    }
+
+
+def calibrate(circuits, backend, directory=READOUT_CACHE_DIR, register="meas"):
+    """
+    (cached calibration, calibration circuits still to run, their qubits)
+    for a batch of ISA circuits: only qubits missing from the current
+    epoch's cache are calibrated.
+    """
+    calibration = load_calibration(backend, directory)
+    qubits = sorted({q for qc in circuits for q in measured_qubits(qc, register)})
+    missing = calibration.missing(qubits)
+    if not missing:
+        return calibration, [], []
+    num_qubits = backend.num_qubits if backend is not None else max(qc.num_qubits for qc in circuits)
+    return calibration, build_calibration_circuits(num_qubits, missing), missing
@@ -0,0 +1,273 @@
+import numpy as np
+from dataclasses import dataclass
+
+from consensus_decoder import (
+    BYTE_POPCOUNT, VOTE_ERASED, VOTE_ONE, VOTE_ZERO, SoftVoteRule, VoteRule, VoteTally, hamming_weights,
+    tally_vote_axes, tally_votes,
+)
+
+# SamplerV2 BitArray layout:
+#   array[..., shot, byte] is uint8, big-endian across bytes.
+#   The LAST byte holds classical bits 0..7, the one before it bits 8..15, etc.
+# Everything below works on that packed layout with bitmasks; no per-outcome
+# strings are ever created.
+
+
+def num_bytes(num_bits):
+    return (num_bits + 7) // 8
+
+
+def bit_location(bit, num_bits):
+    """(byte column, bit mask) of a classical bit in the packed layout."""
+    if not 0 <= bit < num_bits:
+        raise IndexError(f"Bit {bit} out of range for a {num_bits}-bit register")
+    return num_bytes(num_bits) - 1 - bit // 8, np.uint8(1 << (bit % 8))
+
+
+def pack_bitstrings(bitstrings, num_bits=None):
+    """Packs Qiskit-ordered bitstrings into BitArray-layout uint8 rows."""
+    bitstrings = list(bitstrings)
+    if num_bits is None:
+        num_bits = max((len(b) for b in bitstrings), default=0)
+    width = num_bytes(num_bits)
+    buffer = b"".join(int(b, 2).to_bytes(width, "big") for b in bitstrings)
+    return np.frombuffer(buffer, dtype=np.uint8).reshape(len(bitstrings), width)
+
+
+def packed_shots(data, num_bits=None):
+    """
+    Normalizes analyzer input to (packed, num_bits, weights).
+
+    data: a SamplerV2 BitArray (one row per shot, weights=None) or a
+          counts / quasi-probability mapping (one row per key, weighted).
+    """
+    if hasattr(data, "array") and hasattr(data, "num_bits"):
+        return np.asarray(data.array), data.num_bits, None
+
+    keys = list(data.keys())
+    if keys and not isinstance(keys[0], str):
+        if num_bits is None:
+            raise ValueError("Integer-keyed distributions need an explicit num_bits")
+        keys = [format(k, f"0{num_bits}b") for k in keys]
+    if num_bits is None:
+        num_bits = max((len(k) for k in keys), default=0)
+    packed = pack_bitstrings(keys, num_bits)
+    weights = np.fromiter(data.values(), dtype=np.float64, count=len(keys))
+    return packed, num_bits, weights
+
+
+def shot_weights(packed, weights):
+    """Per-row weights, defaulting to one per shot for raw BitArrays."""
+    return np.ones(packed.shape[:-1]) if weights is None else weights
+
+
+def register_mask(num_bits, qubits):
+    """Packed byte mask selecting the given classical bits."""
+    mask = np.zeros(num_bytes(num_bits), dtype=np.uint8)
+    for bit in qubits:
+        column, bit_mask = bit_location(bit, num_bits)
+        mask[column] |= bit_mask
+    return mask
+
+
+def register_weights(packed, num_bits, qubits=None):
+    """
+    Hamming weight of a sub-register (e.g. one cluster) for every shot.
+    qubits=None weighs the full register.
+    """
+    if qubits is None:
+        return hamming_weights(packed)
+    mask = register_mask(num_bits, qubits)
+    return BYTE_POPCOUNT[packed & mask].sum(axis=-1, dtype=np.int64)
+
+
+def bit_values(packed, num_bits, bit):
+    """0/1 value of one classical bit for every shot."""
+    column, bit_mask = bit_location(bit, num_bits)
+    return ((packed[..., column] & bit_mask) != 0).astype(np.uint8)
+
+
+def extract_register(packed, num_bits, qubits):
+    """
+    Slices the given bits out into one integer per shot.
+    qubits[j] becomes bit j of the result (at most 64 bits).
+    """
+    qubits = list(qubits)
+    if len(qubits) > 64:
+        raise ValueError(f"Cannot extract more than 64 bits into an integer (got {len(qubits)})")
+    values = np.zeros(packed.shape[:-1], dtype=np.uint64)
+    for j, bit in enumerate(qubits):
+        values |= bit_values(packed, num_bits, bit).astype(np.uint64) << np.uint64(j)
+    return values
+
+
+def to_integers(packed, num_bits):
+    """Full register as one uint64 per shot (registers up to 64 bits)."""
+    return extract_register(packed, num_bits, range(num_bits))
+
+
+def postselect(packed, num_bits, conditions):
+    """
+    Boolean shot mask for the bit conditions {bit: required value}.
+    Evaluated as one masked compare per byte column.
+    """
+    care = register_mask(num_bits, conditions.keys())
+    want = register_mask(num_bits, [bit for bit, value in conditions.items() if value])
+    return np.all((packed & care) == want, axis=-1)
+
+
+def council_votes(packed, num_bits, rule, qubits=None):
+    """
+    Per-shot votes of a (sub-)register: Hamming-weight majority for a
+    VoteRule, log-likelihood decision for a SoftVoteRule (which already
+    knows its voting bits, so `qubits` is ignored).
+    """
+    if isinstance(rule, SoftVoteRule):
+        return rule.decide_shots(packed)[0]
+    return rule.decide(register_weights(packed, num_bits, qubits))
+
+
+def soft_decode_shots(data, rule):
+    """
+    Maximum-likelihood decoding with a SoftVoteRule.
+    Returns (VoteTally, votes, confidence), one vote / confidence per row.
+    """
+    packed, _, weights = packed_shots(data)
+    votes, confidence = rule.decide_shots(packed)
+    tally = tally_vote_axes(votes) if weights is None and votes.ndim > 1 else tally_votes(votes, weights)
+    return tally, votes, confidence
+
+
+def decode_shots(data, rule, qubits=None):
+    """
+    Majority-votes a BitArray (or counts mapping) with a VoteRule, or
+    decodes it by maximum likelihood with a SoftVoteRule.
+    BitArrays of a parameter sweep (shape (..., shots, bytes)) are tallied
+    per sweep point: the VoteTally then holds arrays of the sweep shape.
+    """
+    packed, num_bits, weights = packed_shots(data)
+    votes = council_votes(packed, num_bits, rule, qubits)
+    if weights is None and votes.ndim > 1:
+        return tally_vote_axes(votes)
+    return tally_votes(votes, weights)
+
+
+# --- HIERARCHICAL (TWO-LEVEL) DECODING ---
+# Multi-anchor councils ('qc.cx(i % k, i)') are k interleaved sub-councils.
+# Level 1 majority-votes inside every group (any assignment of register
+# bits to groups), level 2 votes across the group votes that were not
+# erased. The packed shots are copied column-major once; a group's weight
+# is then one 256-entry popcount lookup per byte column it touches, so the
+# cost is (shots x columns touched) per group whatever the register width.
+
+
+def group_weights(packed, num_bits, groups):
+    """(groups, ..., shots) Hamming weight of every group of register bits."""
+    columns = np.ascontiguousarray(np.moveaxis(packed, -1, 0))
+    weights = np.zeros((len(groups),) + packed.shape[:-1], dtype=np.int32)
+    for g, group in enumerate(groups):
+        mask = register_mask(num_bits, group)
+        for column in np.flatnonzero(mask):
+            weights[g] += BYTE_POPCOUNT[np.arange(256) & mask[column]].take(columns[column])
+    return weights
+
+
+def group_votes(packed, num_bits, groups, rules=None, weights=None):
+    """
+    (groups, ..., shots) level-1 votes.
+    rules:   one rule for every group, or one per group (default: plain
+             majority, ties erased). VoteRules must match their group size.
+    weights: group_weights(packed, num_bits, groups) if already computed
+    """
+    groups = [list(group) for group in groups]
+    if rules is None or isinstance(rules, (VoteRule, SoftVoteRule)):
+        rules = [rules] * len(groups)
+    if len(rules) != len(groups):
+        raise ValueError(f"Got {len(rules)} rules for {len(groups)} groups")
+    rules = [VoteRule(len(group)) if rule is None else rule for group, rule in zip(groups, rules)]
+    for g, (group, rule) in enumerate(zip(groups, rules)):
+        if isinstance(rule, VoteRule) and rule.num_bits != len(group):
+            raise ValueError(f"Group {g} has {len(group)} bits but its rule votes on {rule.num_bits}")
+
+    votes = np.empty((len(groups),) + packed.shape[:-1], dtype=np.int8)
+    majority = [g for g, rule in enumerate(rules) if isinstance(rule, VoteRule)]
+    if weights is None:
+        weights = dict(zip(majority, group_weights(packed, num_bits, [groups[g] for g in majority])))
+    for g in majority:
+        votes[g] = rules[g].decide(weights[g])
+    for g, rule in enumerate(rules):
+        if isinstance(rule, SoftVoteRule):
+            votes[g] = rule.decide_shots(packed)[0]
+    return votes
+
+
+def cross_group_votes(votes, tie="erase"):
+    """
+    Level-2 majority over (groups, ..., shots) votes, erased groups
+    abstaining. An exact split decides per `tie`; a shot where every
+    group erased stays erased.
+    """
+    ones = np.count_nonzero(votes == VOTE_ONE, axis=0)
+    zeros = np.count_nonzero(votes == VOTE_ZERO, axis=0)
+    logical = np.where(ones > zeros, VOTE_ONE, VOTE_ZERO).astype(np.int8)
+    logical[ones == zeros] = {"erase": VOTE_ERASED, "zero": VOTE_ZERO, "one": VOTE_ONE}[tie]
+    logical[(ones == 0) & (zeros == 0)] = VOTE_ERASED
+    return logical
+
+
+@dataclass
+class HierarchicalTally:
+    """
+    logical:         VoteTally of the cross-group votes
+    group_consensus: per group, mean share of its bits that matched its own
+                     (non-erased) vote
+    group_agreement: per group, share of clean logical votes the group agreed with
+    group_erased:    per group, share of shots the group erased
+    logical_error:   share of shots whose groups were not unanimous (a group
+                     voted the other way or erased)
+    Shares are floats, or arrays over the sweep axes for sweep BitArrays.
+    """
+    logical: VoteTally
+    group_consensus: np.ndarray
+    group_agreement: np.ndarray
+    group_erased: np.ndarray
+    logical_error: float
+
+    @property
+    def agreement(self):
+        """Cross-group agreement: 1 - logical_error."""
+        return 1.0 - self.logical_error
+
+
+def hierarchical_decode(data, groups, rules=None, tie="erase"):
+    """
+    Two-level decoding of a BitArray (or counts mapping): a vote inside
+    every group of `groups` (lists of register bits, e.g.
+    fanout_compiler.parity_groups), then one across the groups.
+    """
+    packed, num_bits, weights = packed_shots(data)
+    groups = [list(group) for group in groups]
+    ones = group_weights(packed, num_bits, groups)
+    votes = group_votes(packed, num_bits, groups, rules, ones)
+    logical = cross_group_votes(votes, tie)
+    tally = tally_vote_axes(logical) if weights is None and logical.ndim > 1 else tally_votes(logical, weights)
+
+    weights = shot_weights(packed, weights)
+    clean = logical != VOTE_ERASED
+    unanimous = clean & np.all(votes == logical, axis=0)
+
+    def share(mask, within=None):
+        """Weighted share of shots in `mask` (among those in `within`), 0 if none."""
+        total = weights.sum(axis=-1) if within is None else (weights * within).sum(axis=-1)
+        part = (weights * mask).sum(axis=-1)
+        return np.divide(part, total, out=np.zeros_like(part), where=total != 0)
+
+    sizes = np.array([len(group) for group in groups]).reshape((-1,) + (1,) * logical.ndim)
+    matching = np.where(votes == VOTE_ONE, ones, sizes - ones) / sizes
+    return HierarchicalTally(
+        logical=tally,
+        group_consensus=np.array([share(m * (v != VOTE_ERASED), v != VOTE_ERASED) for m, v in zip(matching, votes)]),
+        group_agreement=np.array([share(clean & (v == logical), clean) for v in votes]),
+        group_erased=np.array([share(v == VOTE_ERASED) for v in votes]),
+        logical_error=1.0 - share(unanimous),
+    )
@@ -0,0 +1,176 @@
+import json
+import os
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, replace
+
+import numpy as np
+from qiskit.primitives import BitArray, DataBin, SamplerPubResult
+
+from cache_paths import cache_dir, process_default
+from shot_analysis import num_bytes
+
+# --- SHOT STORE LAYOUT ---
+# <STORE_DIR>/index.jsonl                       one line per block (latest wins)
+# <STORE_DIR>/<job_id>/pub<k>/<register>.u8     raw packed shots, one file per register
+#
+# Column files are stored shots-major: (shots, *pub_shape, bytes). Appending
+# shots is a plain file append, and reading is an np.memmap whose shot axis
+# is moved back to BitArray order (..., shots, bytes) as a view, so
+# analyzers run directly on the mapped pages: no reload, no parsing.
+STORE_DIR = cache_dir("CQP_SHOT_STORE", "shots")
+COLUMN_SUFFIX = ".u8"
+
+
+@dataclass
+class ShotBlock:
+    """Index record of one stored PUB."""
+    job_id: str
+    pub_index: int
+    protocol: str
+    circuit_hash: str
+    registers: dict
+    pub_shape: list
+    shots: int = 0
+    metadata: dict = field(default_factory=dict)
+
+    @property
+    def key(self):
+        return (self.job_id, self.pub_index)
+
+
+def _shots_major(array):
+    """(..., shots, bytes) -> contiguous (shots, ..., bytes)."""
+    return np.ascontiguousarray(np.moveaxis(np.asarray(array, dtype=np.uint8), -2, 0))
+
+
+class ShotStore:
+    """
+    Append-only, memory-mapped columnar store of SamplerV2 shot data,
+    indexed by job ID, protocol and circuit hash.
+    """
+    def __init__(self, directory=STORE_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.jsonl")
+        os.makedirs(directory, exist_ok=True)
+        self._index = None
+
+    # --- index ---
+    def _load_index(self):
+        if self._index is None:
+            self._index = OrderedDict()
+            if os.path.exists(self.index_path):
+                with open(self.index_path) as fd:
+                    for line in fd:
+                        if line.strip():
+                            block = ShotBlock(**json.loads(line))
+                            self._index[block.key] = block
+        return self._index
+
+    def _commit(self, block):
+        with open(self.index_path, "a") as fd:
+            fd.write(json.dumps(asdict(block)) + "\n")
+        self._load_index()[block.key] = block
+        return block
+
+    def blocks(self, job_id=None, protocol=None, circuit_hash=None):
+        """Stored PUBs matching every given filter, in insertion order."""
+        return [
+            block for block in self._load_index().values()
+            if (job_id is None or block.job_id == job_id)
+            and (protocol is None or block.protocol == protocol)
+            and (circuit_hash is None or block.circuit_hash == circuit_hash)
+        ]
+
+    def _column_path(self, block, register):
+        return os.path.join(self.directory, block.job_id, f"pub{block.pub_index}", register + COLUMN_SUFFIX)
+
+    # --- writes ---
+    def put_pub(self, job_id, pub_index, pub_result, protocol=None, circuit_hash=None):
+        """Stores every classical register of one SamplerPubResult."""
+        registers = {
+            name: value for name, value in pub_result.data.items() if isinstance(value, BitArray)
+        }
+        if not registers:
+            raise ValueError(f"PUB {pub_index} of job {job_id} has no BitArray data")
+        first = next(iter(registers.values()))
+        block = ShotBlock(
+            job_id=job_id,
+            pub_index=pub_index,
+            protocol=protocol,
+            circuit_hash=circuit_hash,
+            registers={name: bits.num_bits for name, bits in registers.items()},
+            pub_shape=list(first.shape),
+        )
+        if block.key in self._load_index():
+            raise ValueError(f"PUB {pub_index} of job {job_id} is already stored; use append()")
+        os.makedirs(os.path.dirname(self._column_path(block, "_")), exist_ok=True)
+        for name, bits in registers.items():
+            with open(self._column_path(block, name), "wb") as fd:
+                fd.write(_shots_major(bits.array).tobytes())
+        return self._commit(replace(block, shots=first.num_shots))
+
+    def put_result(self, job_id, result, protocols=None, circuit_hashes=None):
+        """Stores every PUB of a PrimitiveResult; returns the new blocks."""
+        count = len(result)
+        protocols = protocols or [None] * count
+        circuit_hashes = circuit_hashes or [None] * count
+        return [
+            self.put_pub(job_id, k, pub_result, protocols[k], circuit_hashes[k])
+            for k, pub_result in enumerate(result)
+        ]
+
+    def append(self, job_id, pub_index, pub_result):
+        """Appends more shots of the same PUB (same registers and shape)."""
+        block = self._load_index()[(job_id, pub_index)]
+        arrays = {}
+        for name, num_bits in block.registers.items():
+            bits = getattr(pub_result.data, name)
+            if bits.num_bits != num_bits or list(bits.shape) != block.pub_shape:
+                raise ValueError(f"Register '{name}' does not match the stored layout")
+            arrays[name] = bits.array
+        for name, array in arrays.items():
+            with open(self._column_path(block, name), "ab") as fd:
+                fd.write(_shots_major(array).tobytes())
+        return self._commit(replace(block, shots=block.shots + next(iter(arrays.values())).shape[-2]))
+
+    # --- reads (zero-copy) ---
+    def column(self, block, register):
+        """Read-only memmap of a register, shots-major (shots, *pub_shape, bytes)."""
+        shape = (block.shots, *block.pub_shape, num_bytes(block.registers[register]))
+        if block.shots == 0:
+            return np.zeros(shape, dtype=np.uint8)
+        return np.memmap(self._column_path(block, register), dtype=np.uint8, mode="r", shape=shape)
+
+    def read(self, block, register, start=None, stop=None):
+        """BitArray view over shots [start, stop) of one register."""
+        window = self.column(block, register)[start:stop]
+        return BitArray(np.moveaxis(window, 0, -2), block.registers[register])
+
+    def pub_data(self, block, start=None, stop=None):
+        """DataBin of every register over a shot range (e.g. for analyze_consensus)."""
+        data = {name: self.read(block, name, start, stop) for name in block.registers}
+        return DataBin(**data, shape=tuple(block.pub_shape))
+
+    def pub_result(self, block, start=None, stop=None):
+        """SamplerPubResult view, for analyzers that take [pub_result]."""
+        data = self.pub_data(block, start, stop)
+        shots = next(iter(data.values())).num_shots
+        return SamplerPubResult(data, metadata={"shots": shots, **block.metadata})
+
+    def analyze(self, protocol, start=None, stop=None, **filters):
+        """
+        Re-runs a protocol's registered analyzer on every stored PUB of it.
+        Returns {(job_id, pub_index): analysis}.
+        """
+        from batch_runner import PROTOCOLS
+
+        spec = PROTOCOLS[protocol]
+        return OrderedDict(
+            (block.key, spec.analyze(self.pub_result(block, start, stop)))
+            for block in self.blocks(protocol=protocol, **filters)
+        )
+
+
+@process_default
+def default_store():
+    return ShotStore()
@@ -0,0 +1,276 @@
+import numpy as np
+from qiskit.exceptions import QiskitError
+from qiskit.primitives import BitArray, DataBin, PrimitiveResult, SamplerPubResult
+from qiskit.primitives.containers.sampler_pub import SamplerPub
+from qiskit.primitives.primitive_job import PrimitiveJob
+from qiskit.circuit.library import UnitaryGate
+from qiskit.quantum_info import Clifford
+
+# --- STABILIZER BACKEND ---
+# A Clifford circuit measured in Z yields outcomes that are uniform over an
+# affine subspace z0 + span(N) of GF(2)^n. The tableau gives z0 and N once
+# (polynomial time); every shot is then just z0 XOR a random combination of N,
+# drawn eight basis vectors at a time through a 256-entry XOR table.
+#
+# Detection is gate-level: logical circuits and ISA circuits compiled at
+# optimization_level <= 1 stay recognizably Clifford. Level 2/3 resynthesis of
+# two-qubit blocks emits arbitrary KAK angles, so sample the logical circuit.
+
+IGNORED_OPS = ("barrier", "delay")
+
+
+def split_measurements(circuit):
+    """
+    Separates the unitary body from its terminal measurements.
+    Returns (body, {clbit_index: qubit_index}).
+    """
+    body = circuit.copy_empty_like()
+    readout = {}
+    measured = set()
+    for instruction in circuit.data:
+        qubits = [circuit.find_bit(q).index for q in instruction.qubits]
+        if instruction.operation.name == "measure":
+            readout[circuit.find_bit(instruction.clbits[0]).index] = qubits[0]
+            measured.add(qubits[0])
+            continue
+        if instruction.operation.name in IGNORED_OPS:
+            continue
+        if measured.intersection(qubits) or instruction.clbits:
+            raise ValueError(
+                f"'{instruction.operation.name}' after a measurement: only terminal measurements are supported"
+            )
+        body.append(instruction)
+    return body, readout
+
+
+def fuse_single_qubit_runs(body):
+    """
+    Multiplies every run of single-qubit gates into one 2x2 unitary.
+    Basis translation splits Clifford rotations into non-Clifford rz angles
+    (e.g. rz(a) sx rz(-a)), sometimes across a CZ; diagonal runs are
+    therefore carried through gates they commute with, and only the fused
+    result needs to be Clifford.
+    """
+    fused = body.copy_empty_like()
+    pending = {}
+
+    def commutes(matrix, operation, position):
+        if abs(matrix[0, 1]) > 1e-12 or abs(matrix[1, 0]) > 1e-12:
+            return False
+        return operation.name == "cz" or (operation.name == "cx" and position == 0)
+
+    def flush(qubit):
+        matrix = pending.pop(qubit, None)
+        if matrix is not None:
+            fused.append(UnitaryGate(matrix, check_input=False), [qubit])
+
+    for instruction in body.data:
+        if len(instruction.qubits) == 1:
+            qubit = instruction.qubits[0]
+            pending[qubit] = instruction.operation.to_matrix() @ pending.get(qubit, np.eye(2))
+            continue
+        for position, qubit in enumerate(instruction.qubits):
+            if qubit in pending and not commutes(pending[qubit], instruction.operation, position):
+                flush(qubit)
+        fused.append(instruction)
+    for qubit in list(pending):
+        flush(qubit)
+    return fused
+
+
+def to_clifford(circuit):
+    """
+    Clifford tableau of a circuit's unitary body plus its readout map.
+    Raises ValueError for non-Clifford circuits.
+    """
+    body, readout = split_measurements(circuit)
+    try:
+        return Clifford(fuse_single_qubit_runs(body)), readout
+    except QiskitError as err:
+        raise ValueError(f"Circuit '{circuit.name}' is not Clifford: {err}") from err
+
+
+def is_clifford(circuit):
+    """True if the circuit (minus terminal measurements) is Clifford."""
+    try:
+        to_clifford(circuit)
+    except ValueError:
+        return False
+    return True
+
+
+def _rowsum(x, z, r, targets, pivot):
+    """
+    Multiplies stabilizer rows `targets` by row `pivot` in place,
+    tracking signs as in Aaronson & Gottesman (2004).
+    """
+    x1, z1 = x[pivot].astype(np.int64), z[pivot].astype(np.int64)
+    x2, z2 = x[targets].astype(np.int64), z[targets].astype(np.int64)
+    g = np.where(
+        (x1 == 1) & (z1 == 1), z2 - x2,
+        np.where((x1 == 1) & (z1 == 0), z2 * (2 * x2 - 1),
+                 np.where((x1 == 0) & (z1 == 1), x2 * (1 - 2 * z2), 0)),
+    )
+    phase = (2 * r[targets].astype(np.int64) + 2 * int(r[pivot]) + g.sum(axis=1)) % 4
+    r[targets] = phase == 2
+    x[targets] ^= x[pivot]
+    z[targets] ^= z[pivot]
+
+
+def _gf2_solve(matrix, rhs):
+    """
+    Solves matrix @ v = rhs over GF(2).
+    Returns (particular solution, null-space basis rows).
+    """
+    m = matrix.copy()
+    b = rhs.copy()
+    rows, cols = m.shape
+    pivots = []
+    rank = 0
+    for col in range(cols):
+        hits = np.nonzero(m[rank:, col])[0]
+        if len(hits) == 0:
+            continue
+        pivot = rank + hits[0]
+        m[[rank, pivot]] = m[[pivot, rank]]
+        b[[rank, pivot]] = b[[pivot, rank]]
+        others = np.nonzero(m[:, col])[0]
+        others = others[others != rank]
+        m[others] ^= m[rank]
+        b[others] ^= b[rank]
+        pivots.append(col)
+        rank += 1
+        if rank == rows:
+            break
+    if b[rank:].any():
+        raise ValueError("Inconsistent stabilizer constraints")
+
+    solution = np.zeros(cols, dtype=bool)
+    solution[pivots] = b[:rank]
+    free = [col for col in range(cols) if col not in set(pivots)]
+    basis = np.zeros((len(free), cols), dtype=bool)
+    for k, col in enumerate(free):
+        basis[k, col] = True
+        basis[k, pivots] = m[:rank, col]
+    return solution, basis
+
+
+def outcome_space(clifford):
+    """
+    Affine space of Z-basis outcomes of a stabilizer state.
+    Returns (z0, basis): every outcome is z0 XOR a subset-sum of basis rows,
+    all equally likely. Bit j of a row is qubit j.
+    """
+    n = clifford.num_qubits
+    x = clifford.stab_x.copy()
+    z = clifford.stab_z.copy()
+    r = clifford.stab_phase.copy()
+
+    # Row-reduce the X block; rows left without X part are Z-only stabilizers.
+    rank = 0
+    for col in range(n):
+        hits = np.nonzero(x[rank:, col])[0]
+        if len(hits) == 0:
+            continue
+        pivot = rank + hits[0]
+        for arr in (x, z, r):
+            arr[[rank, pivot]] = arr[[pivot, rank]]
+        others = np.nonzero(x[:, col])[0]
+        others = others[others != rank]
+        if len(others):
+            _rowsum(x, z, r, others, rank)
+        rank += 1
+
+    return _gf2_solve(z[rank:], r[rank:])
+
+
+def pack_bits(bits):
+    """Packs (..., num_bits) booleans, bit 0 first, into BitArray byte order."""
+    pad = (-bits.shape[-1]) % 8
+    padding = np.zeros(bits.shape[:-1] + (pad,), dtype=bool)
+    return np.packbits(np.concatenate([padding, bits[..., ::-1]], axis=-1), axis=-1)
+
+
+def draw_choices(num_basis, shots, rng):
+    """Random subset selectors for the basis, one byte-sized block at a time."""
+    return [
+        rng.integers(0, 1 << min(8, num_basis - start), size=shots)
+        for start in range(0, num_basis, 8)
+    ]
+
+
+def sample_outcomes(z0, basis, choices, shots):
+    """
+    Builds packed outcome rows (BitArray layout, bit j = entry j) from the
+    selectors of draw_choices(). Each block of eight basis vectors becomes a
+    256-entry XOR table, so a shot costs one gather per block.
+    """
+    packed = np.tile(pack_bits(z0), (shots, 1))
+    basis_bytes = pack_bits(basis)
+    for block_index, picks in enumerate(choices):
+        block = basis_bytes[8 * block_index:8 * block_index + 8]
+        table = np.zeros((1, packed.shape[1]), dtype=np.uint8)
+        for row in block:
+            table = np.concatenate([table, table ^ row])
+        packed ^= table[picks]
+    return packed
+
+
+class StabilizerSampler:
+    """
+    SamplerV2-compatible local sampler for Clifford circuits.
+    Results carry one BitArray per classical register, like SamplerV2.
+    """
+    def __init__(self, default_shots=4096, seed=None):
+        self.default_shots = default_shots
+        self._rng = np.random.default_rng(seed)
+
+    def run(self, pubs, *, shots=None):
+        if shots is None:
+            shots = self.default_shots
+        coerced = [SamplerPub.coerce(pub, shots) for pub in pubs]
+        job = PrimitiveJob(self._run, coerced)
+        job._submit()
+        return job
+
+    def _run(self, pubs):
+        return PrimitiveResult([self._run_pub(pub) for pub in pubs], metadata={"version": 2})
+
+    def _sample_circuit(self, circuit, shots):
+        clifford, readout = to_clifford(circuit)
+        z0, basis = outcome_space(clifford)
+        # Shared selectors keep every register drawn from the same outcome
+        choices = draw_choices(len(basis), shots, self._rng)
+
+        registers = {}
+        for creg in circuit.cregs:
+            qubits = [readout.get(circuit.find_bit(clbit).index) for clbit in creg]
+            measured = [j for j, q in enumerate(qubits) if q is not None]
+            reg_z0 = np.zeros(creg.size, dtype=bool)
+            reg_basis = np.zeros((len(basis), creg.size), dtype=bool)
+            reg_z0[measured] = z0[[qubits[j] for j in measured]]
+            reg_basis[:, measured] = basis[:, [qubits[j] for j in measured]]
+            registers[creg.name] = sample_outcomes(reg_z0, reg_basis, choices, shots)
+        return registers
+
+    def _run_pub(self, pub):
+        circuit, shots = pub.circuit, pub.shots
+        if circuit.num_parameters:
+            bound = pub.parameter_values.bind_all(circuit)
+        else:
+            bound = np.empty((), dtype=object)
+            bound[()] = circuit
+
+        samples = np.empty(bound.shape, dtype=object)
+        for index in np.ndindex(bound.shape):
+            samples[index] = self._sample_circuit(bound[index], shots)
+
+        data = {}
+        for creg in circuit.cregs:
+            stacked = np.stack([samples[index][creg.name] for index in np.ndindex(bound.shape)])
+            stacked = stacked.reshape(bound.shape + stacked.shape[1:])
+            data[creg.name] = BitArray(stacked, creg.size)
+        return SamplerPubResult(
+            DataBin(**data, shape=pub.shape),
+            metadata={"shots": shots, "circuit_metadata": circuit.metadata},
+        )
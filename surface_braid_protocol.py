@@ -1,6 +1,9 @@
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import QuantumCircuit
+from backend_cache import live_backend, load_backend
+from job_ledger import record_submission
+from transpile_cache import cached_transpile
+from tracing import span, traced, traced_sampler
 
 def build_surface_braid():
     # 9 Qubits: The full 'Davis Square'
@@ -29,17 +32,20 @@ def build_surface_braid():
     qc.measure_all()
     return qc
 
+@traced("surface_braid_protocol")
 def main():
     print("--- PROTOCOL Z.INFINITY: SURFACE-PROTECTED BRAIDING ---")
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino")
+    backend = load_backend("ibm_torino")
     
-    qc = build_surface_braid()
-    pm = transpile(qc, backend=backend)
+    with span("build"):
+        qc = build_surface_braid()
+    pm = cached_transpile(qc, backend=backend)
     
-    sampler = Sampler(mode=backend)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = traced_sampler(Sampler(mode=live_backend(backend)))
     job = sampler.run([pm], shots=8192)
     print(f"[*] SURFACE JOB ID: {job.job_id()}")
+    record_submission(job, "surface_braid", [pm], backend, 8192)
     print("[*] DEVIN PHILLIP DAVIS: PUSHING THE LIMIT.")
 
 if __name__ == "__main__":
@@ -1,16 +1,21 @@
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+from qiskit import QuantumCircuit
+from backend_cache import live_backend, load_backend
+from shot_analysis import bit_values, packed_shots, postselect, shot_weights
+from job_ledger import record_submission
+from transpile_cache import cached_transpile
+from tracing import span, traced, traced_sampler
 
 # --- THE SECRET MESSAGE ---
 # We want to send a specific "Thought" (Angle) from Alpha to Beta.
 # Pi/3 (60 degrees) is distinct enough from 0 or 1 to prove it's not random.
 MESSAGE_ANGLE = np.pi / 3 
 
-def build_teleportation_circuit():
+def build_teleportation_circuit(message_angle=MESSAGE_ANGLE):
     """
     Constructs a teleportation channel between Q1 (Message), Q0 (Alice), and Q10 (Bob).
     Target: The state of Q1 must appear on Q10.
+    message_angle may be a Parameter for sweeps.
     """
     # We use 20 qubits to map to our standard lattice, but only need 3 active.
     qc = QuantumCircuit(20, 3) # 20 Qubits, 3 Classical Bits
@@ -23,7 +28,7 @@ def build_teleportation_circuit():
 
     # --- PHASE II: THE MESSAGE (Encoding) ---
     # We write the 'Secret' onto Q1 (Alice's side).
-    qc.ry(MESSAGE_ANGLE, 1)
+    qc.ry(message_angle, 1)
     qc.barrier()
 
     # --- PHASE III: BELL MEASUREMENT (Alice's Action) ---
@@ -45,71 +50,70 @@ def build_teleportation_circuit():
 
     return qc
 
-def analyze_teleportation(result):
+def analyze_teleportation(result, message_angle=MESSAGE_ANGLE):
     """
     Filters for the '00' branch where teleportation is intrinsic.
+    Sweep PUBs (shape (..., shots)) give an accuracy per sweep point;
+    message_angle then broadcasts against the sweep shape.
     """
     pub_result = result[0]
-    counts = pub_result.data.c.get_counts()
+    packed, num_bits, weights = packed_shots(pub_result.data.c)
     
     # Filter for shots where Alice (Bits 0 and 1) measured '00'
-    # Key format in Qiskit is [Bit 2 (Bob)][Bit 1][Bit 0]
-    # e.g., "000" -> Bob=0, Alice=00
-    # e.g., "100" -> Bob=1, Alice=00
-    
-    teleported_0_count = 0
-    teleported_1_count = 0
+    # Bob's verdict lives in Bit 2 of the same packed byte.
     
     print(f"\n[ANALYSIS] Scanning timeline branches for '00' lock...")
     
-    for key, count in counts.items():
-        # Check the last two chars (Alice's bits)
-        alice_measurement = key[-2:] 
-        bob_measurement = key[0]
-        
-        if alice_measurement == "00":
-            if bob_measurement == "0":
-                teleported_0_count += count
-            else:
-                teleported_1_count += count
+    alice_locked = postselect(packed, num_bits, {0: 0, 1: 0})
+    bob_measurement = bit_values(packed, num_bits, 2)
+    weights = shot_weights(packed, weights)
+    
+    # Sums over the shot axis keep any sweep axes in front of it
+    teleported_1_count = (weights * (alice_locked & (bob_measurement == 1))).sum(axis=-1)
+    teleported_0_count = (weights * (alice_locked & (bob_measurement == 0))).sum(axis=-1)
 
     total_valid_shots = teleported_0_count + teleported_1_count
     
-    if total_valid_shots == 0:
+    if not np.any(total_valid_shots):
         return 0.0
 
     # Calculate the observed Probability of |1> on Bob's end
-    observed_p1 = teleported_1_count / total_valid_shots
+    observed_p1 = teleported_1_count / np.where(total_valid_shots > 0, total_valid_shots, np.nan)
     
     # Theoretical Expected Probability for Ry(pi/3)
     # P(1) = sin^2(theta/2) = sin^2(60/2) = sin^2(30) = 0.25
-    expected_p1 = np.sin(MESSAGE_ANGLE / 2) ** 2
+    expected_p1 = np.sin(np.asarray(message_angle) / 2) ** 2
     
-    print(f"   > Valid '00' Timelines Found: {total_valid_shots}")
-    print(f"   > Bob's P(1) [Observed]: {observed_p1:.4f}")
-    print(f"   > Bob's P(1) [Theoretical]: {expected_p1:.4f}")
+    print(f"   > Valid '00' Timelines Found: {np.sum(total_valid_shots):.0f}")
+    if np.ndim(observed_p1) == 0:
+        print(f"   > Bob's P(1) [Observed]: {observed_p1:.4f}")
+        print(f"   > Bob's P(1) [Theoretical]: {expected_p1:.4f}")
     
     # Accuracy = 1 - Error
-    accuracy = 1.0 - abs(observed_p1 - expected_p1)
+    accuracy = 1.0 - np.abs(observed_p1 - expected_p1)
     return accuracy * 100.0
 
+@traced("teleport_protocol")
 def main():
     print("--- PROTOCOL Z.10: TELEPORTATION BRIDGE ---")
-    service = QiskitRuntimeService()
-    backend = service.backend("ibm_torino")
+    backend = load_backend("ibm_torino")
     
     print("[*] Encoding Message 'Ry(60°)' onto Q1...")
     print("[*] Establishing Bell Link (Q0 <-> Q10)...")
-    qc = build_teleportation_circuit()
+    with span("build"):
+        qc = build_teleportation_circuit()
     
     print(f"[*] Submitting to {backend.name}...")
-    pm = transpile(qc, backend=backend)
-    sampler = Sampler(mode=backend)
+    pm = cached_transpile(qc, backend=backend)
+    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    sampler = traced_sampler(Sampler(mode=live_backend(backend)))
     job = sampler.run([pm], shots=8192) # Higher shots for better filtering
     print(f"[*] Job ID: {job.job_id()}")
+    record_submission(job, "teleport", [pm], backend, 8192)
     
     result = job.result()
-    fidelity = analyze_teleportation(result)
+    with span("analyze"):
+        fidelity = analyze_teleportation(result)
     
     print(f"\n[RESULTS] Teleportation Fidelity: {fidelity:.4f}%")
     
@@ -0,0 +1,229 @@
+import atexit
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+
+from cache_paths import cache_dir
+
+# --- PHASE TRACING ---
+# CQP_TRACE=1 (or a directory) turns tracing on for a run. Every stage
+# (build, transpile, submit, queue, analyze, ...) is a span that nests
+# under whatever span is open in the same thread / task, and records wall
+# time, CPU time and the resident-memory change. Finished spans are
+# appended to trace-<time>-<pid>.jsonl as they close; a Chrome trace
+# (open in chrome://tracing or Perfetto) is written next to it at exit.
+# Disabled, span() hands back one shared no-op context manager, traced()
+# returns the function unchanged and traced_sampler() the sampler itself.
+# traced() decides when the module is imported, so set CQP_TRACE before
+# starting the process rather than calling enable() afterwards.
+TRACE_DIR = cache_dir("CQP_TRACE_DIR", "traces")
+TRACE_ENV = "CQP_TRACE"
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_current = contextvars.ContextVar("cqp_trace_span", default=None)
+
+
+def rss_bytes():
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as fd:
+            return int(fd.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _NullSpan:
+    """Shared no-op span handed out while tracing is off."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.span_id = next(tracer.ids)
+        self.parent_id = None
+
+    def set(self, **attrs):
+        """Adds attributes (job IDs, shot counts, ...) while the span is open."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        parent = _current.get()
+        self.parent_id = None if parent is None else parent.span_id
+        self._token = _current.set(self)
+        self._rss = rss_bytes()
+        self._cpu = time.process_time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._start
+        cpu = time.process_time() - self._cpu
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer.finish({
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_s": self._start - self.tracer.origin,
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "rss_delta_bytes": rss_bytes() - self._rss,
+            "thread": threading.get_ident(),
+            "attrs": self.attrs,
+        })
+        return False
+
+
+class Tracer:
+    """Collects finished spans; JSONL as they close, Chrome trace on export."""
+    def __init__(self, directory=TRACE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, f"trace-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+        self.jsonl_path = f"{stem}.jsonl"
+        self.chrome_path = f"{stem}.chrome.json"
+        self.origin = time.perf_counter()
+        self.ids = itertools.count(1)
+        self.records = []
+        self._lock = threading.Lock()
+        self._fd = open(self.jsonl_path, "a")
+
+    def finish(self, record):
+        line = json.dumps(record, default=repr)
+        with self._lock:
+            self.records.append(record)
+            self._fd.write(line + "\n")
+            self._fd.flush()
+
+    def chrome_events(self):
+        pid = os.getpid()
+        return [{
+            "name": r["name"], "ph": "X", "pid": pid, "tid": r["thread"],
+            "ts": r["start_s"] * 1e6, "dur": r["wall_s"] * 1e6,
+            "args": {"cpu_s": r["cpu_s"], "rss_delta_bytes": r["rss_delta_bytes"], **r["attrs"]},
+        } for r in self.records]
+
+    def export_chrome(self, path=None):
+        path = path or self.chrome_path
+        with self._lock:
+            payload = json.dumps({"traceEvents": self.chrome_events(), "displayTimeUnit": "ms"}, default=repr)
+        with open(path, "w") as fd:
+            fd.write(payload)
+        return path
+
+    def close(self):
+        if self._fd.closed:
+            return
+        self._fd.close()
+        if self.records:
+            self.export_chrome()
+            print(f"[*] Trace written to {self.jsonl_path} (Chrome: {self.chrome_path})")
+
+
+_TRACER = None
+
+
+def enable(directory=TRACE_DIR):
+    """Starts tracing for the rest of the process (idempotent)."""
+    global _TRACER
+    if _TRACER is None:
+        _TRACER = Tracer(directory)
+        atexit.register(_TRACER.close)
+    return _TRACER
+
+
+def disable():
+    """Stops tracing and writes the Chrome trace."""
+    global _TRACER
+    tracer, _TRACER = _TRACER, None
+    if tracer is not None:
+        tracer.close()
+    return tracer
+
+
+def active_tracer():
+    return _TRACER
+
+
+def span(name, **attrs):
+    """Context manager timing one stage; a shared no-op when tracing is off."""
+    if _TRACER is None:
+        return NULL_SPAN
+    return Span(_TRACER, name, attrs)
+
+
+def traced(name=None):
+    """
+    Decorator wrapping every call in a span (default name: module.function).
+    Applied while tracing is off, the function is returned unchanged.
+    """
+    def decorate(func):
+        if _TRACER is None:
+            return func
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class _TracedJob:
+    def __init__(self, job):
+        self._job = job
+
+    def __getattr__(self, name):
+        return getattr(self._job, name)
+
+    def result(self, *args, **kwargs):
+        with span("queue", job_id=self._job.job_id()):
+            return self._job.result(*args, **kwargs)
+
+
+class _TracedSampler:
+    def __init__(self, sampler):
+        self._sampler = sampler
+
+    def __getattr__(self, name):
+        return getattr(self._sampler, name)
+
+    def run(self, pubs, *args, **kwargs):
+        with span("submit", pubs=len(pubs), shots=kwargs.get("shots")) as current:
+            job = self._sampler.run(pubs, *args, **kwargs)
+            current.set(job_id=job.job_id())
+        return _TracedJob(job)
+
+
+def traced_sampler(sampler):
+    """
+    SamplerV2 whose run() is a 'submit' span and whose jobs' result() is a
+    'queue' span (queueing plus execution, until the result arrives).
+    """
+    if _TRACER is None or isinstance(sampler, _TracedSampler):
+        return sampler
+    return _TracedSampler(sampler)
+
+
+if os.environ.get(TRACE_ENV, "").lower() not in ("", "0", "false", "no"):
+    _target = os.environ[TRACE_ENV]
+    enable(TRACE_DIR if _target.lower() in ("1", "true", "yes") else _target)
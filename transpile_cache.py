@@ -0,0 +1,224 @@
+import contextlib
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+
+import numpy as np
+import qiskit
+from qiskit import QuantumCircuit, qpy, transpile
+from qiskit.circuit import ParameterExpression
+
+from cache_paths import atomic_open, cache_dir, process_default
+from tracing import span
+
+# --- CACHE CONFIGURATION ---
+# Transpiled ISA circuits are stored as QPY files, one per cache key.
+CACHE_DIR = cache_dir("CQP_TRANSPILE_CACHE", "transpile")
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def _param_token(param):
+    if isinstance(param, QuantumCircuit):
+        return circuit_fingerprint(param)
+    if isinstance(param, ParameterExpression):
+        return f"expr:{param}"
+    if isinstance(param, np.ndarray):
+        return f"array:{param.dtype}:{param.shape}:{hashlib.sha256(param.tobytes()).hexdigest()}"
+    return repr(param)
+
+
+def circuit_fingerprint(qc):
+    """
+    Structural SHA-256 of a logical circuit: registers, global phase and
+    every instruction (name, params, qubit and clbit indices).
+    Independent of object identity, so a rebuilt circuit hashes the same.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{qc.num_qubits}|{qc.num_clbits}|{qc.global_phase}".encode())
+    for reg in qc.qregs + qc.cregs:
+        digest.update(f"|reg:{reg.name}:{reg.size}".encode())
+    for instruction in qc.data:
+        op = instruction.operation
+        qubits = [qc.find_bit(q).index for q in instruction.qubits]
+        clbits = [qc.find_bit(c).index for c in instruction.clbits]
+        params = ",".join(_param_token(p) for p in op.params)
+        digest.update(f"|{op.name}({params}){qubits}{clbits}".encode())
+    return digest.hexdigest()
+
+
+def calibration_timestamp(backend):
+    """Last calibration date reported by the backend (None if unavailable)."""
+    properties = getattr(backend, "properties", None)
+    if properties is None:
+        return None
+    stamp = getattr(properties(), "last_update_date", None)
+    return stamp.isoformat() if hasattr(stamp, "isoformat") else stamp
+
+
+def target_fingerprint(backend):
+    """
+    SHA-256 of the backend's qubit count, operation names and coupling map,
+    for backends without a calibration timestamp (None without a target).
+    """
+    target = getattr(backend, "target", None)
+    if target is None:
+        return None
+    digest = hashlib.sha256(f"{target.num_qubits}|{sorted(target.operation_names)}".encode())
+    coupling = target.build_coupling_map()
+    if coupling is not None:
+        digest.update(repr(sorted(coupling.get_edges())).encode())
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class TranspileCache:
+    """
+    Size-bounded LRU cache of transpiled circuits, persisted as QPY.
+
+    A key combines the logical circuit's structural hash with the backend
+    name, its calibration timestamp (or, for backends that report none, a
+    hash of its coupling map and operations), optimization level, seed and
+    any extra transpile options. Recency is tracked through file mtimes.
+    """
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, qc, backend, optimization_level=None, seed_transpiler=None, backend_token=None, **options):
+        """backend_token: precomputed self.backend_token(backend) for batches."""
+        parts = [
+            circuit_fingerprint(qc),
+            backend.name,
+            backend_token or self.backend_token(backend),
+            str(optimization_level),
+            str(seed_transpiler),
+            repr(sorted(options.items())),
+            qiskit.__version__,
+        ]
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    @staticmethod
+    def backend_token(backend):
+        """Calibration timestamp, or the target hash when the backend reports none."""
+        stamp = calibration_timestamp(backend)
+        return f"calibrated:{stamp}" if stamp is not None else f"target:{target_fingerprint(backend)}"
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.qpy")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fd:
+                circuit = qpy.load(fd)[0]
+            os.utime(path)  # Mark as most recently used
+        except FileNotFoundError:  # Never cached, or evicted by another process
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return circuit
+
+    def put(self, key, circuit):
+        with atomic_open(self._path(key), "wb") as fd:
+            qpy.dump(circuit, fd)
+        self.stats.writes += 1
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".qpy"):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:  # Evicted by a concurrent process
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+                self.stats.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def transpile(self, circuits, backend, optimization_level=None, seed_transpiler=None, **options):
+        """
+        Drop-in for qiskit.transpile(circuits, backend=...).
+        Only cache misses are transpiled (as one batch).
+        """
+        single = isinstance(circuits, QuantumCircuit)
+        circuits = [circuits] if single else list(circuits)
+
+        token = self.backend_token(backend)
+        keys = [
+            self.key(qc, backend, optimization_level, seed_transpiler, token, **options)
+            for qc in circuits
+        ]
+        compiled = [self.get(key) for key in keys]
+        missing = [i for i, qc in enumerate(compiled) if qc is None]
+
+        if missing:
+            fresh = transpile(
+                [circuits[i] for i in missing],
+                backend=backend,
+                optimization_level=optimization_level,
+                seed_transpiler=seed_transpiler,
+                **options,
+            )
+            for i, qc in zip(missing, fresh):
+                self.put(keys[i], qc)
+                compiled[i] = qc
+
+        return compiled[0] if single else compiled
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".qpy"):
+                os.remove(os.path.join(self.directory, name))
+
+
+@process_default
+def default_cache():
+    return TranspileCache()
+
+
+_SCRATCH = []
+
+
+@contextlib.contextmanager
+def scratch_cache():
+    """
+    Routes cached_transpile() through a throwaway cache for the duration, so
+    profiling and benchmark runs neither read nor fill the shared one.
+    """
+    with tempfile.TemporaryDirectory(prefix="cqp-transpile-") as directory:
+        _SCRATCH.append(TranspileCache(directory))
+        try:
+            yield _SCRATCH[-1]
+        finally:
+            _SCRATCH.pop()
+
+
+def cached_transpile(circuits, backend, **kwargs):
+    """qiskit.transpile() through the shared on-disk cache (or the active scratch_cache())."""
+    cache = _SCRATCH[-1] if _SCRATCH else default_cache()
+    with span("transpile", circuits=1 if isinstance(circuits, QuantumCircuit) else len(circuits)):
+        return cache.transpile(circuits, backend, **kwargs)
@@ -0,0 +1,262 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+from qiskit.circuit.library import RZGate
+
+from tracing import span, traced_sampler
+
+# --- ZERO-NOISE EXTRAPOLATION ---
+# Noise is amplified by unitary folding of an already transpiled (ISA) base:
+# G -> G (G^dagger G)^n keeps the logic and multiplies the gate count. The
+# inverses are written in the ISA basis (sx^dagger = rz(pi) sx rz(pi)), so a
+# single transpilation serves every scale and all folded circuits ship as
+# PUBs of one job. Analyzer outputs at every scale are then extrapolated
+# back to zero noise, vectorized over all observables at once.
+DEFAULT_SCALES = (1, 3, 5)
+FOLD_METHODS = ("global", "local")
+EXTRAPOLATORS = ("linear", "richardson", "exponential")
+UNFOLDED_OPS = ("barrier", "delay", "measure")
+
+
+def inverse_instructions(instruction):
+    """[(operation, qubits)] implementing the inverse, in the ISA basis."""
+    op, qubits = instruction.operation, instruction.qubits
+    if op.name == "rz":
+        return [(RZGate(-op.params[0]), qubits)]
+    if op.name == "sx":
+        return [(RZGate(np.pi), qubits), (op, qubits), (RZGate(np.pi), qubits)]
+    if op.name in ("x", "cz", "cx", "ecr", "id", "h", "swap"):
+        return [(op, qubits)]  # Self-inverse
+    return [(op.inverse(), qubits)]
+
+
+def split_terminal_measurements(circuit):
+    """(body instructions, final measurement instructions)."""
+    body, measurements = [], []
+    for instruction in circuit.data:
+        if instruction.operation.name == "measure":
+            measurements.append(instruction)
+        elif measurements and set(instruction.qubits) & {q for m in measurements for q in m.qubits}:
+            raise ValueError("Only terminal measurements can be folded around")
+        else:
+            body.append(instruction)
+    return body, measurements
+
+
+def _foldable(instruction):
+    return instruction.operation.name not in UNFOLDED_OPS
+
+
+def _append(qc, instruction):
+    qc.append(instruction.operation, instruction.qubits, instruction.clbits)
+
+
+def _append_inverse(qc, instruction):
+    for op, qubits in inverse_instructions(instruction):
+        qc.append(op, qubits)
+
+
+def fold_global(circuit, scale):
+    """
+    U (U^dagger U)^k, then the last gates folded once more to reach
+    fractional scales. Returns (folded circuit, realized scale).
+    """
+    body, measurements = split_terminal_measurements(circuit)
+    gates = [inst for inst in body if _foldable(inst)]
+    if scale < 1 or not gates:
+        raise ValueError(f"Cannot fold to scale {scale}")
+    full = int((scale - 1) // 2)
+    partial = int(round((scale - 1 - 2 * full) / 2 * len(gates)))
+
+    qc = circuit.copy_empty_like()
+    for inst in body:
+        _append(qc, inst)
+    for _ in range(full):
+        qc.barrier()
+        for inst in reversed(gates):
+            _append_inverse(qc, inst)
+        qc.barrier()
+        for inst in gates:
+            _append(qc, inst)
+    if partial:
+        tail = gates[-partial:]
+        qc.barrier()
+        for inst in reversed(tail):
+            _append_inverse(qc, inst)
+        for inst in tail:
+            _append(qc, inst)
+    for inst in measurements:
+        _append(qc, inst)
+    return qc, 1 + 2 * full + 2 * partial / len(gates)
+
+
+def fold_local(circuit, scale, gates=None):
+    """
+    G -> G (G^dagger G)^n gate by gate. `gates` restricts folding to some
+    operation names (e.g. ("cz",) for two-qubit noise only); the scale is
+    then relative to those gates. Extra folds are spread evenly.
+    Returns (folded circuit, realized scale).
+    """
+    body, measurements = split_terminal_measurements(circuit)
+    selected = [
+        i for i, inst in enumerate(body)
+        if _foldable(inst) and (gates is None or inst.operation.name in gates)
+    ]
+    if scale < 1 or not selected:
+        raise ValueError(f"Cannot fold to scale {scale}")
+    extra = int(round((scale - 1) / 2 * len(selected)))
+    folds = np.full(len(selected), extra // len(selected))
+    remainder = extra % len(selected)
+    if remainder:
+        folds[np.linspace(0, len(selected) - 1, remainder).round().astype(int)] += 1
+    fold_count = dict(zip(selected, folds))
+
+    qc = circuit.copy_empty_like()
+    for i, inst in enumerate(body):
+        _append(qc, inst)
+        for _ in range(fold_count.get(i, 0)):
+            _append_inverse(qc, inst)
+            _append(qc, inst)
+    for inst in measurements:
+        _append(qc, inst)
+    return qc, 1 + 2 * extra / len(selected)
+
+
+def fold_circuit(circuit, scale, method="global", gates=None):
+    if method == "global":
+        return fold_global(circuit, scale)
+    if method == "local":
+        return fold_local(circuit, scale, gates)
+    raise ValueError(f"Unknown fold method '{method}' (expected one of {FOLD_METHODS})")
+
+
+def build_folded_batch(isa_base, scales=DEFAULT_SCALES, method="global", gates=None):
+    """Folded copies of one ISA circuit; returns (circuits, realized scales)."""
+    folded = [fold_circuit(isa_base, s, method, gates) for s in scales]
+    return [qc for qc, _ in folded], np.array([s for _, s in folded])
+
+
+# --- EXTRAPOLATION (axis 0 = scale, any trailing observable shape) ---
+def extrapolate_linear(scales, values):
+    flat = values.reshape(len(scales), -1)
+    coeffs = np.polyfit(scales, flat, 1)
+    return coeffs[-1].reshape(values.shape[1:])
+
+
+def richardson_weights(scales):
+    """Lagrange weights of the interpolating polynomial evaluated at zero."""
+    scales = np.asarray(scales, dtype=float)
+    weights = np.ones(len(scales))
+    for i, si in enumerate(scales):
+        for j, sj in enumerate(scales):
+            if i != j:
+                weights[i] *= sj / (sj - si)
+    return weights
+
+
+def extrapolate_richardson(scales, values):
+    return np.tensordot(richardson_weights(scales), values, axes=(0, 0))
+
+
+def extrapolate_exponential(scales, values):
+    """
+    y = a * exp(-b * scale), fitted in log space per observable.
+    Observables that change sign (or hit zero) across scales give NaN.
+    """
+    flat = values.reshape(len(scales), -1)
+    sign = np.sign(flat[0])
+    valid = np.all(np.sign(flat) == sign, axis=0) & (sign != 0)
+    logs = np.log(np.abs(np.where(valid, flat, 1.0)))
+    coeffs = np.polyfit(scales, logs, 1)
+    estimate = np.where(valid, sign * np.exp(coeffs[-1]), np.nan)
+    return estimate.reshape(values.shape[1:])
+
+
+EXTRAPOLATION_FUNCTIONS = {
+    "linear": extrapolate_linear,
+    "richardson": extrapolate_richardson,
+    "exponential": extrapolate_exponential,
+}
+
+
+def extrapolate(scales, values, method="richardson"):
+    """Zero-noise estimate of every observable; values[k] is at scales[k]."""
+    if method not in EXTRAPOLATION_FUNCTIONS:
+        raise ValueError(f"Unknown extrapolation '{method}' (expected one of {EXTRAPOLATORS})")
+    return EXTRAPOLATION_FUNCTIONS[method](np.asarray(scales, dtype=float), np.asarray(values, dtype=float))
+
+
+def stack_observables(analyses):
+    """
+    Analyzer outputs (scalars, arrays or {name: value} dicts) stacked into
+    one float array with the scale on axis 0. Returns (values, keys).
+    """
+    if isinstance(analyses[0], dict):
+        keys = list(analyses[0])
+        return np.array([[a[k] for k in keys] for a in analyses], dtype=float), keys
+    return np.array(analyses, dtype=float), None
+
+
+@dataclass
+class ZNEResult:
+    scales: np.ndarray
+    values: np.ndarray
+    estimates: dict
+    keys: list = None
+    job_id: str = None
+    metadata: dict = field(default_factory=dict)
+
+    def estimate(self, method="richardson"):
+        """Zero-noise value(s); a {key: value} dict for dict-valued analyzers."""
+        value = self.estimates[method]
+        return dict(zip(self.keys, value)) if self.keys is not None else value
+
+
+def analyze_folds(scales, analyses, extrapolators=EXTRAPOLATORS):
+    values, keys = stack_observables(analyses)
+    estimates = {method: extrapolate(scales, values, method) for method in extrapolators}
+    return ZNEResult(np.asarray(scales, dtype=float), values, estimates, keys)
+
+
+def run_zne(circuit, backend, analyzer, scales=DEFAULT_SCALES, shots=4096, method="global",
+            gates=None, extrapolators=EXTRAPOLATORS, optimization_level=None,
+            parameter_values=None, sampler=None, protocol="zne"):
+    """
+    Transpiles `circuit` once, folds the ISA base to every scale, submits
+    all folds as one job and extrapolates analyzer(pub_result) to zero
+    noise. backend=None folds the logical circuit (local samplers).
+    """
+    from job_ledger import record_submission
+
+    if backend is None:
+        isa_base = circuit
+    else:
+        from transpile_cache import cached_transpile
+        isa_base = cached_transpile(circuit, backend=backend, optimization_level=optimization_level)
+    folded, realized = build_folded_batch(isa_base, scales, method, gates)
+    pubs = folded if parameter_values is None else [(qc, parameter_values) for qc in folded]
+
+    if sampler is None:
+        from backend_cache import live_backend
+        from qiskit_ibm_runtime import SamplerV2 as Sampler
+        sampler = Sampler(mode=live_backend(backend))
+    job = traced_sampler(sampler).run(pubs, shots=shots)
+    print(f"[*] ZNE JOB ID: {job.job_id()} ({len(folded)} scales, {method} folding)")
+    record_submission(job, protocol, pubs, backend, shots)
+
+    result = job.result()
+    with span("analyze", protocol=protocol):
+        zne = analyze_folds(realized, [analyzer(pub_result) for pub_result in result], extrapolators)
+    zne.job_id = job.job_id()
+    zne.metadata = {"method": method, "requested_scales": list(scales), "gates": gates}
+    return zne
+
+
+def zne_protocol(name, backend, **kwargs):
+    """run_zne() on a registered batch_runner protocol, with its analyzer."""
+    from batch_runner import PROTOCOLS
+
+    spec = PROTOCOLS[name]
+    kwargs.setdefault("shots", spec.shots)
+    kwargs.setdefault("optimization_level", spec.optimization_level)
+    return run_zne(spec.build(), backend, spec.analyze, protocol=name, **kwargs)